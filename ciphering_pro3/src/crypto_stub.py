@@ -1,6 +1,14 @@
 from Cryptodome.Cipher import AES
 from Cryptodome.Random import get_random_bytes
 
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional, the big-int path only needs the standard library
+    np = None
+
+# Below this size the fixed per-call cost of NumPy is higher than a big-int XOR.
+NUMPY_MIN_LENGTH = 256
+
 def generate_cipher_key(length_bytes=16):
     return get_random_bytes(length_bytes)
 
@@ -24,13 +32,34 @@ def _generate_key_stream(cipher_key: bytes, count: int, bearer: int, direction:
     key_stream = cipher.encrypt(b'\x00' * length_needed)
     return key_stream
 
+def xor_bytes(data, key_stream, out=None):
+    """
+    XORs data with the first len(data) bytes of key_stream as whole buffers
+    (big-int XOR for small payloads, NumPy for large ones).
+    If out (a bytearray or writable memoryview) is given, the result is written into it.
+    """
+    length = len(data)
+    if len(key_stream) < length:
+        raise ValueError("Key stream shorter than data.")
+    if np is not None and length >= NUMPY_MIN_LENGTH:
+        data_arr = np.frombuffer(data, dtype=np.uint8, count=length)
+        key_arr = np.frombuffer(key_stream, dtype=np.uint8, count=length)
+        if out is None:
+            return np.bitwise_xor(data_arr, key_arr).tobytes()
+        np.bitwise_xor(data_arr, key_arr, out=np.frombuffer(out, dtype=np.uint8, count=length))
+        return out
+    result = (int.from_bytes(data, 'big') ^ int.from_bytes(key_stream[:length], 'big')).to_bytes(length, 'big')
+    if out is None:
+        return result
+    out[:length] = result
+    return out
+
 def encrypt(cipher_key: bytes, count: int, bearer: int, direction: int, plaintext: bytes) -> bytes:
     """
     Ciphering function: XORs plaintext with generated key stream.
     """
     key_stream = _generate_key_stream(cipher_key, count, bearer, direction, len(plaintext))
-    ciphertext = bytes(p ^ k for p, k in zip(plaintext, key_stream))
-    return ciphertext
+    return xor_bytes(plaintext, key_stream)
 
 def decrypt(cipher_key: bytes, count: int, bearer: int, direction: int, ciphertext: bytes) -> bytes:
     """
@@ -38,5 +67,4 @@ def decrypt(cipher_key: bytes, count: int, bearer: int, direction: int, cipherte
     (Same operation as encrypt for stream ciphers like CTR).
     """
     key_stream = _generate_key_stream(cipher_key, count, bearer, direction, len(ciphertext))
-    plaintext = bytes(c ^ k for c, k in zip(ciphertext, key_stream))
-    return plaintext
\ No newline at end of file
+    return xor_bytes(ciphertext, key_stream)
\ No newline at end of file
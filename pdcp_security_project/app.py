@@ -9,9 +9,12 @@ import os
 import matplotlib # For checking backend
 
 from src.pdcp_entity import PDCPTransmitter, PDCPReceiver
+from src.pdcp_packet import PDUStatus
 from src.channel_simulator import ImpairedChannel
 from src.crypto_stub import generate_key
 from src import cipher_stub
+from src import crypto_backends
+from src import tracing
 from src.plotting_utils import generate_summary_plot
 import config as app_config 
 
@@ -28,6 +31,10 @@ class SimulationLogHandler(logging.Handler):
         log_entry = self.format(record)
         self.log_records.append(log_entry)
     
+    def add_lines(self, lines):
+        """Appends already formatted lines (e.g. rendered trace events) to the log view."""
+        self.log_records.extend(lines)
+
     def get_logs(self):
         return list(self.log_records) 
     
@@ -94,15 +101,21 @@ def run_simulation_thread_function(sim_id, params):
             integrity_key_rx = generate_key(app_config.INTEGRITY_KEY_LENGTH_BYTES)
             app_specific_logger.info(f"[{sim_id}] Simulating integrity key mismatch.")
 
+        # Per-PDU events go to this simulation's own trace buffer and are rendered into the log view
+        tracer = tracing.TraceBuffer(app_config.TRACE_BUFFER_EVENTS, params.get('trace_categories', 'all'))
+        trace_rendered = 0
+
         pdcp_tx = PDCPTransmitter(
             bearer_id=app_config.BEARER_ID_DRB1, direction=app_config.DIRECTION_UPLINK,
             integrity_key=integrity_key_tx, cipher_key=cipher_key_shared,
-            integrity_enabled=params['integrity_enabled'], ciphering_enabled=params['ciphering_enabled']
+            integrity_enabled=params['integrity_enabled'], ciphering_enabled=params['ciphering_enabled'],
+            tracer=tracer
         )
         pdcp_rx = PDCPReceiver(
             bearer_id=app_config.BEARER_ID_DRB1, direction=app_config.DIRECTION_UPLINK,
             integrity_key=integrity_key_rx, cipher_key=cipher_key_shared,
-            integrity_enabled=params['integrity_enabled'], ciphering_enabled=params['ciphering_enabled']
+            integrity_enabled=params['integrity_enabled'], ciphering_enabled=params['ciphering_enabled'],
+            tracer=tracer
         )
         channel = ImpairedChannel(
             loss_rate=params['loss_rate'],
@@ -110,7 +123,8 @@ def run_simulation_thread_function(sim_id, params):
             corruption_rate=params['corruption_rate'],
             duplication_rate=params.get('duplication_rate', 0.0), 
             reordering_rate=params.get('reordering_rate', 0.0),   
-            max_reorder_delay=params.get('max_reorder_delay', 0) 
+            max_reorder_delay=params.get('max_reorder_delay', 0),
+            tracer=tracer
         )
 
         num_sdus = params['num_sdus']
@@ -168,12 +182,16 @@ def run_simulation_thread_function(sim_id, params):
                 # If not found or status didn't change (e.g. it was already there from a previous step), this is fine.
                 # The goal is that rx_input_pdus reflects the final state after pdcp_rx.receive_pdu.
 
-                if pdu_rx_in.status == "Delivered":
+                if pdu_rx_in.status == PDUStatus.DELIVERED:
                     current_pipeline['delivered_pdus'].append(updated_pdu_rx_in_dict)
-                elif pdu_rx_in.status.startswith("Discarded"):
+                elif pdu_rx_in.status.is_discarded:
                     current_pipeline['discarded_pdus'].append(updated_pdu_rx_in_dict)
 
+            pdcp_rx.clock.advance(1) # One simulation slot per SDU; runs t-Reordering expiries
+
             # Update session incrementally
+            sim_log_handler.add_lines(tracer.render(since=trace_rendered))
+            trace_rendered = tracer.sequence
             current_sim_state['logs'] = sim_log_handler.get_logs()
             current_sim_state['stats'] = pdcp_rx.get_stats()
             # current_pipeline is already being modified in place
@@ -190,11 +208,14 @@ def run_simulation_thread_function(sim_id, params):
                 if p_dict_flush['sdu_id'] == pdu_rx_in.sdu_id and p_dict_flush['status'] != updated_pdu_rx_in_dict['status']:
                     current_pipeline['rx_input_pdus'][i_flush_pdu] = updated_pdu_rx_in_dict
                     break
-            if pdu_rx_in.status == "Delivered":
+            if pdu_rx_in.status == PDUStatus.DELIVERED:
                 current_pipeline['delivered_pdus'].append(updated_pdu_rx_in_dict)
-            elif pdu_rx_in.status.startswith("Discarded"):
+            elif pdu_rx_in.status.is_discarded:
                 current_pipeline['discarded_pdus'].append(updated_pdu_rx_in_dict)
 
+        pdcp_rx.clock.run_until_idle() # Let t-Reordering give up on PDUs that never arrived
+        sim_log_handler.add_lines(tracer.render(since=trace_rendered))
+
         # Final update of session state before completing
         final_stats = pdcp_rx.get_stats()
         current_sim_state['stats'] = final_stats
@@ -239,7 +260,7 @@ def pdu_to_dict(pdu):
         "mac_i_hex": pdu.mac_i.hex() if pdu.mac_i else None,
         "is_tampered_by_channel": pdu.is_tampered_by_channel,
         "is_corrupted_by_channel": pdu.is_corrupted_by_channel,
-        "integrity_verified": pdu.integrity_verified, "status": pdu.status
+        "integrity_verified": pdu.integrity_verified, "status": pdu.status.label
     }
 
 @app.route('/')
@@ -351,5 +372,6 @@ if __name__ == '__main__':
         plotting_logger.addHandler(console_handler)
     plotting_logger.setLevel(logging.DEBUG) # Set to DEBUG for plotting issues
 
+    crypto_backends.configure(app_config.CRYPTO_BACKEND)
     app_specific_logger.info("Starting PDCP Simulation Flask App...")
     app.run(debug=True, threaded=True, use_reloader=False) # use_reloader=False can sometimes help with thread issues in dev
\ No newline at end of file
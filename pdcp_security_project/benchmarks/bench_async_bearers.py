@@ -0,0 +1,88 @@
+# pdcp_security_project/benchmarks/bench_async_bearers.py
+"""
+Many concurrent bearers on one asyncio event loop against one thread per bearer.
+
+Every bearer sends SDUS_PER_BEARER SDUs, one every SDU_INTERVAL seconds, over a channel with
+CHANNEL_DELAY seconds of latency. The asyncio run multiplexes all bearers on one loop with
+run_bearer(); the threaded run gives each bearer a thread that sleeps between SDUs and between
+sending and receiving, as a thread-per-simulation driver would. Reported: wall time, process CPU time
+per delivered SDU and peak thread count.
+Run from the project directory: python -m benchmarks.bench_async_bearers
+"""
+import asyncio
+import logging
+import threading
+import time
+
+from src.async_pdcp import AsyncPDCPTransmitter, AsyncPDCPReceiver, AsyncImpairedChannel, run_bearer
+from src.delivery_sink import ListSink
+from src.pdcp_entity import PDCPTransmitter, PDCPReceiver
+from src.streaming import seeded_sdu_payload
+
+BEARER_COUNTS = [10, 100, 1000]
+SDUS_PER_BEARER = 20
+SDU_INTERVAL = 0.005
+CHANNEL_DELAY = 0.002
+SDU_SIZE = 100
+KEY = bytes(range(16))
+
+
+def _entity_args(bearer_id):
+    return dict(bearer_id=bearer_id % 32, direction=0, integrity_key=KEY, cipher_key=KEY,
+                integrity_enabled=True, ciphering_enabled=True)
+
+
+def _sdus():
+    return [(i, seeded_sdu_payload(i, SDU_SIZE)) for i in range(SDUS_PER_BEARER)]
+
+
+def _run_async(num_bearers):
+    async def scenario():
+        runs = []
+        for bearer_id in range(num_bearers):
+            rx = AsyncPDCPReceiver(PDCPReceiver(t_reordering=0.05, delivery_sink=ListSink(), **_entity_args(bearer_id)))
+            channel = AsyncImpairedChannel(rx.feed, base_delay=CHANNEL_DELAY)
+            tx = AsyncPDCPTransmitter(PDCPTransmitter(**_entity_args(bearer_id)))
+            runs.append(run_bearer(tx, channel, rx, _sdus(), sdu_interval=SDU_INTERVAL))
+        results = await asyncio.gather(*runs)
+        return sum(stats["successful_deliveries"] for stats in results), 1
+    return asyncio.run(scenario())
+
+
+def _run_threads(num_bearers):
+    delivered = [0] * num_bearers
+    peak = threading.active_count()
+
+    def bearer(index):
+        tx = PDCPTransmitter(**_entity_args(index))
+        rx = PDCPReceiver(t_reordering=0.05, delivery_sink=ListSink(), **_entity_args(index))
+        for sdu_id, payload in _sdus():
+            pdu = tx.send_sdu(sdu_id, payload)
+            time.sleep(CHANNEL_DELAY)
+            rx.receive_pdus([pdu.copy()])
+            time.sleep(max(0.0, SDU_INTERVAL - CHANNEL_DELAY))
+        delivered[index] = rx.get_stats()["successful_deliveries"]
+
+    threads = [threading.Thread(target=bearer, args=(i,)) for i in range(num_bearers)]
+    for thread in threads:
+        thread.start()
+    peak = max(peak, threading.active_count()) - 1 # Not counting the main thread
+    for thread in threads:
+        thread.join()
+    return sum(delivered), peak
+
+
+def main():
+    logging.disable(logging.WARNING)
+    print(f"{'bearers':>7} {'driver':>8} {'delivered':>9} {'wall s':>7} {'CPU us/SDU':>10} {'threads':>7}")
+    for num_bearers in BEARER_COUNTS:
+        for name, run in (("asyncio", _run_async), ("threads", _run_threads)):
+            wall_start, cpu_start = time.perf_counter(), time.process_time()
+            delivered, threads = run(num_bearers)
+            wall, cpu = time.perf_counter() - wall_start, time.process_time() - cpu_start
+            print(f"{num_bearers:>7} {name:>8} {delivered:>9} {wall:>7.2f} {cpu / max(delivered, 1) * 1e6:>10.1f} "
+                  f"{threads:>7}")
+
+
+if __name__ == "__main__":
+    main()
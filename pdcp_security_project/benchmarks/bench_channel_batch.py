@@ -0,0 +1,63 @@
+# pdcp_security_project/benchmarks/bench_channel_batch.py
+"""
+ImpairedChannel cost per PDU: the per-PDU reference loop (a list of PDCP_PDU) against the
+vectorised transmit_batch (a PDUBatch), for several burst sizes with and without impairments. transmit() switches to transmit_batch from
+BATCH_MIN_PDUS PDUs, around where the two cross over.
+Times are process CPU time for NUM_PDUS PDUs sent in bursts, flush included.
+Run from the project directory: python -m benchmarks.bench_channel_batch
+"""
+import logging
+import random
+import time
+
+from src.channel_simulator import ImpairedChannel
+from src.pdcp_packet import PDUBatch
+from src.streaming import seeded_sdu_payload
+
+NUM_PDUS = 20000
+BURST_SIZES = [16, 64, 256, 1024]
+SDU_SIZE = 100
+IMPAIRMENTS = dict(loss_rate=0.01, duplication_rate=0.01, reordering_rate=0.05, max_reorder_delay=3,
+                   corruption_rate=0.01, tampering_rate=0.02)
+REPEATS = 3
+
+
+def _bursts(burst_size):
+    bursts = []
+    for first in range(0, NUM_PDUS, burst_size):
+        batch = PDUBatch()
+        for i in range(first, min(first + burst_size, NUM_PDUS)):
+            batch.append(i, i & 0xFFF, i, i >> 12, seeded_sdu_payload(i, SDU_SIZE))
+        bursts.append(batch)
+    return bursts
+
+
+def _cpu_us_per_pdu(bursts, impairments, vectorised):
+    best = float('inf')
+    for _ in range(REPEATS):
+        random.seed(0)
+        channel = ImpairedChannel(**impairments)
+        send = channel.transmit_batch if vectorised else channel.transmit
+        start = time.process_time()
+        for burst in bursts:
+            send(burst)
+        channel.flush_reorder_buffer()
+        best = min(best, time.process_time() - start)
+    return best / NUM_PDUS * 1e6
+
+
+def main():
+    logging.disable(logging.INFO)
+    print(f"{'burst':>6} {'impaired':>8} {'per-PDU us':>10} {'batch us':>9} {'speedup':>8}")
+    for burst_size in BURST_SIZES:
+        batches = _bursts(burst_size)
+        lists = [batch.to_pdus() for batch in batches]
+        for impairments in ({}, IMPAIRMENTS):
+            reference = _cpu_us_per_pdu(lists, impairments, False)
+            vectorised = _cpu_us_per_pdu(batches, impairments, True)
+            print(f"{burst_size:>6} {'yes' if impairments else 'no':>8} {reference:>10.2f} {vectorised:>9.2f} "
+                  f"{reference / vectorised:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
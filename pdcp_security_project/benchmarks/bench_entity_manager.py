@@ -0,0 +1,33 @@
+# pdcp_security_project/benchmarks/bench_entity_manager.py
+"""
+Scaling of the sharded entity manager with the number of worker processes.
+
+Every UE has SRB1 and three DRBs in both directions; the same UE population is run with
+1, 2, 4, ... workers and the aggregate throughput and speed-up over one worker are printed.
+Run from the project directory: python -m benchmarks.bench_entity_manager
+"""
+import logging
+import os
+
+from src.entity_manager import run_sharded
+
+NUM_UES = 256
+SDUS_PER_BEARER = 64
+SDU_PAYLOAD_SIZE = 500
+
+
+def main():
+    logging.disable(logging.INFO)
+    worker_counts = sorted({1, 2, 4, 8, os.cpu_count() or 1})
+    print(f"{NUM_UES} UEs x 8 bearers x {SDUS_PER_BEARER} SDUs of {SDU_PAYLOAD_SIZE} bytes, {os.cpu_count()} CPUs")
+    print(f"{'workers':>8} {'seconds':>9} {'Mbit/s':>9} {'speed-up':>9}")
+    baseline = None
+    for workers in worker_counts:
+        aggregate = run_sharded(NUM_UES, SDUS_PER_BEARER, SDU_PAYLOAD_SIZE, num_workers=workers)["aggregate"]
+        baseline = baseline or aggregate["elapsed_seconds"]
+        print(f"{workers:>8} {aggregate['elapsed_seconds']:>9.2f} {aggregate['throughput_mbps']:>9.1f} "
+              f"{baseline / aggregate['elapsed_seconds']:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+# pdcp_security_project/benchmarks/bench_link_scaling.py
+"""
+Per-link cost of the entity manager as links are added.
+
+For growing UE populations (SRB1 and three DRBs in both directions, 8 links per UE) one manager
+is built under tracemalloc and run for a few bursts. Printed per link: memory held after setup,
+setup time, and traffic time per SDU. Flat columns mean state and work grow linearly with the
+number of links.
+Run from the project directory: python -m benchmarks.bench_link_scaling
+"""
+import logging
+import time
+import tracemalloc
+
+from src.entity_manager import PDCPEntityManager
+from src import tracing
+
+UE_COUNTS = (16, 64, 256, 1024)
+SDUS_PER_BEARER = 32
+SDU_PAYLOAD_SIZE = 200
+
+
+def measure(num_ues: int) -> dict:
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    start = time.perf_counter()
+    manager = PDCPEntityManager()
+    for ue_id in range(num_ues):
+        manager.add_ue(ue_id)
+    setup_seconds = time.perf_counter() - start
+    setup_bytes = tracemalloc.get_traced_memory()[0] - baseline
+    tracemalloc.stop() # Not traced while timing the traffic
+    stats = manager.run_traffic(SDUS_PER_BEARER, SDU_PAYLOAD_SIZE)["aggregate"]
+    links = len(manager.links)
+    return {"links": links, "bytes_per_link": setup_bytes / links, "setup_us_per_link": setup_seconds / links * 1e6,
+            "traffic_us_per_sdu": stats["elapsed_seconds"] / stats["sdus_sent"] * 1e6}
+
+
+def main():
+    logging.disable(logging.INFO)
+    tracing.default_tracer.disable()
+    print(f"{SDUS_PER_BEARER} SDUs of {SDU_PAYLOAD_SIZE} bytes per link")
+    print(f"{'links':>7} {'bytes/link':>11} {'setup us/link':>14} {'traffic us/SDU':>15}")
+    for num_ues in UE_COUNTS:
+        result = measure(num_ues)
+        print(f"{result['links']:>7} {result['bytes_per_link']:>11.0f} {result['setup_us_per_link']:>14.1f} "
+              f"{result['traffic_us_per_sdu']:>15.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+# pdcp_security_project/benchmarks/bench_replay_filter.py
+"""
+Receiver CPU time per arriving PDU as the share of duplicated and replayed PDUs grows.
+
+Each burst carries BURST_SIZE fresh PDUs plus extra copies making up the given share of the
+arrivals: half are duplicates of PDUs in the same burst (as ImpairedChannel duplication produces),
+half are replays of PDUs from earlier bursts that are still inside the replay window. Both kinds are
+dropped by the pre-filter before deciphering and MAC verification, so the cost per PDU should fall as
+their share rises. Times are process CPU time for PDCPReceiver.receive_pdus.
+Run from the project directory: python -m benchmarks.bench_replay_filter
+"""
+import logging
+import random
+import time
+
+from src.pdcp_entity import PDCPTransmitter, PDCPReceiver
+from src.streaming import seeded_sdu_payload
+
+DUPLICATE_RATIOS = [0.0, 0.1, 0.25, 0.5]
+NUM_BURSTS = 200
+BURST_SIZE = 32
+SDU_SIZE = 100
+REPEATS = 3
+
+
+def _arrivals(pdus, ratio, rng):
+    """Bursts of fresh PDUs mixed with in-burst duplicates and replays so that `ratio` of all arrivals are copies."""
+    copies_per_burst = round(BURST_SIZE * ratio / (1 - ratio))
+    bursts = []
+    for start in range(0, len(pdus), BURST_SIZE):
+        burst = [pdu.copy() for pdu in pdus[start:start + BURST_SIZE]]
+        earlier = pdus[max(0, start - 512):start] or pdus[start:start + BURST_SIZE]
+        for i in range(copies_per_burst):
+            source = burst if i % 2 == 0 else earlier
+            burst.insert(rng.randrange(len(burst) + 1), rng.choice(source).copy())
+        bursts.append(burst)
+    return bursts
+
+
+def _run(bursts, args):
+    rx = PDCPReceiver(t_reordering=None, **args)
+    start = time.process_time()
+    for burst in bursts:
+        rx.receive_pdus(burst)
+    elapsed = time.process_time() - start
+    return elapsed, rx.get_stats()
+
+
+def main():
+    logging.disable(logging.WARNING)
+    args = dict(bearer_id=5, direction=0, integrity_key=b"I" * 16, cipher_key=b"C" * 16,
+                integrity_enabled=True, ciphering_enabled=True)
+    pdus = PDCPTransmitter(**args).send_sdus((i, seeded_sdu_payload(i, SDU_SIZE)) for i in range(NUM_BURSTS * BURST_SIZE))
+    print(f"{'copies':>7} {'arrivals':>8} {'discarded':>9} {'us/PDU':>7} {'us/fresh PDU':>12}")
+    for ratio in DUPLICATE_RATIOS:
+        bursts = _arrivals(pdus, ratio, random.Random(1))
+        arrivals = sum(len(burst) for burst in bursts)
+        elapsed, stats = min((_run([[pdu.copy() for pdu in burst] for burst in bursts], args) for _ in range(REPEATS)),
+                             key=lambda result: result[0])
+        discarded = stats["discarded_duplicates"] + stats["discarded_old_packets"]
+        print(f"{ratio:>7.0%} {arrivals:>8} {discarded:>9} {elapsed / arrivals * 1e6:>7.2f} "
+              f"{elapsed / stats['successful_deliveries'] * 1e6:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
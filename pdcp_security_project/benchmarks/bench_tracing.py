@@ -0,0 +1,48 @@
+# pdcp_security_project/benchmarks/bench_tracing.py
+"""
+Cost of per-PDU event tracing on the simulation hot path.
+
+The same SDUs go through PDCPTransmitter.send_sdu, ImpairedChannel.transmit and
+PDCPReceiver.receive_pdu with tracing disabled, with every category enabled, and with every
+category enabled plus rendering the trace to text afterwards (what the CLI and UI do).
+Run from the project directory: python -m benchmarks.bench_tracing
+"""
+import logging
+import time
+
+from src import tracing
+from src.channel_simulator import ImpairedChannel
+from src.pdcp_entity import PDCPTransmitter, PDCPReceiver
+from src.streaming import seeded_sdu_payload
+
+NUM_SDUS = 5000
+REPEATS = 3
+
+
+def _run(categories, render):
+    tracer = tracing.TraceBuffer(NUM_SDUS * 8, categories)
+    args = dict(bearer_id=5, direction=0, integrity_key=b"I" * 16, cipher_key=b"C" * 16,
+                integrity_enabled=True, ciphering_enabled=True, tracer=tracer)
+    tx, rx = PDCPTransmitter(**args), PDCPReceiver(t_reordering=None, **args)
+    channel = ImpairedChannel(loss_rate=0.01, tampering_rate=0.01, tracer=tracer)
+    payloads = [seeded_sdu_payload(i, 100) for i in range(NUM_SDUS)]
+    start = time.perf_counter()
+    for sdu_id, payload in enumerate(payloads):
+        for pdu in channel.transmit([tx.send_sdu(sdu_id, payload)]):
+            rx.receive_pdu(pdu)
+    if render:
+        tracer.render()
+    return time.perf_counter() - start, len(tracer)
+
+
+def main():
+    logging.disable(logging.WARNING)
+    print(f"{'mode':>18} {'us/SDU':>8} {'events':>8}")
+    for name, categories, render in (("disabled", "", False), ("all categories", "all", False),
+                                     ("all + render", "all", True)):
+        elapsed, events = min(_run(categories, render) for _ in range(REPEATS))
+        print(f"{name:>18} {elapsed / NUM_SDUS * 1e6:>8.1f} {events:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+# pdcp_security_project/benchmarks/bench_udc.py
+"""
+UDC compression ratio and compress/decompress throughput per SDU size, with and without a
+preset dictionary.
+
+Sizes are config.SDU_PAYLOAD_SIZE_BYTES and multiples of it. Two payload kinds are used: the
+simulator's SDUs (a text prefix and hex-encoded random bytes) and JSON event records, the kind of
+text-heavy uplink traffic UDC is meant for.
+Run from the project directory: python -m benchmarks.bench_udc
+"""
+import json
+import random
+
+import config
+from src.streaming import seeded_sdu_payload
+from src.udc import UDCCompressor, UDCDecompressor
+
+NUM_SDUS = 2000
+SIZE_MULTIPLES = [1, 4, 14]
+JSON_DICTIONARY = b'{"ue": , "event": "page_view", "path": "/api/v1/items/", "status": 200, "latency_ms": }'
+
+
+def json_payload(sdu_id, size):
+    rng = random.Random(sdu_id)
+    records = []
+    while len(b"\n".join(records)) < size:
+        records.append(json.dumps({"ue": rng.randrange(100), "event": rng.choice(["page_view", "click", "scroll"]),
+                                   "path": f"/api/v1/items/{rng.randrange(10000)}", "status": 200,
+                                   "latency_ms": rng.randrange(500)}).encode())
+    return b"\n".join(records)[:size]
+
+
+def _run(payloads, dictionary):
+    compressor, decompressor = UDCCompressor(dictionary), UDCDecompressor(dictionary)
+    for payload in payloads:
+        assert decompressor.decompress(compressor.compress(payload)) == payload
+    return compressor.get_stats(), decompressor.get_stats()
+
+
+def main():
+    print(f"{'payload':>8} {'SDU B':>6} {'dictionary':>10} {'ratio':>6} {'compress Mbps':>13} {'decompress Mbps':>15}")
+    for kind, make_payload in (("sim", seeded_sdu_payload), ("json", json_payload)):
+        for multiple in SIZE_MULTIPLES:
+            size = config.SDU_PAYLOAD_SIZE_BYTES * multiple
+            payloads = [make_payload(i, size) for i in range(NUM_SDUS)]
+            for dictionary in (None, JSON_DICTIONARY):
+                tx_stats, rx_stats = _run(payloads, dictionary)
+                print(f"{kind:>8} {size:>6} {'yes' if dictionary else 'no':>10} "
+                      f"{tx_stats['udc_compression_ratio']:>6.2f} "
+                      f"{tx_stats['udc_compression_throughput_mbps']:>13.1f} "
+                      f"{rx_stats['udc_decompression_throughput_mbps']:>15.1f}")
+
+
+if __name__ == "__main__":
+    main()
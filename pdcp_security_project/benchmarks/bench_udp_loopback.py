@@ -0,0 +1,76 @@
+# pdcp_security_project/benchmarks/bench_udp_loopback.py
+"""
+Throughput and latency ceiling of the whole stack over real UDP on the loopback interface.
+
+SDUs are protected in bursts of BURST_SIZE, sent through a UDPLoopbackLink (PDUs packed into
+datagrams of the given size) and read back in bulk by the receiver, all on one thread. Reported per
+datagram size, with and without user-space impairments: delivered PDUs/s, PDUs per datagram, and
+latency from handing the SDU to the transmitter to its delivery by the receiver (p50/p99, in
+microseconds). The receiver's clock follows wall time, so t-Reordering is T_REORDERING seconds.
+Run from the project directory: python -m benchmarks.bench_udp_loopback
+"""
+import collections
+import logging
+import time
+
+from src.channel_simulator import ImpairedChannel
+from src.delivery_sink import CallbackSink
+from src.pdcp_entity import PDCPTransmitter, PDCPReceiver, histogram_percentiles
+from src.streaming import seeded_sdu_payload
+from src.udp_transport import UDPLoopbackLink
+
+NUM_SDUS = 20000
+BURST_SIZE = 64
+SDU_SIZE = 100
+DATAGRAM_SIZES = [1472, 8192, 65507]
+T_REORDERING = 0.02 # Above the impairments' reordering delay (2 bursts of a few ms)
+IMPAIRMENTS = {"loss_rate": 0.01, "reordering_rate": 0.05, "max_reorder_delay": 2}
+KEY = bytes(range(16))
+
+
+def _run(datagram_bytes, impairments):
+    args = dict(bearer_id=5, direction=0, integrity_key=KEY, cipher_key=KEY,
+                integrity_enabled=True, ciphering_enabled=True)
+    sent_at = {}
+    latencies_us = collections.Counter()
+
+    def delivered(record):
+        latencies_us[int((time.perf_counter() - sent_at.pop(record['count'])) * 1e6)] += 1
+
+    tx = PDCPTransmitter(**args)
+    rx = PDCPReceiver(t_reordering=T_REORDERING, delivery_sink=CallbackSink(delivered), **args)
+    channel = ImpairedChannel(**impairments) if impairments else None
+    payloads = [seeded_sdu_payload(i, SDU_SIZE) for i in range(BURST_SIZE)]
+    start = time.perf_counter()
+    with UDPLoopbackLink(tx, rx, impairments=channel, datagram_bytes=datagram_bytes) as link:
+        for first in range(0, NUM_SDUS, BURST_SIZE):
+            now = time.perf_counter()
+            burst = [(first + i, payload) for i, payload in enumerate(payloads[:NUM_SDUS - first])]
+            pdus = tx.send_sdus(burst, as_batch=True)
+            for count in pdus.counts:
+                sent_at[count] = now
+            link.send(pdus)
+            rx.clock.advance_to(time.perf_counter() - start)
+            link.receive()
+        link.flush()
+        while link.receive(timeout=T_REORDERING)[0] or rx.clock.next_deadline() is not None:
+            rx.clock.advance_to(time.perf_counter() - start)
+        elapsed = time.perf_counter() - start
+        link_stats = link.get_stats()
+    delivered_count = sum(latencies_us.values())
+    return delivered_count / elapsed, delivered_count / max(link_stats["datagrams_received"], 1), \
+        histogram_percentiles(latencies_us, (50, 99)), NUM_SDUS - delivered_count
+
+
+def main():
+    logging.disable(logging.WARNING)
+    print(f"{'datagram':>8} {'impaired':>8} {'PDUs/s':>9} {'PDUs/dgram':>10} {'p50 us':>7} {'p99 us':>7} {'undelivered':>11}")
+    for datagram_bytes in DATAGRAM_SIZES:
+        for impairments in (None, IMPAIRMENTS):
+            rate, per_datagram, latency, lost = _run(datagram_bytes, impairments)
+            print(f"{datagram_bytes:>8} {'yes' if impairments else 'no':>8} {rate:>9,.0f} {per_datagram:>10.1f} "
+                  f"{latency[50]:>7} {latency[99]:>7} {lost:>11}")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,6 +4,12 @@
 SN_LENGTH_BITS = 12  # Can be 12 or 18
 HFN_LENGTH_BITS = 32 - SN_LENGTH_BITS  # <--- CRUCIAL LINE
 WINDOW_SIZE = 2**(SN_LENGTH_BITS - 1)
+T_REORDERING = 8          # t-Reordering in simulation slots (one slot per SDU sent); None disables it
+
+# Retransmission (PDCP status reports)
+TX_BUFFER_MAX_BYTES = 0   # Protected PDUs kept for retransmission, oldest dropped beyond this; 0 disables the buffer
+DISCARD_TIMER = None      # discardTimer in simulation slots; None is infinity
+STATUS_REPORT_INTERVAL = 16 # Slots between the receiver's status reports when retransmission is simulated
 
 # Channel Simulation Parameters
 LOSS_RATE = 0.01          # Packet loss rate (0.0 to 1.0)
@@ -12,6 +18,14 @@ REORDERING_RATE = 0.00    # Probability of a packet being reordered
 MAX_REORDER_DELAY = 0     # Max "slots" a packet can be delayed if reordered
 CORRUPTION_RATE = 0.01    # Rate of random bit corruption (simpler than tampering for now)
 
+# Multi-leg transmission (main.run_simulation_multipath): "duplicate" sends every PDU on every leg
+# (PDCP duplication), "split" spreads PDUs round-robin. Each leg is a dict of ImpairedChannel arguments.
+MULTIPATH_MODE = "duplicate"
+MULTIPATH_LEGS = [
+    {"loss_rate": 0.05, "base_delay": 1},
+    {"loss_rate": 0.10, "base_delay": 4, "reordering_rate": 0.1, "max_reorder_delay": 3},
+]
+
 # Integrity Protection Parameters
 INTEGRITY_ENABLED_FOR_SRB = True # Signaling Radio Bearers always have integrity
 INTEGRITY_ENABLED_FOR_DRB = True # Data Radio Bearers (user plane)
@@ -22,6 +36,7 @@ INTEGRITY_KEY_LENGTH_BYTES = 16  # 128-bit key
 CIPHERING_ENABLED_FOR_SRB = True
 CIPHERING_ENABLED_FOR_DRB = True
 CIPHER_KEY_LENGTH_BYTES = 16     # 128-bit key
+CRYPTO_BACKEND = "pycryptodome"  # "pycryptodome", "numpy", "cryptography" or "auto" (autotune at startup)
 
 # Simulation Settings
 NUM_SDUS = 100
@@ -32,4 +47,9 @@ DIRECTION_UPLINK = 0
 DIRECTION_DOWNLINK = 1
 
 # Logging
-LOG_LEVEL = "INFO" # DEBUG, INFO, WARNING, ERROR
\ No newline at end of file
+LOG_LEVEL = "INFO" # DEBUG, INFO, WARNING, ERROR
+
+# Per-PDU event tracing (src/tracing.py): comma-separated categories "tx", "channel", "rx",
+# "reordering" or "all"; empty disables it. The last TRACE_BUFFER_EVENTS events are kept.
+TRACE_CATEGORIES = ""
+TRACE_BUFFER_EVENTS = 65536
\ No newline at end of file
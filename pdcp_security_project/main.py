@@ -2,10 +2,17 @@
 import random
 import logging
 import os # For os.urandom()
-from src.pdcp_entity import PDCPTransmitter, PDCPReceiver
+import collections
+import time
+from src.pdcp_entity import PDCPTransmitter, PDCPReceiver, histogram_percentiles
+from src.delivery_sink import CallbackSink
 from src.channel_simulator import ImpairedChannel
+from src.multipath import MultiPathChannel
 from src.crypto_stub import generate_key
 from src import cipher_stub # For cipher key generation
+from src import crypto_backends
+from src import tracing
+from src.streaming import make_sdu_payload, seeded_sdu_payload, run_streaming, DEFAULT_BURST_SIZE
 import config
 
 # Configure logging
@@ -26,6 +33,20 @@ def run_simulation_basic(num_sdus, sdu_payload_size,
     logger.info(f"Channel Params: {channel_params}")
     if specific_tamper_sdu_id is not None:
         logger.info(f"Specifically tampering SDU ID: {specific_tamper_sdu_id}")
+    trace_start = tracing.default_tracer.sequence
+
+    transmitted_pdus_log = []
+    received_at_rx_log = []
+    sdu_payloads_sent = {} # Payloads awaiting delivery
+    delivered_sdu_ids = []
+
+    def check_delivered(delivered):
+        """Delivery sink callback: compares each SDU with what was sent as soon as it is delivered."""
+        delivered_sdu_ids.append(delivered['sdu_id'])
+        original_payload = sdu_payloads_sent.pop(delivered['sdu_id'], None)
+        if original_payload != delivered['payload']:
+            logger.error(f"Payload Mismatch for SDU ID {delivered['sdu_id']}! "
+                         f"Original len: {len(original_payload if original_payload else b'')}, Delivered len: {len(delivered['payload'] if delivered['payload'] else b'')}")
 
     # Initialize PDCP entities
     pdcp_tx = PDCPTransmitter(bearer_id=config.BEARER_ID_DRB1,
@@ -42,33 +63,13 @@ def run_simulation_basic(num_sdus, sdu_payload_size,
                             cipher_key=cipher_key_rx,
                             integrity_enabled=rx_integrity_enabled,
                             ciphering_enabled=rx_ciphering_enabled,
-                            sn_length_bits=config.SN_LENGTH_BITS)
+                            sn_length_bits=config.SN_LENGTH_BITS,
+                            delivery_sink=CallbackSink(check_delivered))
 
     channel = ImpairedChannel(**channel_params)
 
-    transmitted_pdus_log = []
-    received_at_rx_log = []
-    sdu_payloads_sent = {}
-
     for sdu_id in range(num_sdus):
-        # SDU PAYLOAD GENERATION
-        base_string = f"SDU_{sdu_id}_Data_"
-        remaining_length_for_random_part = sdu_payload_size - len(base_string.encode('utf-8'))
-        
-        random_hex_data = ""
-        if remaining_length_for_random_part > 0:
-            num_bytes_from_os_urandom = remaining_length_for_random_part // 2
-            if num_bytes_from_os_urandom > 0:
-                random_hex_data = os.urandom(num_bytes_from_os_urandom).hex()
-        
-        payload_content_str = base_string + random_hex_data
-        sdu_payload = payload_content_str.encode('utf-8')
-
-        if len(sdu_payload) > sdu_payload_size:
-            sdu_payload = sdu_payload[:sdu_payload_size]
-        elif len(sdu_payload) < sdu_payload_size:
-            sdu_payload += b'\x00' * (sdu_payload_size - len(sdu_payload))
-        # END OF SDU PAYLOAD GENERATION
+        sdu_payload = make_sdu_payload(sdu_id, sdu_payload_size, os.urandom)
 
         sdu_payloads_sent[sdu_id] = sdu_payload
 
@@ -78,16 +79,15 @@ def run_simulation_basic(num_sdus, sdu_payload_size,
         pdus_for_channel = [pdu]
         arrived_pdus = channel.transmit(pdus_for_channel)
         
-        for arrived_pdu in arrived_pdus:
-            received_at_rx_log.append(arrived_pdu)
-            pdcp_rx.receive_pdu(arrived_pdu)
+        received_at_rx_log.extend(arrived_pdus)
+        pdcp_rx.receive_pdus(arrived_pdus) # Whole channel burst deciphered/verified together
+        pdcp_rx.clock.advance(1) # One simulation slot per SDU; runs t-Reordering expiries
 
     remaining_pdus = channel.flush_reorder_buffer()
-    for pdu in remaining_pdus:
-        received_at_rx_log.append(pdu)
-        pdcp_rx.receive_pdu(pdu)
+    received_at_rx_log.extend(remaining_pdus)
+    pdcp_rx.receive_pdus(remaining_pdus)
+    pdcp_rx.clock.run_until_idle() # Let t-Reordering give up on PDUs that never arrived
 
-    delivered_sdus_info = pdcp_rx.get_delivered_sdus()
     rx_stats = pdcp_rx.get_stats()
 
     logger.info("================== Simulation Ended ==================")
@@ -99,12 +99,10 @@ def run_simulation_basic(num_sdus, sdu_payload_size,
     logger.info(f"RX Discarded - Duplicates: {rx_stats['discarded_duplicates']}")
     logger.info(f"RX Discarded - Old Packets: {rx_stats['discarded_old_packets']}") 
     logger.info(f"RX Packets still in reordering buffer: {rx_stats['buffered_packets']}")
-
-    for delivered in delivered_sdus_info:
-        original_payload = sdu_payloads_sent.get(delivered['sdu_id'])
-        if original_payload != delivered['payload']:
-            logger.error(f"Payload Mismatch for SDU ID {delivered['sdu_id']}! "
-                         f"Original len: {len(original_payload if original_payload else b'')}, Delivered len: {len(delivered['payload'] if delivered['payload'] else b'')}")
+    logger.info(f"RX t-Reordering expiries: {rx_stats['t_reordering_expiries']}, COUNTs skipped: {rx_stats['skipped_counts']}")
+    logger.info(f"RX delivery latency percentiles (slots): {pdcp_rx.get_latency_percentiles()}")
+    if tracing.default_tracer.mask:
+        logger.info("PDU event trace:\n" + "\n".join(tracing.default_tracer.render(since=trace_start)))
 
     return {
         "tx_pdus_count": len(transmitted_pdus_log),
@@ -112,12 +110,125 @@ def run_simulation_basic(num_sdus, sdu_payload_size,
         "delivered_sdus_count": rx_stats['successful_deliveries'],
         "integrity_failures": rx_stats['discarded_integrity_failures'],
         "duplicate_discards": rx_stats['discarded_duplicates'],
-        "delivered_sdu_ids": sorted([item['sdu_id'] for item in delivered_sdus_info]),
+        "delivered_sdu_ids": sorted(delivered_sdu_ids),
         "all_tx_pdus_details": transmitted_pdus_log,
         "all_rx_input_pdus_details": received_at_rx_log,
     }
 
+def run_simulation_streaming(num_sdus, sdu_payload_size,
+                             integrity_enabled, ciphering_enabled,
+                             integrity_key, cipher_key,
+                             channel_params, burst_size=DEFAULT_BURST_SIZE, seed=0):
+    """
+    Runs a simulation as a chain of streaming stages (see src/streaming.py). Nothing per SDU is
+    kept, so memory stays constant and num_sdus can be very large (soak tests).
+    """
+    logger.info("================== Starting Streaming Simulation ==================")
+    logger.info(f"Parameters: Num SDUs: {num_sdus}, Burst size: {burst_size}, Integrity: {integrity_enabled}, "
+                f"Ciphering: {ciphering_enabled}")
+    pdcp_tx = PDCPTransmitter(bearer_id=config.BEARER_ID_DRB1, direction=config.DIRECTION_UPLINK,
+                              integrity_key=integrity_key, cipher_key=cipher_key,
+                              integrity_enabled=integrity_enabled, ciphering_enabled=ciphering_enabled,
+                              sn_length_bits=config.SN_LENGTH_BITS)
+    pdcp_rx = PDCPReceiver(bearer_id=config.BEARER_ID_DRB1, direction=config.DIRECTION_UPLINK,
+                           integrity_key=integrity_key, cipher_key=cipher_key,
+                           integrity_enabled=integrity_enabled, ciphering_enabled=ciphering_enabled,
+                           sn_length_bits=config.SN_LENGTH_BITS)
+    channel = ImpairedChannel(**channel_params)
+
+    stats = run_streaming(pdcp_tx, pdcp_rx, channel, num_sdus, sdu_payload_size, burst_size=burst_size, seed=seed)
+    rx_stats = pdcp_rx.get_stats()
+    logger.info("================== Streaming Simulation Ended ==================")
+    logger.info(f"Stream stats: {stats.as_dict()}")
+    logger.info(f"RX stats: {rx_stats}")
+    return {
+        "tx_pdus_count": stats.pdus_transmitted,
+        "rx_input_pdus_count": stats.pdus_arrived,
+        "delivered_sdus_count": rx_stats['successful_deliveries'],
+        "integrity_failures": rx_stats['discarded_integrity_failures'],
+        "duplicate_discards": rx_stats['discarded_duplicates'],
+        "payload_mismatches": stats.payload_mismatches,
+        "peak_rx_buffered": stats.peak_rx_buffered,
+    }
+
+def run_simulation_multipath(num_sdus, sdu_payload_size,
+                             integrity_enabled, ciphering_enabled,
+                             integrity_key, cipher_key,
+                             leg_params, mode=config.MULTIPATH_MODE, seed=0):
+    """
+    Sends one SDU per slot from one transmitter over the legs of a MultiPathChannel (one leg per entry
+    of leg_params) into one receiver. Reports effective loss, send-to-delivery latency in slots and
+    the receiver's work: PDUs it had to process, copies it discarded and CPU time per delivered SDU.
+    A single-element leg_params gives the single-leg reference run.
+    """
+    logger.info("================== Starting Multipath Simulation ==================")
+    logger.info(f"Parameters: Num SDUs: {num_sdus}, Mode: {mode}, Legs: {leg_params}")
+    pdcp_tx = PDCPTransmitter(bearer_id=config.BEARER_ID_DRB1, direction=config.DIRECTION_UPLINK,
+                              integrity_key=integrity_key, cipher_key=cipher_key,
+                              integrity_enabled=integrity_enabled, ciphering_enabled=ciphering_enabled,
+                              sn_length_bits=config.SN_LENGTH_BITS)
+    sent_at = {} # sdu_id -> slot, until delivered
+    latencies = collections.Counter()
+    payload_mismatches = 0
+
+    def on_delivered(record):
+        nonlocal payload_mismatches
+        latencies[pdcp_rx.clock.now - sent_at.pop(record['sdu_id'])] += 1
+        if record['payload'] != seeded_sdu_payload(record['sdu_id'], sdu_payload_size, seed):
+            payload_mismatches += 1
+            logger.error(f"Payload Mismatch for SDU ID {record['sdu_id']}!")
+
+    pdcp_rx = PDCPReceiver(bearer_id=config.BEARER_ID_DRB1, direction=config.DIRECTION_UPLINK,
+                           integrity_key=integrity_key, cipher_key=cipher_key,
+                           integrity_enabled=integrity_enabled, ciphering_enabled=ciphering_enabled,
+                           sn_length_bits=config.SN_LENGTH_BITS, delivery_sink=CallbackSink(on_delivered))
+    channel = MultiPathChannel(leg_params, mode=mode)
+
+    rx_input_pdus = 0
+    rx_cpu_seconds = 0.0
+
+    def receive(arrived):
+        nonlocal rx_input_pdus, rx_cpu_seconds
+        rx_input_pdus += len(arrived)
+        start = time.process_time()
+        pdcp_rx.receive_pdus(arrived)
+        rx_cpu_seconds += time.process_time() - start
+
+    # Keep slotting after the last SDU until the slowest leg has released everything it holds
+    drain_slots = max(leg.base_delay + leg.max_reorder_delay for leg in channel.legs)
+    for slot in range(num_sdus + drain_slots):
+        pdus = []
+        if slot < num_sdus:
+            sent_at[slot] = pdcp_rx.clock.now
+            pdus = [pdcp_tx.send_sdu(slot, seeded_sdu_payload(slot, sdu_payload_size, seed))]
+        receive(channel.transmit(pdus))
+        pdcp_rx.clock.advance(1)
+    receive(channel.flush_reorder_buffer())
+    pdcp_rx.clock.run_until_idle()
+
+    rx_stats = pdcp_rx.get_stats()
+    delivered = rx_stats['successful_deliveries']
+    results = {
+        "mode": mode,
+        "legs": channel.get_stats()["legs"],
+        "tx_pdus_count": num_sdus,
+        "rx_input_pdus_count": rx_input_pdus,
+        "delivered_sdus_count": delivered,
+        "effective_loss": 1 - delivered / num_sdus if num_sdus else 0.0,
+        "latency_percentiles": histogram_percentiles(latencies),
+        "integrity_failures": rx_stats['discarded_integrity_failures'],
+        "duplicate_discards": rx_stats['discarded_duplicates'],
+        "old_discards": rx_stats['discarded_old_packets'],
+        "rx_cpu_us_per_sdu": rx_cpu_seconds / delivered * 1e6 if delivered else None,
+        "payload_mismatches": payload_mismatches,
+    }
+    logger.info("================== Multipath Simulation Ended ==================")
+    logger.info(f"Multipath results: { {k: v for k, v in results.items() if k != 'legs'} }")
+    return results
+
 if __name__ == "__main__":
+    crypto_backends.configure(config.CRYPTO_BACKEND)
+    tracing.configure(config.TRACE_CATEGORIES, config.TRACE_BUFFER_EVENTS)
     sim_integrity_key = generate_key(config.INTEGRITY_KEY_LENGTH_BYTES)
     sim_cipher_key = cipher_stub.generate_cipher_key(config.CIPHER_KEY_LENGTH_BYTES)
 
@@ -197,4 +308,18 @@ if __name__ == "__main__":
     # Delivered count should be num_sdus if no other impairments (like loss) are active
     assert results_integrity_disabled["delivered_sdus_count"] == 20 
     logger.info(f"Integrity Disabled Scenario: Delivered {results_integrity_disabled['delivered_sdus_count']} SDUs (tampered ones will have corrupt data).")
-    logger.info("Integrity Disabled Scenario completed as expected.")
\ No newline at end of file
+    logger.info("Integrity Disabled Scenario completed as expected.")
+    # Scenario 4: PDCP duplication over two legs, against each leg on its own
+    logger.info("\n--- Running Multipath Duplication Scenario ---")
+    multipath_runs = {"both legs": config.MULTIPATH_LEGS}
+    multipath_runs.update({f"leg {i} only": [leg] for i, leg in enumerate(config.MULTIPATH_LEGS)})
+    for name, legs in multipath_runs.items():
+        results_multipath = run_simulation_multipath(
+            num_sdus=config.NUM_SDUS, sdu_payload_size=config.SDU_PAYLOAD_SIZE_BYTES,
+            integrity_enabled=config.INTEGRITY_ENABLED_FOR_DRB, ciphering_enabled=config.CIPHERING_ENABLED_FOR_DRB,
+            integrity_key=sim_integrity_key, cipher_key=sim_cipher_key, leg_params=legs)
+        logger.info(f"Multipath {name}: effective loss {results_multipath['effective_loss']:.1%}, "
+                    f"latency percentiles (slots) {results_multipath['latency_percentiles']}, "
+                    f"RX input PDUs {results_multipath['rx_input_pdus_count']}, "
+                    f"duplicates discarded {results_multipath['duplicate_discards']}")
+    logger.info("Multipath Duplication Scenario completed.")
@@ -0,0 +1,246 @@
+# pdcp_security_project/src/async_pdcp.py
+"""
+asyncio counterparts of the PDCP entities and the impaired channel, so that many bearers share one
+event loop instead of a thread (and a sleep loop) per simulation.
+
+AsyncPDCPTransmitter and AsyncPDCPReceiver wrap the synchronous entities. Bursts of at least
+offload_threshold PDUs run in an executor (the loop's default one unless given), keeping the loop
+responsive while a burst is protected or deciphered; smaller bursts run inline, where the thread hop
+would cost more than the crypto. An asyncio.Lock per entity makes sure an entity is only ever used
+by one thread at a time.
+
+Time is real: an entity's SimClock follows the loop clock in seconds, so t-Reordering and discardTimer
+are given in seconds. The receive loop sleeps until the next timer deadline when no PDUs arrive.
+AsyncImpairedChannel applies the ImpairedChannel impairments, then delays each PDU (base delay plus
+an optional random reordering delay, in seconds) with loop.call_later.
+
+    rx = AsyncPDCPReceiver(PDCPReceiver(..., t_reordering=0.05, delivery_sink=AsyncQueueSink(1024)))
+    channel = AsyncImpairedChannel(rx.feed, loss_rate=0.01, base_delay=0.002)
+    await run_bearer(AsyncPDCPTransmitter(PDCPTransmitter(...)), channel, rx, sdus, sdu_interval=0.001)
+"""
+import asyncio
+import random
+
+from .channel_simulator import ImpairedChannel
+from .delivery_sink import ListSink
+from .pdcp_entity import PDCPTransmitter, PDCPReceiver
+from .pdcp_packet import PDUFlag, as_pdu_list
+from . import tracing
+
+OFFLOAD_THRESHOLD = 64 # PDUs per burst from which crypto runs in the executor
+
+
+class _LoopClock:
+    """Keeps a SimClock at the event loop's time (seconds), counted from the first sync()."""
+    def __init__(self, clock):
+        self.clock = clock
+        self._epoch = None
+
+    def sync(self):
+        """Advances the SimClock to the loop's current time, firing the timers due by then."""
+        now = asyncio.get_running_loop().time()
+        if self._epoch is None:
+            self._epoch = now - self.clock.now
+        self.clock.advance_to(now - self._epoch)
+
+    def seconds_to_next_timer(self):
+        """Loop seconds until the earliest pending timer is due, or None when none is pending."""
+        deadline = self.clock.next_deadline()
+        if deadline is None:
+            return None
+        now = self.clock.now if self._epoch is None else asyncio.get_running_loop().time() - self._epoch
+        return max(0.0, deadline - now)
+
+
+class AsyncPDCPTransmitter:
+    def __init__(self, transmitter: PDCPTransmitter, executor=None, offload_threshold: int = OFFLOAD_THRESHOLD):
+        self.transmitter = transmitter
+        self.executor = executor
+        self.offload_threshold = offload_threshold
+        self._lock = asyncio.Lock()
+        self._clock = _LoopClock(transmitter.clock) # discardTimer; expiries are applied at each call
+
+    async def send_sdu(self, sdu_id: int, sdu_payload: bytes):
+        async with self._lock:
+            self._clock.sync()
+            return self.transmitter.send_sdu(sdu_id, sdu_payload)
+
+    async def send_sdus(self, sdus, as_batch: bool = False):
+        """PDCPTransmitter.send_sdus, in the executor for bursts of offload_threshold SDUs or more."""
+        sdus = list(sdus)
+        async with self._lock:
+            self._clock.sync()
+            if len(sdus) < self.offload_threshold:
+                return self.transmitter.send_sdus(sdus, as_batch)
+            return await asyncio.get_running_loop().run_in_executor(
+                self.executor, self.transmitter.send_sdus, sdus, as_batch)
+
+    async def receive_status_report(self, report) -> list:
+        async with self._lock:
+            self._clock.sync()
+            return self.transmitter.receive_status_report(report)
+
+
+class AsyncPDCPReceiver:
+    """
+    Receive loop for a PDCPReceiver: run() takes PDU bursts from `queue` (fed by feed() or put()),
+    merges whatever has queued up into one receive_pdus() call, and fires t-Reordering on time even
+    when nothing arrives. Deliveries go to the receiver's delivery sink (e.g. an AsyncQueueSink).
+    """
+    _CLOSED = object()
+
+    def __init__(self, receiver: PDCPReceiver, executor=None, offload_threshold: int = OFFLOAD_THRESHOLD,
+                 maxsize: int = 0):
+        self.receiver = receiver
+        self.executor = executor
+        self.offload_threshold = offload_threshold
+        self.queue = asyncio.Queue(maxsize)
+        self._lock = asyncio.Lock()
+        self._clock = _LoopClock(receiver.clock)
+
+    def feed(self, pdus):
+        """Queues a burst without waiting (for callbacks such as AsyncImpairedChannel's delivery)."""
+        self.queue.put_nowait(as_pdu_list(pdus))
+
+    async def put(self, pdus):
+        """Queues a burst, waiting while a bounded queue is full."""
+        await self.queue.put(as_pdu_list(pdus))
+
+    def close(self):
+        """Ends run() once the bursts already queued are processed."""
+        self.queue.put_nowait(self._CLOSED)
+
+    async def receive_pdus(self, pdus):
+        """PDCPReceiver.receive_pdus at the current loop time, in the executor for large bursts."""
+        pdus = as_pdu_list(pdus)
+        async with self._lock:
+            self._clock.sync()
+            if len(pdus) < self.offload_threshold:
+                return self.receiver.receive_pdus(pdus)
+            # Deliveries made in the worker thread are held back and handed to the sink on the loop,
+            # since sinks such as AsyncQueueSink are not thread-safe
+            sink = self.receiver.delivery_sink
+            held = ListSink()
+            self.receiver.delivery_sink = held if sink is not None else None
+            try:
+                result = await asyncio.get_running_loop().run_in_executor(
+                    self.executor, self.receiver.receive_pdus, pdus)
+            finally:
+                self.receiver.delivery_sink = sink
+            if held.records:
+                sink.deliver(held.records)
+            return result
+
+    async def _get(self, timeout):
+        """
+        Next queued burst, or None if none arrives within timeout seconds (None waits forever). Unlike
+        asyncio.wait_for(queue.get(), timeout), a burst the get has already taken is never dropped when
+        it completes together with the timeout, and an abandoned get never takes a later burst.
+        """
+        if not self.queue.empty():
+            return self.queue.get_nowait()
+        getter = asyncio.ensure_future(self.queue.get())
+        try:
+            await asyncio.wait((getter,), timeout=timeout)
+        finally:
+            if not getter.done():
+                getter.cancel() # Queue.get() leaves the burst queued when cancelled before returning it
+        return getter.result() if getter.done() else None
+
+    async def run(self, flush: bool = True):
+        """
+        Processes queued bursts until close(). With flush, pending t-Reordering timers are then run out
+        (giving up on what never arrived) and the delivery sink is closed.
+        """
+        closed = False
+        while not closed:
+            burst = await self._get(self._clock.seconds_to_next_timer())
+            if burst is None:
+                async with self._lock:
+                    self._clock.sync() # t-Reordering is due
+                continue
+            pdus = []
+            while True:
+                if burst is self._CLOSED:
+                    closed = True
+                else:
+                    pdus.extend(burst)
+                if closed or self.queue.empty():
+                    break
+                burst = self.queue.get_nowait()
+            if pdus:
+                await self.receive_pdus(pdus)
+        if flush:
+            async with self._lock:
+                self.receiver.clock.run_until_idle()
+            close_sink = getattr(self.receiver.delivery_sink, "close", None)
+            if close_sink is not None:
+                close_sink()
+
+
+class AsyncImpairedChannel:
+    """
+    ImpairedChannel with delays in seconds: loss, duplication, corruption and tampering are applied when
+    transmit() is called, then each surviving PDU is handed to deliver(pdus) after base_delay seconds,
+    plus a uniform random delay up to max_reorder_delay for a reordering_rate share of them. PDUs due at
+    the same time are delivered together. deliver runs on the event loop (e.g. AsyncPDCPReceiver.feed).
+    """
+    def __init__(self, deliver, loss_rate=0.0, duplication_rate=0.0, reordering_rate=0.0, max_reorder_delay=0.0,
+                 corruption_rate=0.0, tampering_rate=0.0, base_delay=0.0, tracer: tracing.TraceBuffer = None):
+        self.deliver = deliver
+        self.reordering_rate = reordering_rate
+        self.max_reorder_delay = max_reorder_delay # Seconds
+        self.base_delay = base_delay               # Seconds
+        self._impairments = ImpairedChannel(loss_rate=loss_rate, duplication_rate=duplication_rate,
+                                            corruption_rate=corruption_rate, tampering_rate=tampering_rate,
+                                            tracer=tracer)
+        self.tracer = self._impairments.tracer
+        self.in_flight = 0
+        self._idle = asyncio.Event()
+        self._idle.set()
+
+    def transmit(self, pdus) -> int:
+        """Sends PDUs into the channel. Returns how many will arrive (duplicates included)."""
+        loop = asyncio.get_running_loop()
+        by_delay = {}
+        arrivals = self._impairments.transmit(as_pdu_list(pdus)) # No slot delays: everything comes out now
+        for pdu in arrivals:
+            delay = self.base_delay
+            if random.random() < self.reordering_rate and self.max_reorder_delay > 0:
+                delay += random.uniform(0, self.max_reorder_delay)
+                pdu.flags |= PDUFlag.REORDERED
+                if self.tracer.mask & tracing.CHANNEL:
+                    self._impairments._trace(tracing.CHANNEL_REORDERED, pdu)
+            by_delay.setdefault(delay, []).append(pdu)
+        for delay, due in by_delay.items():
+            self.in_flight += len(due)
+            self._idle.clear()
+            loop.call_later(delay, self._arrive, due)
+        return len(arrivals)
+
+    def _arrive(self, pdus):
+        self.in_flight -= len(pdus)
+        if not self.in_flight:
+            self._idle.set()
+        self.deliver(pdus)
+
+    async def flush(self):
+        """Waits until every PDU in flight has been delivered."""
+        await self._idle.wait()
+
+
+async def run_bearer(tx: AsyncPDCPTransmitter, channel: AsyncImpairedChannel, rx: AsyncPDCPReceiver, sdus,
+                     sdu_interval: float = 0.0) -> dict:
+    """
+    Sends (sdu_id, payload) pairs one every sdu_interval seconds through the channel into the
+    receiver's receive loop, then waits for the channel to drain and the loop to finish.
+    Returns the receiver's stats. Run many of these concurrently to multiplex bearers on one loop.
+    """
+    receive_loop = asyncio.ensure_future(rx.run())
+    for sdu_id, payload in sdus:
+        channel.transmit([await tx.send_sdu(sdu_id, payload)])
+        await asyncio.sleep(sdu_interval)
+    await channel.flush()
+    rx.close()
+    await receive_loop
+    return rx.receiver.get_stats()
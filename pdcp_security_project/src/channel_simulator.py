@@ -1,21 +1,38 @@
 # pdcp_security_project/src/channel_simulator.py
 import random
-import copy
 import logging
+from .pdcp_packet import PDUStatus, PDUFlag, PDUBatch, as_pdu_list
+from . import tracing
+
+try:
+    import numpy as np
+except ImportError: # NumPy is optional, PDUBatch bursts then go through the per-PDU path
+    np = None
 
 logger = logging.getLogger(__name__)
 
+# Below this burst size the fixed per-call cost of transmit_batch's NumPy operations is higher than the per-PDU loop.
+BATCH_MIN_PDUS = 128
+
 class ImpairedChannel:
     def __init__(self, loss_rate=0.0, duplication_rate=0.0, reordering_rate=0.0,
-                 max_reorder_delay=0, corruption_rate=0.0, tampering_rate=0.0):
+                 max_reorder_delay=0, corruption_rate=0.0, tampering_rate=0.0, tracer: tracing.TraceBuffer = None,
+                 base_delay=0):
         self.loss_rate = loss_rate
         self.duplication_rate = duplication_rate
         self.reordering_rate = reordering_rate
         self.max_reorder_delay = max_reorder_delay # Number of "slots" or PDUs
         self.corruption_rate = corruption_rate # Random bit flips on payload
         self.tampering_rate = tampering_rate # "Malicious" bit flips on payload
+        self.base_delay = base_delay # "Slots" every PDU spends in the channel (link latency), before any reordering delay
 
         self.reorder_buffer = [] # Store tuples of (pdu, delay_slots_remaining)
+        self._held = None        # transmit_batch's delayed PDUs: (pool columns, payload arena), see _gather
+        self._rng = None         # NumPy generator for transmit_batch, seeded from `random` on first use
+        self.tracer = tracer if tracer is not None else tracing.default_tracer
+
+    def _trace(self, event: int, pdu):
+        self.tracer.record(event, pdu.sdu_id, pdu.count, pdu.sn, pdu.status)
 
     def _maliciously_tamper(self, pdu_to_tamper):
         """
@@ -37,8 +54,9 @@ class ImpairedChannel:
             
             pdu_to_tamper.payload = bytes(payload_list)
             pdu_to_tamper.is_tampered_by_channel = True # Mark it
-            pdu_to_tamper.status = "Channel_Tampered"
-            logger.warning(f"  [Channel] MALICIOUSLY TAMPERED PDU SDU_ID {pdu_to_tamper.sdu_id} (COUNT {pdu_to_tamper.count})")
+            pdu_to_tamper.status = PDUStatus.CHANNEL_TAMPERED
+            if self.tracer.mask & tracing.CHANNEL:
+                self._trace(tracing.CHANNEL_TAMPERED, pdu_to_tamper)
         return pdu_to_tamper
 
     def _randomly_corrupt(self, pdu_to_corrupt):
@@ -57,28 +75,37 @@ class ImpairedChannel:
             
             pdu_to_corrupt.payload = bytes(payload_list)
             pdu_to_corrupt.is_corrupted_by_channel = True # Mark it
-            pdu_to_corrupt.status = "Channel_Corrupted"
-            logger.info(f"  [Channel] RANDOMLY CORRUPTED PDU SDU_ID {pdu_to_corrupt.sdu_id} (COUNT {pdu_to_corrupt.count}) at byte index {corrupt_idx}")
+            pdu_to_corrupt.status = PDUStatus.CHANNEL_CORRUPTED
+            if self.tracer.mask & tracing.CHANNEL:
+                self._trace(tracing.CHANNEL_CORRUPTED, pdu_to_corrupt)
         return pdu_to_corrupt
 
     def transmit(self, pdus_to_transmit):
         """
         Simulates transmission over an impaired channel.
-        Input: a list of PDCP_PDU objects from the transmitter.
-        Output: a list of PDCP_PDU objects as they would arrive at the receiver.
+        Input: a list of PDCP_PDU objects from the transmitter, or a PDUBatch.
+        Output: a list of PDCP_PDU objects as they would arrive at the receiver (a PDUBatch for a PDUBatch input).
+        PDUBatch bursts of BATCH_MIN_PDUS or more go to transmit_batch when NumPy is installed; this
+        per-PDU loop is the reference implementation it is tested against.
         """
+        if isinstance(pdus_to_transmit, PDUBatch):
+            if np is not None and len(pdus_to_transmit) >= BATCH_MIN_PDUS:
+                return self.transmit_batch(pdus_to_transmit)
+            return PDUBatch.from_pdus(self.transmit(as_pdu_list(pdus_to_transmit)))
+        self._unbatch_held()
         output_pdus = []
         
         # Add new PDUs to reorder buffer along with existing ones
         for pdu in pdus_to_transmit:
-            # Create a deep copy to avoid modifying the original PDU list if it's reused
-            pdu_copy = copy.deepcopy(pdu)
-            pdu_copy.status = "Channel_Transit"
+            # Copy to avoid modifying the original PDU list if it's reused (payloads are shared, never modified in place)
+            pdu_copy = pdu.copy()
+            pdu_copy.status = PDUStatus.CHANNEL_TRANSIT
             
             # 1. Loss
             if random.random() < self.loss_rate:
-                logger.info(f"  [Channel] LOST PDU SDU_ID {pdu_copy.sdu_id} (COUNT {pdu_copy.count})")
-                pdu_copy.status = "Channel_Lost"
+                pdu_copy.status = PDUStatus.CHANNEL_LOST
+                if self.tracer.mask & tracing.CHANNEL:
+                    self._trace(tracing.CHANNEL_LOST, pdu_copy)
                 # Don't add to any further processing if lost
                 continue # Effectively lost
 
@@ -95,17 +122,19 @@ class ImpairedChannel:
 
             # 4. Duplication
             if random.random() < self.duplication_rate:
-                logger.info(f"  [Channel] DUPLICATED PDU SDU_ID {pdu_copy.sdu_id} (COUNT {pdu_copy.count})")
+                if self.tracer.mask & tracing.CHANNEL:
+                    self._trace(tracing.CHANNEL_DUPLICATED, pdu_copy)
                 # Add the original and its duplicate to be potentially reordered
-                self.reorder_buffer.append({'pdu': copy.deepcopy(pdu_copy), 'delay': 0}) # The duplicate
-                pdu_copy.status += "+Duplicated"
+                self.reorder_buffer.append({'pdu': pdu_copy.copy(), 'delay': self.base_delay}) # The duplicate
+                pdu_copy.flags |= PDUFlag.DUPLICATED
 
             # 5. Reordering: Add to buffer with a potential delay
-            delay = 0
+            delay = self.base_delay
             if random.random() < self.reordering_rate and self.max_reorder_delay > 0:
-                delay = random.randint(1, self.max_reorder_delay)
-                logger.info(f"  [Channel] PDU SDU_ID {pdu_copy.sdu_id} (COUNT {pdu_copy.count}) will be reordered with delay {delay}")
-                pdu_copy.status += f"+ReorderDelay({delay})"
+                delay += random.randint(1, self.max_reorder_delay)
+                pdu_copy.flags |= PDUFlag.REORDERED
+                if self.tracer.mask & tracing.CHANNEL:
+                    self._trace(tracing.CHANNEL_REORDERED, pdu_copy)
             self.reorder_buffer.append({'pdu': pdu_copy, 'delay': delay})
 
         # Process reorder buffer: decrement delays, release PDUs with delay 0
@@ -126,17 +155,175 @@ class ImpairedChannel:
         output_pdus.extend(ready_to_send)
         
         for pdu in output_pdus:
-            if not pdu.status.startswith("Channel_Lost"): # Update status if not lost
-                 pdu.status = "Channel_Output"
-        logger.debug(f"  [Channel] Outputting {len(output_pdus)} PDUs this cycle. {len(self.reorder_buffer)} still buffered.")
+            if pdu.status != PDUStatus.CHANNEL_LOST: # Update status if not lost
+                 pdu.status = PDUStatus.CHANNEL_OUTPUT
         return output_pdus
 
+    def transmit_batch(self, batch: PDUBatch) -> PDUBatch:
+        """
+        Vectorised transmit() for a PDUBatch (requires NumPy). Same impairment model as the per-PDU
+        loop, which remains the reference implementation: the loss, tamper, corrupt, duplicate and
+        reorder decisions for the whole burst come from one NumPy draw, bit flips are applied with
+        index operations on a copy of the payload arena, and the released PDUs are gathered in one
+        random output permutation. The generator is seeded from the `random` module, so results are
+        reproducible under random.seed() but statistically equivalent to, not identical with, the
+        per-PDU path.
+        """
+        rng = self._numpy_rng()
+        n = len(batch)
+        columns, arena = _columns(batch)
+        arena = arena.copy() # The sender's batch is never modified
+        starts, lengths = columns["starts"], columns["lengths"]
+        draws = rng.random((5, n))
+
+        # 1. Loss, 2. tampering (1-3 bytes XORed with non-zero values), 3. corruption (one bit, not on tampered PDUs)
+        kept = draws[0] >= self.loss_rate
+        has_payload = kept & (lengths > 0)
+        tampered = has_payload & (draws[1] < self.tampering_rate)
+        corrupted = has_payload & ~tampered & (draws[2] < self.corruption_rate)
+        tampered_idx = np.flatnonzero(tampered)
+        if len(tampered_idx):
+            flips = rng.integers(1, np.minimum(3, lengths[tampered_idx]) + 1)
+            pdu_of_flip = np.repeat(tampered_idx, flips)
+            positions = starts[pdu_of_flip] + rng.integers(0, lengths[pdu_of_flip])
+            np.bitwise_xor.at(arena, positions, rng.integers(1, 256, len(positions), dtype=np.uint8))
+        corrupted_idx = np.flatnonzero(corrupted)
+        if len(corrupted_idx):
+            positions = starts[corrupted_idx] + rng.integers(0, lengths[corrupted_idx])
+            arena[positions] ^= np.left_shift(1, rng.integers(0, 8, len(positions))).astype(np.uint8)
+        statuses = np.full(n, PDUStatus.CHANNEL_TRANSIT, dtype=np.uint8)
+        statuses[tampered] = PDUStatus.CHANNEL_TAMPERED
+        statuses[corrupted] = PDUStatus.CHANNEL_CORRUPTED
+        columns["statuses"] = statuses
+        columns["flags"] = columns["flags"].copy()
+        columns["flags"][tampered] |= np.uint8(PDUFlag.TAMPERED_BY_CHANNEL)
+        columns["flags"][corrupted] |= np.uint8(PDUFlag.CORRUPTED_BY_CHANNEL)
+
+        # 4. Duplication: the copy keeps the flags from before this step and only the base delay
+        duplicated = kept & (draws[3] < self.duplication_rate)
+        copies = {name: column[duplicated] for name, column in columns.items()}
+        copies["delays"] = np.full(len(copies["starts"]), self.base_delay, dtype=np.int64)
+        columns["flags"][duplicated] |= np.uint8(PDUFlag.DUPLICATED)
+
+        # 5. Reordering delay
+        delays = np.full(n, self.base_delay, dtype=np.int64)
+        reordered = np.zeros(n, dtype=bool)
+        if self.max_reorder_delay > 0:
+            reordered = kept & (draws[4] < self.reordering_rate)
+            delays[reordered] += rng.integers(1, self.max_reorder_delay + 1, np.count_nonzero(reordered))
+            columns["flags"][reordered] |= np.uint8(PDUFlag.REORDERED)
+        columns["delays"] = delays
+
+        if self.tracer.mask & tracing.CHANNEL:
+            lost = ~kept
+            for event, mask in ((tracing.CHANNEL_LOST, lost), (tracing.CHANNEL_TAMPERED, tampered),
+                                (tracing.CHANNEL_CORRUPTED, corrupted), (tracing.CHANNEL_DUPLICATED, duplicated),
+                                (tracing.CHANNEL_REORDERED, reordered)):
+                status = PDUStatus.CHANNEL_LOST if event == tracing.CHANNEL_LOST else None
+                for i in np.flatnonzero(mask):
+                    self.tracer.record(event, columns["sdu_ids"][i], columns["counts"][i], columns["sns"][i],
+                                       statuses[i] if status is None else status)
+
+        # Pool = PDUs held from earlier slots + this burst's survivors and copies, all on one arena
+        if len(copies["delays"]):
+            arrived = {name: np.concatenate((column[kept], copies[name])) for name, column in columns.items()}
+        else:
+            arrived = {name: column[kept] for name, column in columns.items()}
+        pool, pool_arena = self._held_pool()
+        if pool is None:
+            pool, pool_arena = arrived, arena
+        else:
+            arrived["starts"] = arrived["starts"] + len(pool_arena)
+            pool = {name: np.concatenate((pool[name], arrived[name])) for name in pool}
+            pool_arena = np.concatenate((pool_arena, arena))
+
+        # Release PDUs whose delay is over, in random order; the rest wait one slot less
+        ready = pool["delays"] <= 0
+        waiting = np.flatnonzero(~ready)
+        if len(waiting):
+            pool["delays"] = pool["delays"] - 1
+            self._held = _gather(pool, pool_arena, waiting)
+        else:
+            self._held = None
+        output, output_arena = _gather(pool, pool_arena, rng.permutation(np.flatnonzero(ready)))
+        output["statuses"][:] = PDUStatus.CHANNEL_OUTPUT
+        return _to_batch(output, output_arena)
+
+    def _numpy_rng(self):
+        if self._rng is None:
+            self._rng = np.random.default_rng(random.getrandbits(64))
+        return self._rng
+
+    def _held_pool(self):
+        """transmit_batch's held PDUs as pool columns, with any held by the per-PDU path moved over."""
+        if self.reorder_buffer:
+            objects = PDUBatch.from_pdus(item['pdu'] for item in self.reorder_buffer)
+            columns, arena = _columns(objects)
+            columns["delays"] = np.array([item['delay'] for item in self.reorder_buffer], dtype=np.int64)
+            self.reorder_buffer = []
+            if self._held is None:
+                self._held = columns, arena
+            else:
+                held, held_arena = self._held
+                columns["starts"] = columns["starts"] + len(held_arena)
+                self._held = ({name: np.concatenate((held[name], columns[name])) for name in held},
+                              np.concatenate((held_arena, arena)))
+        return self._held if self._held is not None else (None, None)
+
+    def _unbatch_held(self):
+        """Moves PDUs held by transmit_batch to the per-PDU reorder buffer."""
+        if self._held is None:
+            return
+        held, held_arena = self._held
+        self._held = None
+        batch = _to_batch(held, held_arena)
+        self.reorder_buffer.extend({'pdu': batch.pdu(i), 'delay': int(delay)} for i, delay in enumerate(held["delays"]))
+
     def flush_reorder_buffer(self):
         """Call at the end of simulation to get any remaining PDUs."""
+        self._unbatch_held()
         flushed_pdus = [item['pdu'] for item in self.reorder_buffer]
         self.reorder_buffer = []
         random.shuffle(flushed_pdus) # Final shuffle
         for pdu in flushed_pdus:
-             pdu.status = "Channel_Flushed"
+             pdu.status = PDUStatus.CHANNEL_FLUSHED
         logger.info(f"  [Channel] Flushing {len(flushed_pdus)} PDUs from reorder buffer.")
-        return flushed_pdus
\ No newline at end of file
+        return flushed_pdus
+
+
+_INDEX_COLUMNS = ("sdu_ids", "sns", "counts", "hfns")
+
+
+def _columns(batch: PDUBatch):
+    """NumPy views of a PDUBatch's columns plus payload starts and lengths, and a view of its arena."""
+    columns = {name: np.frombuffer(getattr(batch, name), dtype=getattr(batch, name).typecode)
+               for name in _INDEX_COLUMNS}
+    columns["flags"] = np.frombuffer(batch.flags, dtype=np.uint8)
+    columns["statuses"] = np.frombuffer(batch.statuses, dtype=np.uint8)
+    offsets = np.frombuffer(batch.payload_offsets, dtype=np.uint64).astype(np.int64)
+    columns["starts"], columns["lengths"] = offsets[:-1], np.diff(offsets)
+    return columns, np.frombuffer(batch.payload_arena, dtype=np.uint8)
+
+
+def _gather(columns, arena, order):
+    """Columns of the entries at `order`, with their payloads copied back to back into a new arena."""
+    gathered = {name: column[order] for name, column in columns.items()}
+    lengths = gathered["lengths"]
+    ends = np.cumsum(lengths)
+    total = int(ends[-1]) if len(ends) else 0
+    index = np.arange(total) + np.repeat(gathered["starts"] - (ends - lengths), lengths)
+    gathered["starts"] = ends - lengths
+    return gathered, arena[index]
+
+
+def _to_batch(columns, arena) -> PDUBatch:
+    """PDUBatch from contiguous columns as produced by _gather."""
+    batch = PDUBatch()
+    for name in _INDEX_COLUMNS:
+        column = getattr(batch, name)
+        column.frombytes(columns[name].astype(column.typecode).tobytes())
+    batch.flags = bytearray(columns["flags"].tobytes())
+    batch.statuses = bytearray(columns["statuses"].tobytes())
+    batch.payload_arena = bytearray(arena.tobytes())
+    batch.payload_offsets.frombytes(np.cumsum(columns["lengths"]).astype(np.uint64).tobytes())
+    return batch
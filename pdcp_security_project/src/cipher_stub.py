@@ -1,7 +1,9 @@
 # pdcp_security_project/src/cipher_stub.py
-from Cryptodome.Cipher import AES
 from Cryptodome.Random import get_random_bytes # For keystream, not directly for AES-CTR key
+import functools
 import struct
+from . import crypto_backends
+from .xor_kernel import xor_bytes
 
 # Note: This is a highly simplified AES-CTR stub.
 # Real 3GPP AES-CTR (NEA0, NEA1, NEA2, NEA3) has specific counter block formatting.
@@ -10,68 +12,65 @@ import struct
 def generate_cipher_key(length_bytes=16):
     return get_random_bytes(length_bytes)
 
+# Number of cipher keys whose prepared ECB encryptor is kept per backend.
+ECB_CACHE_SIZE = 64
+
+
+@functools.lru_cache(maxsize=ECB_CACHE_SIZE)
+def _ecb_encryptor(cipher_key: bytes, backend_name: str):
+    """
+    Returns a cached AES-ECB encrypt callable for the key from the named backend. ECB is
+    stateless between blocks, so one encryptor can process any number of counter blocks.
+    """
+    return crypto_backends.get_backend(backend_name).ecb_encryptor(cipher_key)
+
+
+def _ctr_nonce_tail(bearer: int, direction: int) -> bytes:
+    """
+    Fixed last 8 bytes of the 12-byte CTR nonce: BEARER (1 byte, 5 LSBs), DIRECTION (1 byte, 1 LSB),
+    zero padding. The nonce is COUNT (4 bytes) followed by this tail.
+    This is NOT 3GPP compliant but makes the keystream unique per packet.
+    """
+    return struct.pack('>BB6x', bearer & 0x1F, direction & 0x01)
+
+
+class KeystreamGenerator:
+    """
+    AES-CTR keystream source for one (cipher key, bearer, direction).
+    Holds the ECB encryptor of the crypto backend (the active one unless given) and the fixed
+    part of the counter block, so a call only lays out the COUNT-dependent bytes and runs one ECB pass.
+    """
+    def __init__(self, cipher_key: bytes, bearer: int, direction: int, backend=None):
+        if not cipher_key:
+            raise ValueError("Cipher key cannot be None for keystream generation.")
+        self.backend = backend or crypto_backends.get_backend()
+        self._encrypt = _ecb_encryptor(bytes(cipher_key), self.backend.name)
+        self._nonce_tail = _ctr_nonce_tail(bearer, direction)
+
+    def generate(self, counts, lengths) -> list:
+        """Returns one keystream per (COUNT, length) pair, all produced by a single ECB pass."""
+        lengths = list(lengths)
+        blocks, offsets = self.backend.layout_counter_blocks(counts, self._nonce_tail, lengths)
+        keystream_buffer = self._encrypt(blocks) if blocks else b''
+        return [keystream_buffer[offset:offset + length] for offset, length in zip(offsets, lengths)]
+
+
+def generate_keystreams(cipher_key: bytes, counts, bearer: int, direction: int, lengths) -> list:
+    """
+    Generates the AES-CTR keystream for many COUNTs at once.
+    All counter blocks are laid out in one buffer and encrypted with a single ECB pass,
+    which gives the same bytes as running AES-CTR once per COUNT.
+    """
+    return KeystreamGenerator(cipher_key, bearer, direction).generate(counts, lengths)
+
+
 def _generate_keystream_byte(cipher_key: bytes, count: int, bearer: int, direction: int, length: int) -> bytes:
     """
     Generates a keystream using AES-CTR mode.
     The counter block is formed from COUNT, BEARER, DIRECTION.
     This is a simplified version.
     """
-    if not cipher_key:
-        raise ValueError("Cipher key cannot be None for keystream generation.")
-
-    # Construct the initial counter block (16 bytes for AES)
-    # COUNT (4 bytes), BEARER (1 byte, 5 LSBs), DIRECTION (1 byte, 1 LSB),
-    # then pad with zeros or other fixed values.
-    # For simplicity, we'll make it more direct.
-    # Ensure values fit their intended bit widths for more accurate simulation
-    bearer_val = bearer & 0x1F   # 5 bits
-    direction_val = direction & 0x01 # 1 bit
-
-    # Simplified counter block construction for simulation:
-    # We need a 16-byte IV/nonce for AES-CTR.
-    # Let's use COUNT, BEARER, DIRECTION and pad.
-    # High 4 bytes: COUNT
-    # Next 1 byte: BEARER
-    # Next 1 byte: DIRECTION
-    # Remaining 10 bytes: zeros (for simplicity)
-    # This is NOT 3GPP compliant but serves to make the keystream unique per packet.
-    iv_part1 = count.to_bytes(4, 'big')
-    iv_part2 = bearer_val.to_bytes(1, 'big')
-    iv_part3 = direction_val.to_bytes(1, 'big')
-    iv_padding = b'\x00' * (16 - len(iv_part1) - len(iv_part2) - len(iv_part3))
-    nonce = iv_part1 + iv_part2 + iv_part3 + iv_padding # This is the initial counter value
-
-    cipher = AES.new(cipher_key, AES.MODE_CTR, nonce=nonce[:12], initial_value=int.from_bytes(nonce[12:], 'big')) # Example split
-    # A more common way for AES-CTR is to provide a nonce and let the library handle the counter.
-    # PyCryptodome's AES.MODE_CTR uses a nonce (typically 8-15 bytes) and an initial_value (integer) for the counter part.
-    # Or, you can provide a 'counter' callable.
-    # For simplicity, let's form a unique "nonce" for each packet and use a fixed initial counter value.
-    # This is NOT how 3GPP does it, but creates unique keystreams.
-    # A better simplified nonce for CTR:
-    nonce_for_ctr = count.to_bytes(4, 'big') + \
-                    bearer_val.to_bytes(1, 'big') + \
-                    direction_val.to_bytes(1, 'big') + \
-                    b'\x00' * 6 # Making a 12-byte nonce, CTR counter starts at 1
-
-    # For AES-CTR, the nonce should typically be 12 bytes, and the counter part is 4 bytes.
-    # Let's use first 8 bytes of our constructed 'nonce' as the actual nonce for CTR mode.
-    # And use the remaining part to form the initial counter value.
-
-    # A simpler nonce for PyCryptodome's CTR mode (often 8 bytes for nonce, counter separate)
-    # Let's make a 12-byte nonce and start counter from 1.
-    # COUNT (4), BEARER (1), DIRECTION (1), padding to 12 bytes.
-    ctr_nonce_material = count.to_bytes(4, 'big') + \
-                         bearer_val.to_bytes(1, 'big') + \
-                         direction_val.to_bytes(1, 'big')
-    # Pad to 12 bytes for a common CTR nonce length. This is arbitrary for our stub.
-    ctr_nonce = (ctr_nonce_material + b'\x00' * 12)[:12]
-
-
-    # Re-initialize cipher with a unique nonce for each call to ensure keystream is unique.
-    # The `initial_value` is the starting value for the counter part of the counter block.
-    cipher = AES.new(cipher_key, AES.MODE_CTR, nonce=ctr_nonce, initial_value=1)
-    keystream = cipher.encrypt(b'\x00' * length) # Encrypt null bytes to get keystream
-    return keystream
+    return generate_keystreams(cipher_key, (count,), bearer, direction, (length,))[0]
 
 def encrypt(cipher_key: bytes, count: int, bearer: int, direction: int, plaintext: bytes) -> bytes:
     """Simulates PDCP ciphering (simplified AES-CTR like)."""
@@ -79,8 +78,7 @@ def encrypt(cipher_key: bytes, count: int, bearer: int, direction: int, plaintex
     if not cipher_key: # Null ciphering if no key
         return plaintext
     keystream = _generate_keystream_byte(cipher_key, count, bearer, direction, len(plaintext))
-    ciphertext = bytes([p ^ k for p, k in zip(plaintext, keystream)])
-    return ciphertext
+    return xor_bytes(plaintext, keystream)
 
 def decrypt(cipher_key: bytes, count: int, bearer: int, direction: int, ciphertext: bytes) -> bytes:
     """Simulates PDCP deciphering (simplified AES-CTR like)."""
@@ -90,6 +88,21 @@ def decrypt(cipher_key: bytes, count: int, bearer: int, direction: int, cipherte
     # CTR mode decryption is the same as encryption
     return encrypt(cipher_key, count, bearer, direction, ciphertext)
 
+def encrypt_batch(cipher_key: bytes, counts, bearer: int, direction: int, payloads) -> list:
+    """
+    Ciphers a burst of PDUs, one COUNT per payload.
+    The keystream for the whole burst comes from one ECB pass (see generate_keystreams).
+    """
+    payloads = [payload if payload is not None else b'' for payload in payloads]
+    if not cipher_key: # Null ciphering if no key
+        return payloads
+    keystreams = generate_keystreams(cipher_key, counts, bearer, direction, (len(p) for p in payloads))
+    return [xor_bytes(payload, keystream) for payload, keystream in zip(payloads, keystreams)]
+
+def decrypt_batch(cipher_key: bytes, counts, bearer: int, direction: int, ciphertexts) -> list:
+    """Deciphers a burst of PDUs. CTR mode decryption is the same as encryption."""
+    return encrypt_batch(cipher_key, counts, bearer, direction, ciphertexts)
+
 if __name__ == "__main__":
     key = generate_cipher_key()
     test_plaintext = b"This is secret data for 5G!"
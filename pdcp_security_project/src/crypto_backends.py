@@ -0,0 +1,276 @@
+# pdcp_security_project/src/crypto_backends.py
+"""
+Registry of AES primitive providers behind cipher_stub and crypto_stub.
+
+A backend supplies an AES-ECB encryptor (used for the CTR keystream), an AES-CMAC
+engine and the counter-block layout for a burst of COUNTs. Every backend must produce
+bit-identical keystreams and MAC-Is; they differ only in speed. The active backend is
+chosen explicitly with set_backend(name) or by a short microbenchmark with autotune().
+"""
+import logging
+import struct
+import threading
+import time
+from Cryptodome.Cipher import AES
+
+try:
+    import numpy as np
+except ImportError: # NumPy is optional, only the "numpy" backend needs it
+    np = None
+
+try:
+    from cryptography.hazmat.primitives import cmac as crypto_cmac
+    from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+except ImportError: # The OpenSSL-backed "cryptography" backend is optional
+    crypto_cmac = None
+
+logger = logging.getLogger(__name__)
+
+BLOCK_SIZE = 16
+_ZERO_BLOCK = bytes(BLOCK_SIZE)
+_BLOCK_MASK = (1 << 128) - 1
+
+# Payload sizes used by autotune(): a VoIP-sized, an MTU-sized and a jumbo SDU.
+AUTOTUNE_PAYLOAD_SIZES = (64, 1500, 9000)
+AUTOTUNE_BURST = 16
+
+
+def _double_subkey(value: int) -> int:
+    """Left shift by one bit in GF(2^128), as used to derive the CMAC subkeys (RFC 4493)."""
+    value <<= 1
+    if value >> 128:
+        value ^= 0x87
+    return value & _BLOCK_MASK
+
+
+class CryptoBackend:
+    """
+    Base class for backends. Subclasses implement ecb_encryptor() and cmac();
+    layout_counter_blocks() has a pure-Python default.
+    """
+    name = None
+
+    def ecb_encryptor(self, key: bytes):
+        """Returns a callable that AES-ECB encrypts a whole number of blocks and returns bytes."""
+        raise NotImplementedError
+
+    def cmac(self, key: bytes):
+        """Returns an object whose mac_over(prefix, data) returns the 4-byte truncated AES-CMAC tag."""
+        raise NotImplementedError
+
+    def layout_counter_blocks(self, counts, nonce_tail: bytes, lengths):
+        """
+        Lays out the counter blocks for every (COUNT, length) pair in a single buffer.
+        Returns the buffer and the byte offset of each PDU's first block in it.
+        Each block is COUNT(4 bytes) || nonce_tail(8 bytes) || counter(4 bytes, big-endian, starting at 1).
+        """
+        block_counts = [(length + BLOCK_SIZE - 1) // BLOCK_SIZE for length in lengths]
+        table = _counter_values(max(block_counts, default=0))
+        blocks = bytearray(BLOCK_SIZE * sum(block_counts))
+        offsets = []
+        offset = 0
+        for count, n_blocks in zip(counts, block_counts):
+            offsets.append(offset)
+            if n_blocks:
+                end = offset + n_blocks * BLOCK_SIZE
+                nonce = struct.pack('>I', count) + nonce_tail
+                # Strided slice assignment fills one byte column of all n_blocks blocks at once.
+                for i in range(12):
+                    if nonce[i]:
+                        blocks[offset + i:end:BLOCK_SIZE] = nonce[i:i + 1] * n_blocks
+                for i in range(4):
+                    blocks[offset + 12 + i:end:BLOCK_SIZE] = table[i:4 * n_blocks:4]
+                offset = end
+        return blocks, offsets
+
+
+# Big-endian 32-bit counter values 1, 2, 3, ... laid out back to back. The CTR
+# counter for block j of a PDU is entry j of this table (the counter starts at 1).
+_counter_table = b''
+
+
+def _counter_values(num_blocks: int) -> bytes:
+    """Returns the 4-byte counter values for blocks 0..num_blocks-1, growing the table on demand."""
+    global _counter_table
+    if len(_counter_table) < 4 * num_blocks:
+        size = max(num_blocks, 2 * len(_counter_table) // 4, 256)
+        _counter_table = b''.join(struct.pack('>I', i + 1) for i in range(size))
+    return _counter_table
+
+
+class _CbcCmac:
+    """
+    AES-CMAC (RFC 4493) as a single AES-CBC pass on one long-lived CBC object, with the
+    K1/K2 subkey folded into the last block. The key schedule and subkeys are derived once.
+    """
+    def __init__(self, key: bytes):
+        l_value = int.from_bytes(AES.new(key, AES.MODE_ECB).encrypt(_ZERO_BLOCK), 'big')
+        self._k1 = _double_subkey(l_value)
+        self._k2 = _double_subkey(self._k1)
+        # The CBC object keeps chaining from the last block it encrypted; that value is XORed
+        # out of each new message's first block so every MAC starts from a zero IV.
+        self._cbc = AES.new(key, AES.MODE_CBC, iv=_ZERO_BLOCK)
+        self._chain = 0
+        self._lock = threading.Lock()
+
+    def mac_over(self, prefix: bytes, input_data) -> bytes:
+        data_length = len(input_data) if input_data else 0
+        length = len(prefix) + data_length
+        complete_last_block = length > 0 and length % BLOCK_SIZE == 0
+        padded_length = length if complete_last_block else length - length % BLOCK_SIZE + BLOCK_SIZE
+
+        blocks = bytearray(padded_length)
+        blocks[:len(prefix)] = prefix
+        if data_length:
+            blocks[len(prefix):length] = input_data
+        if not complete_last_block:
+            blocks[length] = 0x80 # 10* padding
+        subkey = self._k1 if complete_last_block else self._k2
+        blocks[-BLOCK_SIZE:] = (int.from_bytes(blocks[-BLOCK_SIZE:], 'big') ^ subkey).to_bytes(BLOCK_SIZE, 'big')
+
+        with self._lock:
+            first_block = int.from_bytes(blocks[:BLOCK_SIZE], 'big') ^ self._chain
+            blocks[:BLOCK_SIZE] = first_block.to_bytes(BLOCK_SIZE, 'big')
+            self._cbc.encrypt(blocks, output=blocks)
+            tag = bytes(blocks[-BLOCK_SIZE:])
+            self._chain = int.from_bytes(tag, 'big')
+        return tag[:4]
+
+
+class PyCryptodomeBackend(CryptoBackend):
+    """Default backend: PyCryptodome AES, CMAC as one CBC pass, pure-Python counter layout."""
+    name = "pycryptodome"
+
+    def ecb_encryptor(self, key: bytes):
+        return AES.new(key, AES.MODE_ECB).encrypt
+
+    def cmac(self, key: bytes):
+        return _CbcCmac(key)
+
+
+class NumpyBackend(PyCryptodomeBackend):
+    """PyCryptodome AES with the counter blocks of a whole burst built by NumPy broadcasting."""
+    name = "numpy"
+
+    def layout_counter_blocks(self, counts, nonce_tail: bytes, lengths):
+        lengths = np.fromiter(lengths, dtype=np.int64)
+        if len(lengths) == 0:
+            return b'', []
+        block_counts = (lengths + BLOCK_SIZE - 1) // BLOCK_SIZE
+        first_blocks = np.concatenate(([0], np.cumsum(block_counts)[:-1])).astype(np.int64)
+        total_blocks = int(block_counts.sum())
+
+        pdu_of_block = np.repeat(np.arange(len(lengths)), block_counts)
+        counter_of_block = np.arange(1, total_blocks + 1, dtype=np.int64) - np.repeat(first_blocks, block_counts)
+        count_bytes = np.asarray(list(counts), dtype='>u4').view(np.uint8).reshape(-1, 4)
+
+        blocks = np.empty((total_blocks, BLOCK_SIZE), dtype=np.uint8)
+        blocks[:, 0:4] = count_bytes[pdu_of_block]
+        blocks[:, 4:12] = np.frombuffer(nonce_tail, dtype=np.uint8)
+        blocks[:, 12:16] = counter_of_block.astype('>u4').view(np.uint8).reshape(-1, 4)
+        return blocks.tobytes(), (first_blocks * BLOCK_SIZE).tolist()
+
+
+class _OpenSslCmac:
+    """AES-CMAC from the `cryptography` package; the keyed context is copied per message."""
+    def __init__(self, key: bytes):
+        self._prepared = crypto_cmac.CMAC(algorithms.AES(key))
+
+    def mac_over(self, prefix: bytes, input_data) -> bytes:
+        mac_obj = self._prepared.copy()
+        mac_obj.update(prefix)
+        if input_data:
+            mac_obj.update(input_data)
+        return mac_obj.finalize()[:4]
+
+
+class CryptographyBackend(CryptoBackend):
+    """OpenSSL-backed AES-ECB and AES-CMAC from the `cryptography` package."""
+    name = "cryptography"
+
+    def ecb_encryptor(self, key: bytes):
+        encryptor = Cipher(algorithms.AES(key), modes.ECB()).encryptor()
+        lock = threading.Lock()
+
+        def encrypt(blocks):
+            with lock: # One OpenSSL context per key, not safe to share across threads unguarded
+                return encryptor.update(blocks)
+        return encrypt
+
+    def cmac(self, key: bytes):
+        return _OpenSslCmac(key)
+
+
+_backends = {}
+_active_backend = None
+
+
+def register_backend(backend: CryptoBackend):
+    """Adds a backend to the registry under backend.name (replacing one of the same name)."""
+    _backends[backend.name] = backend
+
+
+def available_backends() -> list:
+    """Names of the registered backends, default first."""
+    return list(_backends)
+
+
+def get_backend(name: str = None) -> CryptoBackend:
+    """Returns the named backend, or the active one when name is None."""
+    if name is None:
+        return _active_backend
+    try:
+        return _backends[name]
+    except KeyError:
+        raise ValueError(f"Unknown crypto backend '{name}'. Available: {available_backends()}") from None
+
+
+def set_backend(name: str) -> CryptoBackend:
+    """Makes the named backend active for keystream generators and MAC engines created afterwards."""
+    global _active_backend
+    _active_backend = get_backend(name)
+    logger.info(f"Crypto backend set to '{name}'.")
+    return _active_backend
+
+
+def _time_backend(backend: CryptoBackend, payload_sizes, burst: int, rounds: int) -> float:
+    key = bytes(range(BLOCK_SIZE))
+    encrypt = backend.ecb_encryptor(key)
+    mac = backend.cmac(key)
+    payloads = {size: bytes(size) for size in payload_sizes}
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for size in payload_sizes:
+            lengths = [size] * burst
+            blocks, _ = backend.layout_counter_blocks(range(burst), _ZERO_BLOCK[:8], lengths)
+            encrypt(blocks)
+            for _ in range(burst):
+                mac.mac_over(_ZERO_BLOCK[:6], payloads[size])
+    return time.perf_counter() - start
+
+
+def autotune(payload_sizes=AUTOTUNE_PAYLOAD_SIZES, burst: int = AUTOTUNE_BURST, rounds: int = 3) -> str:
+    """
+    Times each registered backend on bursts of keystream generation and MAC computation
+    at the given payload sizes, activates the fastest one and returns its name.
+    """
+    timings = {name: _time_backend(backend, payload_sizes, burst, rounds) for name, backend in _backends.items()}
+    fastest = min(timings, key=timings.get)
+    logger.info("Crypto backend autotune: " + ", ".join(f"{name}={seconds * 1e3:.2f}ms" for name, seconds in timings.items()))
+    set_backend(fastest)
+    return fastest
+
+
+def configure(name: str) -> str:
+    """Selects the backend named in configuration; "auto" runs autotune()."""
+    if name == "auto":
+        return autotune()
+    return set_backend(name).name
+
+
+register_backend(PyCryptodomeBackend())
+if np is not None:
+    register_backend(NumpyBackend())
+if crypto_cmac is not None:
+    register_backend(CryptographyBackend())
+_active_backend = _backends[PyCryptodomeBackend.name]
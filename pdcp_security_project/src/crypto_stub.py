@@ -1,43 +1,64 @@
 # pdcp_security_project/src/crypto_stub.py
-from Cryptodome.Cipher import AES
-from Cryptodome.Hash import CMAC
 from Cryptodome.Random import get_random_bytes
+import functools
+import struct
+from . import crypto_backends
 
 def generate_key(length_bytes=16): # Generic key generation
     """Generates a random key of specified length."""
     return get_random_bytes(length_bytes)
 
-def calculate_mac_i(integrity_key: bytes, count: int, bearer: int, direction: int, input_data: bytes) -> bytes:
+# Number of integrity keys whose prepared CMAC state is kept (least recently used are evicted).
+MAC_ENGINE_CACHE_SIZE = 64
+
+def _mac_input_prefix(count: int, bearer: int, direction: int) -> bytes:
+    """COUNT (4 bytes) + BEARER (1 byte, 5 LSBs) + DIRECTION (1 byte, 1 LSB), prepended to the MAC input."""
+    return struct.pack('>IBB', count, bearer & 0x1F, direction & 0x01)
+
+class MacEngine:
     """
-    Simulates 3GPP integrity algorithm (e.g., EIA2/NIA2) using AES-CMAC.
-    Inputs are combined as per 3GPP specifications.
-    Returns 32-bit (4-byte) MAC-I.
+    AES-CMAC state prepared once for one integrity key.
+    The key schedule and K1/K2 subkeys are derived in the constructor by the crypto backend
+    (the active one unless given), so each MAC only costs the message blocks.
     """
-    if not integrity_key:
-        raise ValueError("Integrity key cannot be None or empty for MAC calculation.")
-    if input_data is None:
-        input_data = b''
+    def __init__(self, integrity_key: bytes, backend=None):
+        if not integrity_key:
+            raise ValueError("Integrity key cannot be None or empty for MAC calculation.")
+        self.integrity_key = bytes(integrity_key)
+        self.backend = backend or crypto_backends.get_backend()
+        self._cmac = self.backend.cmac(self.integrity_key)
 
-    count_bytes = count.to_bytes(4, 'big')
-    bearer_val = bearer & 0x1F 
-    bearer_byte = bearer_val.to_bytes(1, 'big')
-    direction_val = direction & 0x01
-    direction_byte = direction_val.to_bytes(1, 'big')
+    def calculate_mac_i(self, count: int, bearer: int, direction: int, input_data: bytes) -> bytes:
+        """Returns the 32-bit (4-byte) MAC-I over COUNT, BEARER, DIRECTION and input_data."""
+        return self.mac_over(_mac_input_prefix(count, bearer, direction), input_data)
 
-    mac_input_block = count_bytes + bearer_byte + direction_byte + input_data
+    def mac_over(self, prefix: bytes, input_data) -> bytes:
+        """
+        Returns the 4-byte MAC-I over prefix + input_data for callers that build the
+        COUNT/BEARER/DIRECTION prefix themselves. input_data may be a memoryview.
+        """
+        return self._cmac.mac_over(prefix, input_data)
 
-    # --- CORRECTION HERE ---
-    # CMAC.new expects the key and the cipher module itself (AES)
-    # The cipher object (AES.new(integrity_key, AES.MODE_ECB)) is not passed directly to CMAC.new
-    # Instead, pass the key and specify ciphermod=AES
-    mac_obj = CMAC.new(integrity_key, ciphermod=AES) 
-    # --- END CORRECTION ---
-    
-    mac_obj.update(mac_input_block) 
+@functools.lru_cache(maxsize=MAC_ENGINE_CACHE_SIZE)
+def _cached_mac_engine(integrity_key: bytes, backend_name: str) -> MacEngine:
+    return MacEngine(integrity_key, crypto_backends.get_backend(backend_name))
 
-    full_mac = mac_obj.digest() 
-    mac_i = full_mac[:4] 
-    return mac_i
+def get_mac_engine(integrity_key: bytes) -> MacEngine:
+    """
+    Returns the shared MacEngine for an integrity key and the active backend from a bounded LRU cache.
+    PDCP entities hold the returned handle for the lifetime of their key.
+    """
+    if not integrity_key:
+        raise ValueError("Integrity key cannot be None or empty for MAC calculation.")
+    return _cached_mac_engine(bytes(integrity_key), crypto_backends.get_backend().name)
+
+def calculate_mac_i(integrity_key: bytes, count: int, bearer: int, direction: int, input_data: bytes) -> bytes:
+    """
+    Simulates 3GPP integrity algorithm (e.g., EIA2/NIA2) using AES-CMAC.
+    Inputs are combined as per 3GPP specifications.
+    Returns 32-bit (4-byte) MAC-I.
+    """
+    return get_mac_engine(integrity_key).calculate_mac_i(count, bearer, direction, input_data)
 
 if __name__ == "__main__":
     key = generate_key()
@@ -0,0 +1,146 @@
+# pdcp_security_project/src/delivery_sink.py
+"""
+Delivery sinks: where PDCPReceiver hands the SDUs it delivers to upper layers.
+
+Every time the receiver delivers (a receive call, or a t-Reordering expiry on its clock) it calls
+sink.deliver(records) once with that run's SDU records, {'sdu_id', 'payload', 'count'}, in COUNT
+order. Any object with such a deliver() method can be a sink. A receiver without a sink keeps
+nothing; receive_pdus() still returns the records delivered by each burst.
+
+    ListSink       keeps every record until drained (the receiver's former delivered_sdus behaviour)
+    CallbackSink   calls a function per record as it is delivered
+    QueueSink      bounded FIFO for a consumer polling from the same thread; overflow drops records
+    AsyncQueueSink bounded asyncio.Queue for an `async for` consumer on the receiver's event loop
+"""
+import asyncio
+import collections
+
+DROP_OLDEST = "drop_oldest"
+DROP_NEWEST = "drop_newest"
+
+
+class DeliverySink:
+    """Base class; subclasses implement deliver()."""
+    def deliver(self, records: list):
+        raise NotImplementedError
+
+    def close(self):
+        """Signals that no more records will be delivered."""
+
+
+class ListSink(DeliverySink):
+    """Accumulates every delivered record. Memory grows with deliveries unless drain() is called."""
+    def __init__(self):
+        self.records = []
+
+    def deliver(self, records: list):
+        self.records.extend(records)
+
+    def drain(self) -> list:
+        """Returns the records delivered since the last drain and forgets them."""
+        drained, self.records = self.records, []
+        return drained
+
+    def __len__(self):
+        return len(self.records)
+
+
+class CallbackSink(DeliverySink):
+    """Calls callback(record) for each delivered record; nothing is retained."""
+    def __init__(self, callback):
+        self.callback = callback
+
+    def deliver(self, records: list):
+        for record in records:
+            self.callback(record)
+
+
+class QueueSink(DeliverySink):
+    """
+    Bounded FIFO of delivered records for a consumer polling with get()/drain(). When maxsize records
+    are waiting, overflow drops the oldest waiting record (DROP_OLDEST) or the new one (DROP_NEWEST);
+    drops are counted in `dropped`.
+    """
+    def __init__(self, maxsize: int, overflow: str = DROP_OLDEST):
+        if maxsize <= 0:
+            raise ValueError("Queue sink maxsize must be positive.")
+        if overflow not in (DROP_OLDEST, DROP_NEWEST):
+            raise ValueError(f"Unknown overflow policy '{overflow}', expected '{DROP_OLDEST}' or '{DROP_NEWEST}'.")
+        self.maxsize = maxsize
+        self.overflow = overflow
+        self._queue = collections.deque()
+        self.dropped = 0
+
+    def deliver(self, records: list):
+        queue = self._queue
+        for record in records:
+            if len(queue) >= self.maxsize:
+                self.dropped += 1
+                if self.overflow == DROP_NEWEST:
+                    continue
+                queue.popleft()
+            queue.append(record)
+
+    def get(self):
+        """Oldest waiting record, or None if the queue is empty."""
+        return self._queue.popleft() if self._queue else None
+
+    def drain(self, max_records: int = None) -> list:
+        """Removes and returns up to max_records waiting records (all of them by default), oldest first."""
+        count = len(self._queue) if max_records is None else min(max_records, len(self._queue))
+        return [self._queue.popleft() for _ in range(count)]
+
+    def __len__(self):
+        return len(self._queue)
+
+
+class AsyncQueueSink(DeliverySink):
+    """
+    Bounded asyncio.Queue of delivered records, consumed with `await get()` or `async for record in sink`.
+    deliver() never blocks the receiver: records arriving while maxsize are waiting are dropped
+    (counted in `dropped`). close() ends the consumer's iteration once the waiting records are read.
+    Must be used from the thread running the consumer's event loop.
+    """
+    _CLOSED = object()
+
+    def __init__(self, maxsize: int):
+        if maxsize <= 0:
+            raise ValueError("Queue sink maxsize must be positive.")
+        self.maxsize = maxsize
+        self._queue = asyncio.Queue() # Bounded by deliver(), so close() can always enqueue its marker
+        self.dropped = 0
+        self.closed = False
+
+    def deliver(self, records: list):
+        if self.closed:
+            raise RuntimeError("Delivery to a closed sink.")
+        for record in records:
+            if self._queue.qsize() >= self.maxsize:
+                self.dropped += 1
+            else:
+                self._queue.put_nowait(record)
+
+    def close(self):
+        if not self.closed:
+            self.closed = True
+            self._queue.put_nowait(self._CLOSED)
+
+    async def get(self):
+        """Next record; None once the sink is closed and empty."""
+        record = await self._queue.get()
+        if record is self._CLOSED:
+            self._queue.put_nowait(record) # Later get() calls see the end too
+            return None
+        return record
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        record = await self.get()
+        if record is None:
+            raise StopAsyncIteration
+        return record
+
+    def __len__(self):
+        return self._queue.qsize() - self.closed
@@ -0,0 +1,229 @@
+# pdcp_security_project/src/entity_manager.py
+"""
+Manager for many PDCP entities: several UEs, each with SRB1 and a set of DRBs, in both directions.
+
+Entities are keyed by (ue_id, bearer_id, direction). Each key is one link: the transmitting
+PDCPTransmitter, the impaired channel and the peer PDCPReceiver. What does not change per packet is
+shared rather than copied: both ends of a link use one SecurityContext (same keys, bearer and
+direction), and every entity of a manager runs on one simulation clock, so t-Reordering and
+discardTimer are driven by a single timer heap. What stays per link is the mutable state: the PDCP
+state variables, replay bitmap, reordering and transmit buffers, and the channel's reorder buffer,
+about 6 KB per link in all (see benchmarks/bench_link_scaling.py). Channel output is routed to the
+receivers in batches, one receive_pdus() call per link per slot.
+
+UEs are independent, so large populations are split into shards (ue_id % num_shards) that run in
+separate worker processes with no shared state; throughput therefore scales with the number of cores.
+"""
+import logging
+import multiprocessing
+import os
+import time
+
+from .pdcp_entity import PDCPTransmitter, PDCPReceiver
+from .channel_simulator import ImpairedChannel
+from .security_context import SecurityContext
+from .sim_clock import SimClock
+from .crypto_stub import generate_key
+from . import cipher_stub
+from .streaming import seeded_sdu_payload
+from . import tracing
+import config
+
+logger = logging.getLogger(__name__)
+
+NUM_DRBS_PER_UE = 3
+
+
+def default_bearer_ids(num_drbs: int = NUM_DRBS_PER_UE) -> tuple:
+    """SRB1 followed by num_drbs DRB identities starting at BEARER_ID_DRB1."""
+    return (config.BEARER_ID_SRB1,) + tuple(config.BEARER_ID_DRB1 + i for i in range(num_drbs))
+
+
+class BearerLink:
+    """One (ue_id, bearer_id, direction): transmitter, channel and receiver, plus its throughput counters."""
+    __slots__ = ("key", "tx", "channel", "rx", "sdus_sent", "sdus_delivered", "bytes_delivered")
+
+    def __init__(self, key, tx: PDCPTransmitter, channel: ImpairedChannel, rx: PDCPReceiver):
+        self.key = key
+        self.tx = tx
+        self.channel = channel
+        self.rx = rx
+        self.sdus_sent = 0
+        self.sdus_delivered = 0
+        self.bytes_delivered = 0
+
+    def deliver(self, records: list):
+        """Delivery sink of the link's receiver: counts the SDUs, keeps nothing."""
+        self.sdus_delivered += len(records)
+        self.bytes_delivered += sum(len(record['payload']) for record in records if record['payload'])
+
+
+class PDCPEntityManager:
+    def __init__(self, channel_params: dict = None, sn_length_bits: int = config.SN_LENGTH_BITS,
+                 t_reordering=config.T_REORDERING):
+        self.channel_params = channel_params or {}
+        self.sn_length_bits = sn_length_bits
+        self.t_reordering = t_reordering
+        self.clock = SimClock()
+        self.links = {}    # (ue_id, bearer_id, direction) -> BearerLink
+        self._ue_keys = {} # ue_id -> (integrity_key, cipher_key), shared by all bearers of the UE
+
+    def add_ue(self, ue_id: int, bearer_ids=None, directions=(config.DIRECTION_UPLINK, config.DIRECTION_DOWNLINK),
+               integrity_key: bytes = None, cipher_key: bytes = None) -> list:
+        """Creates the links for every bearer and direction of a UE. Returns their keys."""
+        if ue_id in self._ue_keys:
+            raise ValueError(f"UE {ue_id} already exists.")
+        self._ue_keys[ue_id] = (integrity_key or generate_key(config.INTEGRITY_KEY_LENGTH_BYTES),
+                                cipher_key or cipher_stub.generate_cipher_key(config.CIPHER_KEY_LENGTH_BYTES))
+        keys = []
+        for bearer_id in (bearer_ids if bearer_ids is not None else default_bearer_ids()):
+            for direction in directions:
+                keys.append(self.add_bearer(ue_id, bearer_id, direction))
+        return keys
+
+    def add_bearer(self, ue_id: int, bearer_id: int, direction: int):
+        """Creates one link with the UE's keys; SRB1 and DRBs follow the SRB/DRB security settings in config."""
+        key = (ue_id, bearer_id, direction)
+        if key in self.links:
+            raise ValueError(f"Bearer {key} already exists.")
+        integrity_key, cipher_key = self._ue_keys[ue_id]
+        is_srb = bearer_id == config.BEARER_ID_SRB1
+        integrity_enabled = config.INTEGRITY_ENABLED_FOR_SRB if is_srb else config.INTEGRITY_ENABLED_FOR_DRB
+        ciphering_enabled = config.CIPHERING_ENABLED_FOR_SRB if is_srb else config.CIPHERING_ENABLED_FOR_DRB
+        security = SecurityContext(bearer_id, direction, integrity_key=integrity_key if integrity_enabled else None,
+                                   cipher_key=cipher_key if ciphering_enabled else None)
+        entity_args = dict(bearer_id=bearer_id, direction=direction,
+                           integrity_key=integrity_key, cipher_key=cipher_key,
+                           integrity_enabled=integrity_enabled, ciphering_enabled=ciphering_enabled,
+                           sn_length_bits=self.sn_length_bits, clock=self.clock, security=security)
+        link = BearerLink(key, PDCPTransmitter(**entity_args), ImpairedChannel(**self.channel_params),
+                          PDCPReceiver(t_reordering=self.t_reordering, **entity_args))
+        link.rx.delivery_sink = link
+        self.links[key] = link
+        return key
+
+    def send(self, key, sdus) -> list:
+        """Sends (sdu_id, payload) pairs on one link. Returns the PDUs handed to the link's channel."""
+        link = self.links[key]
+        pdus = link.tx.send_sdus(sdus)
+        link.sdus_sent += len(pdus)
+        return pdus
+
+    def transmit(self, outgoing: dict) -> list:
+        """Passes {key: pdus} through each link's channel. Returns the arrivals as (key, pdu) pairs."""
+        arrivals = []
+        for key, pdus in outgoing.items():
+            arrivals.extend((key, pdu) for pdu in self.links[key].channel.transmit(pdus))
+        return arrivals
+
+    def route(self, arrivals) -> int:
+        """
+        Delivers (key, pdu) arrivals to their receivers, grouped into one receive_pdus() batch per link
+        (arrival order is kept within a link). Returns the number of SDUs delivered.
+        """
+        batches = {}
+        for key, pdu in arrivals:
+            batches.setdefault(key, []).append(pdu)
+        delivered = 0
+        for key, pdus in batches.items():
+            delivered += len(self.links[key].rx.receive_pdus(pdus)[1])
+        return delivered
+
+    def tick(self, slots: int = 1):
+        """Advances the shared clock, firing t-Reordering timers (their deliveries reach the links' sinks)."""
+        self.clock.advance(slots)
+
+    def finish(self):
+        """Flushes every channel and runs out pending timers."""
+        self.route((key, pdu) for key, link in self.links.items() for pdu in link.channel.flush_reorder_buffer())
+        self.clock.run_until_idle()
+
+    def run_traffic(self, sdus_per_bearer: int, sdu_payload_size: int, burst_size: int = 16, seed: int = 0) -> dict:
+        """
+        Sends sdus_per_bearer SDUs on every link, burst_size per link per slot, routes the channel output
+        in one batch per slot and returns get_stats() with throughput over the elapsed wall time.
+        """
+        start = time.perf_counter()
+        for first in range(0, sdus_per_bearer, burst_size):
+            sdu_ids = range(first, min(first + burst_size, sdus_per_bearer))
+            outgoing = {key: self.send(key, [(sdu_id, seeded_sdu_payload(sdu_id, sdu_payload_size, seed))
+                                             for sdu_id in sdu_ids])
+                        for key in self.links}
+            self.route(self.transmit(outgoing))
+            self.tick()
+        self.finish()
+        return self.get_stats(time.perf_counter() - start)
+
+    def get_stats(self, elapsed_seconds: float = None) -> dict:
+        """Per-bearer and aggregate counters; throughput figures are included when elapsed_seconds is given."""
+        per_bearer = {}
+        for key, link in self.links.items():
+            rx_stats = link.rx.get_stats()
+            per_bearer[key] = {
+                "sdus_sent": link.sdus_sent,
+                "sdus_delivered": link.sdus_delivered,
+                "bytes_delivered": link.bytes_delivered,
+                "discarded_integrity_failures": rx_stats["discarded_integrity_failures"],
+                "discarded_duplicates": rx_stats["discarded_duplicates"],
+                "discarded_old_packets": rx_stats["discarded_old_packets"],
+            }
+        aggregate = {name: sum(stats[name] for stats in per_bearer.values())
+                     for name in ("sdus_sent", "sdus_delivered", "bytes_delivered", "discarded_integrity_failures",
+                                  "discarded_duplicates", "discarded_old_packets")}
+        aggregate["num_ues"] = len(self._ue_keys)
+        aggregate["num_bearers"] = len(self.links)
+        if elapsed_seconds:
+            aggregate["elapsed_seconds"] = elapsed_seconds
+            aggregate["throughput_mbps"] = aggregate["bytes_delivered"] * 8 / elapsed_seconds / 1e6
+            for stats in per_bearer.values():
+                stats["throughput_mbps"] = stats["bytes_delivered"] * 8 / elapsed_seconds / 1e6
+        return {"aggregate": aggregate, "per_bearer": per_bearer}
+
+
+def _run_shard(shard_args) -> dict:
+    """Worker-process entry point: builds a manager for one shard of UEs and runs its traffic."""
+    ue_ids, bearer_ids, sdus_per_bearer, sdu_payload_size, channel_params, burst_size, seed = shard_args
+    manager = PDCPEntityManager(channel_params=channel_params)
+    for ue_id in ue_ids:
+        manager.add_ue(ue_id, bearer_ids=bearer_ids)
+    return manager.run_traffic(sdus_per_bearer, sdu_payload_size, burst_size=burst_size, seed=seed)
+
+
+def _init_worker():
+    tracing.default_tracer.disable() # A worker's trace ring dies with the process, so recording would be wasted work
+    logging.disable(logging.INFO)    # Entity setup logs one line per bearer, thousands per shard
+
+
+def run_sharded(num_ues: int, sdus_per_bearer: int, sdu_payload_size: int, num_workers: int = None,
+                bearer_ids=None, channel_params: dict = None, burst_size: int = 16, seed: int = 0) -> dict:
+    """
+    Simulates num_ues UEs split into num_workers shards (ue_id % num_workers), each shard in its own
+    process. Returns merged per-bearer stats and aggregate throughput over the wall time of the whole run.
+    """
+    num_workers = num_workers or os.cpu_count() or 1
+    bearer_ids = tuple(bearer_ids) if bearer_ids is not None else default_bearer_ids()
+    shards = [([ue_id for ue_id in range(num_ues) if ue_id % num_workers == shard], bearer_ids, sdus_per_bearer,
+               sdu_payload_size, channel_params, burst_size, seed) for shard in range(num_workers)]
+    shards = [shard for shard in shards if shard[0]]
+
+    start = time.perf_counter()
+    if len(shards) == 1:
+        results = [_run_shard(shards[0])]
+    else:
+        with multiprocessing.Pool(len(shards), initializer=_init_worker) as pool:
+            results = pool.map(_run_shard, shards)
+    elapsed = time.perf_counter() - start
+
+    per_bearer = {}
+    for result in results:
+        per_bearer.update(result["per_bearer"])
+    aggregate = {}
+    for result in results:
+        for name, value in result["aggregate"].items():
+            if name not in ("elapsed_seconds", "throughput_mbps"):
+                aggregate[name] = aggregate.get(name, 0) + value
+    aggregate["num_workers"] = len(shards)
+    aggregate["elapsed_seconds"] = elapsed
+    aggregate["throughput_mbps"] = aggregate["bytes_delivered"] * 8 / elapsed / 1e6
+    logger.info(f"Sharded run: {aggregate}")
+    return {"aggregate": aggregate, "per_bearer": per_bearer}
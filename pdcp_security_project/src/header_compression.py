@@ -0,0 +1,403 @@
+# pdcp_security_project/src/header_compression.py
+"""
+ROHC-style header compression for IPv4/IPv6 + UDP (+ RTP) SDUs, with one compressor context set on
+the transmitting side and one decompressor context set on the receiving side of a bearer.
+
+This follows RFC 3095 profiles 1 (RTP) and 2 (UDP) in U-mode, with a simplified packet format:
+
+    IR:           0xFD | CID | profile | TS stride (4, RTP) or SN (2, UDP) | full header | payload
+    CO:           0x80 | CID | T I M S + SN (4 LSBs) | CRC-8 of the header | [SN (2)] [TS (4)] [IP-ID (2)]
+                  [UDP checksum (2)] | payload
+    Uncompressed: 0xFE | packet (anything other than plain IPv4/IPv6 + UDP)
+
+The static header fields (addresses, ports, TTL, SSRC, ...) select the context (CID 0-15, least
+recently used flow evicted). An IR carries the full header; it is sent for the first packet of a
+context, when the RTP timestamp stride changes and every IR_REFRESH_INTERVAL packets. A CO packet
+carries only what cannot be inferred: lengths and the IPv4 checksum are recomputed, the SN (RTP SN,
+or a compressor-generated one for UDP) is sent as 4 LSBs decoded in (ref, ref + 16], the RTP
+timestamp is ref + SN delta * stride and the IPv4 ID is SN + offset, with T/S/I extensions when a
+prediction fails. So up to 15 lost packets in a row still decode; the CRC over the rebuilt header
+catches the rest, and such packets are dropped until the next IR.
+"""
+import collections
+import struct
+import time
+import zlib
+
+PROFILE_RTP = 1
+PROFILE_UDP = 2
+
+PACKET_IR = 0xFD
+PACKET_UNCOMPRESSED = 0xFE
+PACKET_CO = 0x80
+
+MAX_CIDS = 16
+IR_REFRESH_INTERVAL = 32
+SN_LSB_BITS = 4
+
+_IPV4_HEADER_LENGTH = 20
+_IPV6_HEADER_LENGTH = 40
+_UDP_HEADER_LENGTH = 8
+_RTP_HEADER_LENGTH = 12
+_IPPROTO_UDP = 17
+
+_T_FLAG = 0x80
+_I_FLAG = 0x40
+_M_FLAG = 0x20
+_S_FLAG = 0x10
+_SN_LSB_MASK = (1 << SN_LSB_BITS) - 1
+
+
+class _Layout:
+    """Field positions of a compressible header."""
+    __slots__ = ("ip_version", "udp_offset", "rtp_offset", "length")
+
+    def __init__(self, ip_version: int, udp_offset: int, rtp_offset, length: int):
+        self.ip_version = ip_version
+        self.udp_offset = udp_offset
+        self.rtp_offset = rtp_offset
+        self.length = length
+
+    @property
+    def profile(self) -> int:
+        return PROFILE_RTP if self.rtp_offset is not None else PROFILE_UDP
+
+
+class _Context:
+    """Per-CID state, identical on both sides as long as the same packets reach the decompressor."""
+    __slots__ = ("cid", "layout", "template", "sn", "ts", "stride", "candidate_stride", "ip_id_offset",
+                 "checksum_used", "packets_since_ir")
+
+    def __init__(self, cid: int, layout: _Layout, template: bytes, sn: int, stride: int):
+        self.cid = cid
+        self.layout = layout
+        self.template = template # Last full header; CO packets only patch its dynamic fields
+        self.sn = sn
+        self.ts = _rtp_timestamp(template, layout)
+        self.stride = stride
+        self.candidate_stride = None
+        self.ip_id_offset = (_ip_id(template, layout) - sn) & 0xFFFF
+        self.checksum_used = _checksum_used(template, layout)
+        self.packets_since_ir = 0
+
+
+def _ipv4_checksum(header) -> int:
+    """One's-complement checksum of a 20-byte IPv4 header, with its checksum field taken as zero."""
+    words = struct.unpack_from('>10H', header)
+    total = sum(words) - words[5]
+    while total >> 16:
+        total = (total & 0xFFFF) + (total >> 16)
+    return ~total & 0xFFFF
+
+
+def _ip_id(header, layout: _Layout) -> int:
+    return struct.unpack_from('>H', header, 4)[0] if layout.ip_version == 4 else 0
+
+
+def _udp_checksum(header, layout: _Layout) -> int:
+    return struct.unpack_from('>H', header, layout.udp_offset + 6)[0]
+
+
+def _checksum_used(header, layout: _Layout) -> bool:
+    """UDP checksum is sent in CO packets unless IPv4 with the checksum disabled (zero)."""
+    return layout.ip_version == 6 or _udp_checksum(header, layout) != 0
+
+
+def _rtp_timestamp(header, layout: _Layout) -> int:
+    return struct.unpack_from('>I', header, layout.rtp_offset + 4)[0] if layout.rtp_offset is not None else 0
+
+
+def _parse_layout(packet) -> _Layout:
+    """
+    Returns the layout of an IPv4 (no options, unfragmented) or IPv6 (no extension headers) + UDP
+    packet, with an RTP header if the UDP payload looks like RTP v2 without extension; else None.
+    Length and checksum fields must be consistent, since the decompressor recomputes them.
+    """
+    if len(packet) < _IPV4_HEADER_LENGTH:
+        return None
+    version = packet[0] >> 4
+    if version == 4:
+        if packet[0] != 0x45 or packet[9] != _IPPROTO_UDP or struct.unpack_from('>H', packet, 2)[0] != len(packet):
+            return None
+        if struct.unpack_from('>H', packet, 6)[0] & 0x3FFF: # MF flag or fragment offset
+            return None
+        if struct.unpack_from('>H', packet, 10)[0] != _ipv4_checksum(packet):
+            return None
+        udp_offset = _IPV4_HEADER_LENGTH
+    elif version == 6:
+        if len(packet) < _IPV6_HEADER_LENGTH or packet[6] != _IPPROTO_UDP \
+                or struct.unpack_from('>H', packet, 4)[0] != len(packet) - _IPV6_HEADER_LENGTH:
+            return None
+        udp_offset = _IPV6_HEADER_LENGTH
+    else:
+        return None
+    if len(packet) < udp_offset + _UDP_HEADER_LENGTH \
+            or struct.unpack_from('>H', packet, udp_offset + 4)[0] != len(packet) - udp_offset:
+        return None
+    rtp_offset = udp_offset + _UDP_HEADER_LENGTH
+    if len(packet) >= rtp_offset + _RTP_HEADER_LENGTH and packet[rtp_offset] & 0xD0 == 0x80: # V=2, X=0
+        rtp_length = _RTP_HEADER_LENGTH + 4 * (packet[rtp_offset] & 0x0F) # CSRC list
+        if len(packet) >= rtp_offset + rtp_length:
+            return _Layout(version, udp_offset, rtp_offset, rtp_offset + rtp_length)
+    return _Layout(version, udp_offset, None, rtp_offset)
+
+
+def _static_key(header, layout: _Layout) -> bytes:
+    """The header with every field a CO packet can convey zeroed: equal keys share a context."""
+    key = bytearray(header)
+    if layout.ip_version == 4:
+        key[2:6] = bytes(4)    # Total length, ID
+        key[10:12] = bytes(2)  # Header checksum
+    else:
+        key[4:6] = bytes(2)    # Payload length
+    key[layout.udp_offset + 4:layout.udp_offset + 8] = bytes(4) # Length, checksum
+    if layout.rtp_offset is not None:
+        key[layout.rtp_offset + 1] &= 0x7F # Marker
+        key[layout.rtp_offset + 2:layout.rtp_offset + 8] = bytes(6) # SN, timestamp
+    return bytes(key)
+
+
+class _CompressionStats:
+    def __init__(self):
+        self.packets = 0
+        self.uncompressed_bytes = 0
+        self.compressed_bytes = 0
+        self.ir_packets = 0
+        self.co_packets = 0
+        self.uncompressed_packets = 0
+        self.failures = 0
+        self.cpu_seconds = 0.0
+
+    def as_dict(self, prefix: str) -> dict:
+        return {
+            f"{prefix}_packets": self.packets,
+            f"{prefix}_ir_packets": self.ir_packets,
+            f"{prefix}_co_packets": self.co_packets,
+            f"{prefix}_uncompressed_packets": self.uncompressed_packets,
+            f"{prefix}_failures": self.failures,
+            f"{prefix}_uncompressed_bytes": self.uncompressed_bytes,
+            f"{prefix}_compressed_bytes": self.compressed_bytes,
+            # Compressed over uncompressed size of whole SDUs (headers and payload)
+            f"{prefix}_ratio": self.compressed_bytes / self.uncompressed_bytes if self.uncompressed_bytes else None,
+            f"{prefix}_cpu_us_per_packet": self.cpu_seconds / self.packets * 1e6 if self.packets else None,
+        }
+
+
+class HeaderCompressor:
+    """Transmit side: one instance per bearer."""
+    def __init__(self, ir_refresh_interval: int = IR_REFRESH_INTERVAL, max_cids: int = MAX_CIDS):
+        self.ir_refresh_interval = ir_refresh_interval
+        self.max_cids = max_cids
+        self._contexts = collections.OrderedDict() # Static key -> _Context, least recently used first
+        self.stats = _CompressionStats()
+
+    def _context_for(self, key: bytes, layout: _Layout, header: bytes, sn: int):
+        context = self._contexts.get(key)
+        if context is not None:
+            self._contexts.move_to_end(key)
+            return context, False
+        if len(self._contexts) >= self.max_cids:
+            cid = self._contexts.popitem(last=False)[1].cid
+        else:
+            cid = len(self._contexts)
+        context = self._contexts[key] = _Context(cid, layout, header, sn, stride=0)
+        return context, True
+
+    def compress(self, packet) -> bytes:
+        start = time.perf_counter()
+        layout = _parse_layout(packet)
+        if layout is None:
+            compressed = bytes((PACKET_UNCOMPRESSED,)) + bytes(packet)
+            self.stats.uncompressed_packets += 1
+        else:
+            compressed = self._compress(packet, layout)
+        self.stats.packets += 1
+        self.stats.uncompressed_bytes += len(packet)
+        self.stats.compressed_bytes += len(compressed)
+        self.stats.cpu_seconds += time.perf_counter() - start
+        return compressed
+
+    def _compress(self, packet, layout: _Layout) -> bytes:
+        header = bytes(packet[:layout.length])
+        key = _static_key(header, layout)
+        if layout.rtp_offset is not None:
+            sn, ts = struct.unpack_from('>HI', header, layout.rtp_offset + 2)
+        else:
+            sn, ts = None, 0
+        context, new = self._context_for(key, layout, header, sn or 0)
+        if sn is None:
+            sn = 0 if new else (context.sn + 1) & 0xFFFF
+        sn_delta = (sn - context.sn) & 0xFFFF
+
+        send_ir = new or context.packets_since_ir >= self.ir_refresh_interval \
+            or _checksum_used(header, layout) != context.checksum_used
+        send_ts = False
+        if send_ir or layout.rtp_offset is None or ts == (context.ts + sn_delta * context.stride) & 0xFFFFFFFF:
+            context.candidate_stride = None
+        else:
+            # Timestamp not on the stride: a new stride once two packets in a row agree on it,
+            # otherwise (e.g. a jump after silence) an explicit timestamp
+            ts_delta = (ts - context.ts) & 0xFFFFFFFF
+            candidate = ts_delta // sn_delta if sn_delta and ts_delta % sn_delta == 0 else None
+            send_ir = candidate is not None and candidate == context.candidate_stride
+            send_ts = not send_ir
+            context.candidate_stride = candidate
+            if send_ir:
+                context.stride = candidate
+
+        if send_ir:
+            self.stats.ir_packets += 1
+            fresh = _Context(context.cid, layout, header, sn, context.stride)
+            self._contexts[key] = fresh
+            extra = struct.pack('>I', fresh.stride) if layout.rtp_offset is not None else struct.pack('>H', sn)
+            return bytes((PACKET_IR, context.cid, layout.profile)) + extra + bytes(packet)
+
+        self.stats.co_packets += 1
+        ip_id = _ip_id(header, layout)
+        ip_id_offset = (ip_id - sn) & 0xFFFF
+        send_sn = not 1 <= sn_delta <= _SN_LSB_MASK + 1
+        send_ip_id = layout.ip_version == 4 and ip_id_offset != context.ip_id_offset
+        marker = layout.rtp_offset is not None and header[layout.rtp_offset + 1] & 0x80
+        flags = (_T_FLAG if send_ts else 0) | (_I_FLAG if send_ip_id else 0) | (_M_FLAG if marker else 0) \
+            | (_S_FLAG if send_sn else 0) | (sn & _SN_LSB_MASK)
+        compressed = bytearray((PACKET_CO | context.cid, flags, zlib.crc32(header) & 0xFF))
+        if send_sn:
+            compressed += struct.pack('>H', sn)
+        if send_ts:
+            compressed += struct.pack('>I', ts)
+        if send_ip_id:
+            compressed += struct.pack('>H', ip_id)
+        if context.checksum_used:
+            compressed += header[layout.udp_offset + 6:layout.udp_offset + 8]
+        compressed += packet[layout.length:]
+
+        context.sn, context.ts, context.ip_id_offset = sn, ts, ip_id_offset
+        context.packets_since_ir += 1
+        return bytes(compressed)
+
+    def get_stats(self) -> dict:
+        stats = self.stats.as_dict("header_compression")
+        stats["header_compression_contexts"] = len(self._contexts)
+        return stats
+
+
+class HeaderDecompressor:
+    """Receive side: one instance per bearer, fed the SDUs in delivery (COUNT) order."""
+    def __init__(self):
+        self._contexts = {} # CID -> _Context
+        self.stats = _CompressionStats()
+
+    def decompress(self, data):
+        """Returns the original packet, or None if it cannot be rebuilt (no context, or CRC mismatch)."""
+        start = time.perf_counter()
+        packet = self._decompress(data) if data else None
+        self.stats.packets += 1
+        if packet is None:
+            self.stats.failures += 1
+        else:
+            self.stats.compressed_bytes += len(data)
+            self.stats.uncompressed_bytes += len(packet)
+        self.stats.cpu_seconds += time.perf_counter() - start
+        return packet
+
+    def _decompress(self, data):
+        packet_type = data[0]
+        if packet_type == PACKET_UNCOMPRESSED:
+            self.stats.uncompressed_packets += 1
+            return bytes(data[1:])
+        if packet_type == PACKET_IR:
+            return self._decompress_ir(data)
+        if packet_type & 0xF0 == PACKET_CO and len(data) >= 3:
+            return self._decompress_co(data)
+        return None
+
+    def _decompress_ir(self, data):
+        if len(data) < 3:
+            return None
+        cid, profile = data[1], data[2]
+        extra_length = 4 if profile == PROFILE_RTP else 2
+        packet = bytes(data[3 + extra_length:])
+        layout = _parse_layout(packet)
+        if layout is None or layout.profile != profile or cid >= MAX_CIDS:
+            return None
+        if profile == PROFILE_RTP:
+            stride = struct.unpack_from('>I', data, 3)[0]
+            sn = struct.unpack_from('>H', packet, layout.rtp_offset + 2)[0]
+        else:
+            stride, sn = 0, struct.unpack_from('>H', data, 3)[0]
+        self._contexts[cid] = _Context(cid, layout, packet[:layout.length], sn, stride)
+        self.stats.ir_packets += 1
+        return packet
+
+    def _decompress_co(self, data):
+        context = self._contexts.get(data[0] & 0x0F)
+        if context is None:
+            return None
+        layout = context.layout
+        flags, crc = data[1], data[2]
+        position = 3
+        try:
+            if flags & _S_FLAG:
+                sn = struct.unpack_from('>H', data, position)[0]
+                position += 2
+            else:
+                sn = (context.sn + 1 + (((flags & _SN_LSB_MASK) - context.sn - 1) & _SN_LSB_MASK)) & 0xFFFF
+            if flags & _T_FLAG:
+                ts = struct.unpack_from('>I', data, position)[0]
+                position += 4
+            else:
+                ts = (context.ts + ((sn - context.sn) & 0xFFFF) * context.stride) & 0xFFFFFFFF
+            if flags & _I_FLAG:
+                ip_id = struct.unpack_from('>H', data, position)[0]
+                position += 2
+            else:
+                ip_id = (sn + context.ip_id_offset) & 0xFFFF
+            checksum = 0
+            if context.checksum_used:
+                checksum = struct.unpack_from('>H', data, position)[0]
+                position += 2
+        except struct.error:
+            return None # Truncated
+
+        payload = data[position:]
+        total_length = layout.length + len(payload)
+        header = bytearray(context.template)
+        if layout.ip_version == 4:
+            struct.pack_into('>HH', header, 2, total_length, ip_id)
+            struct.pack_into('>H', header, 10, _ipv4_checksum(header))
+        else:
+            struct.pack_into('>H', header, 4, total_length - _IPV6_HEADER_LENGTH)
+        struct.pack_into('>HH', header, layout.udp_offset + 4, total_length - layout.udp_offset, checksum)
+        if layout.rtp_offset is not None:
+            header[layout.rtp_offset + 1] = (header[layout.rtp_offset + 1] & 0x7F) | (0x80 if flags & _M_FLAG else 0)
+            struct.pack_into('>HI', header, layout.rtp_offset + 2, sn, ts)
+        if zlib.crc32(header) & 0xFF != crc:
+            return None # Context damaged (e.g. more losses than the SN LSBs cover): wait for an IR
+
+        context.sn, context.ts = sn, ts
+        context.ip_id_offset = (ip_id - sn) & 0xFFFF
+        self.stats.co_packets += 1
+        return bytes(header) + bytes(payload)
+
+    def get_stats(self) -> dict:
+        return self.stats.as_dict("header_decompression")
+
+
+def build_udp_packet(payload: bytes, src_port: int = 5004, dst_port: int = 5004, ip_version: int = 4,
+                     ip_id: int = 0, rtp_sn: int = None, rtp_ts: int = 0, rtp_ssrc: int = 0x1234,
+                     rtp_payload_type: int = 0, rtp_marker: bool = False, udp_checksum: int = 0) -> bytes:
+    """
+    Builds an IPv4 or IPv6 + UDP packet around payload, with an RTP header when rtp_sn is given.
+    For generating compressible (e.g. VoIP-like) SDUs in simulations, tests and benchmarks.
+    """
+    if rtp_sn is not None:
+        payload = struct.pack('>BBHII', 0x80, (0x80 if rtp_marker else 0) | rtp_payload_type,
+                              rtp_sn & 0xFFFF, rtp_ts & 0xFFFFFFFF, rtp_ssrc) + payload
+    udp = struct.pack('>HHHH', src_port, dst_port, _UDP_HEADER_LENGTH + len(payload), udp_checksum) + payload
+    if ip_version == 4:
+        ip_header = bytearray(struct.pack('>BBHHHBBH4s4s', 0x45, 0, _IPV4_HEADER_LENGTH + len(udp), ip_id & 0xFFFF,
+                                          0x4000, 64, _IPPROTO_UDP, 0, bytes((10, 0, 0, 1)), bytes((10, 0, 0, 2))))
+        struct.pack_into('>H', ip_header, 10, _ipv4_checksum(ip_header))
+        return bytes(ip_header) + udp
+    return struct.pack('>IHBB16s16s', 0x60000000, len(udp), _IPPROTO_UDP, 64,
+                       bytes(15) + b"\x01", bytes(15) + b"\x02") + udp
@@ -0,0 +1,66 @@
+# pdcp_security_project/src/multipath.py
+"""
+Multi-leg transport between one PDCPTransmitter and one PDCPReceiver (dual connectivity / CA).
+
+MultiPathChannel has the ImpairedChannel interface (transmit / flush_reorder_buffer), so it can
+replace a single channel in any driver. Each slot the transmitter's PDUs go over N independently
+impaired legs and the legs' outputs are merged into one arrival burst:
+
+    duplicate  every PDU is sent on every leg (PDCP duplication); the receiver keeps the first good
+               copy. Later copies are discarded by the receiver's duplicate pre-filter before any
+               crypto, and copies arriving in the same burst share one crypto pass.
+    split      PDUs are spread round-robin over the legs (split bearer); no copies, more reordering.
+"""
+from .channel_simulator import ImpairedChannel
+from .pdcp_packet import PDUBatch, as_pdu_list
+
+DUPLICATE = "duplicate"
+SPLIT = "split"
+
+
+class MultiPathChannel:
+    def __init__(self, legs, mode: str = DUPLICATE):
+        """legs: ImpairedChannel instances, or dicts of ImpairedChannel keyword arguments."""
+        if mode not in (DUPLICATE, SPLIT):
+            raise ValueError(f"Unknown multipath mode '{mode}', expected '{DUPLICATE}' or '{SPLIT}'.")
+        self.legs = [leg if isinstance(leg, ImpairedChannel) else ImpairedChannel(**leg) for leg in legs]
+        if not self.legs:
+            raise ValueError("A multipath channel needs at least one leg.")
+        self.mode = mode
+        self._next_leg = 0 # Round-robin position for split mode
+        self.pdus_sent = [0] * len(self.legs)    # Per leg
+        self.pdus_arrived = [0] * len(self.legs) # Per leg, channel duplicates included
+
+    def transmit(self, pdus_to_transmit):
+        """Sends one slot's PDUs over the legs and returns the merged arrivals (a PDUBatch for a PDUBatch input)."""
+        if isinstance(pdus_to_transmit, PDUBatch):
+            return PDUBatch.from_pdus(self.transmit(as_pdu_list(pdus_to_transmit)))
+        pdus = list(pdus_to_transmit)
+        if self.mode == DUPLICATE:
+            per_leg = [pdus] * len(self.legs)
+        else:
+            per_leg = [[] for _ in self.legs]
+            for pdu in pdus:
+                per_leg[self._next_leg].append(pdu)
+                self._next_leg = (self._next_leg + 1) % len(self.legs)
+        arrivals = []
+        for index, (leg, leg_pdus) in enumerate(zip(self.legs, per_leg)):
+            self.pdus_sent[index] += len(leg_pdus)
+            arrived = leg.transmit(leg_pdus) # Called even with nothing to send: it advances the leg's delays
+            self.pdus_arrived[index] += len(arrived)
+            arrivals.extend(arrived)
+        return arrivals
+
+    def flush_reorder_buffer(self):
+        """Call at the end of simulation to get the PDUs still held by any leg."""
+        flushed = []
+        for index, leg in enumerate(self.legs):
+            leg_flushed = leg.flush_reorder_buffer()
+            self.pdus_arrived[index] += len(leg_flushed)
+            flushed.extend(leg_flushed)
+        return flushed
+
+    def get_stats(self) -> dict:
+        return {"mode": self.mode,
+                "legs": [{"pdus_sent": sent, "pdus_arrived": arrived}
+                         for sent, arrived in zip(self.pdus_sent, self.pdus_arrived)]}
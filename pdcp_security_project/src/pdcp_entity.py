@@ -1,19 +1,61 @@
 # pdcp_security_project/src/pdcp_entity.py
 import collections
 import logging
-from .pdcp_packet import PDCP_PDU
-from . import crypto_stub
-from . import cipher_stub # Assuming you have this
-from config import SN_LENGTH_BITS, HFN_LENGTH_BITS, WINDOW_SIZE
+import threading
+from .pdcp_packet import PDCP_PDU, PDUStatus, PDUBatch, as_pdu_list
+from .security_context import SecurityContext, MAC_I_LENGTH
+from .replay_window import ReplayWindow
+from .sim_clock import SimClock
+from .header_compression import HeaderCompressor, HeaderDecompressor
+from .udc import UDCCompressor, UDCDecompressor
+from .delivery_sink import ListSink
+from . import pdcp_wire
+from . import tracing
+from config import SN_LENGTH_BITS, HFN_LENGTH_BITS, T_REORDERING, TX_BUFFER_MAX_BYTES, DISCARD_TIMER
 
 # Setup basic logging
 logger = logging.getLogger(__name__)
 
+_COUNT_MASK = 0xFFFFFFFF
+_HALF_COUNT_SPACE = 0x80000000
+
+
+def _count_distance(count: int, reference: int) -> int:
+    """Signed distance count - reference between 32-bit COUNTs (modulo 2^32), in [-2^31, 2^31)."""
+    return ((count - reference + _HALF_COUNT_SPACE) & _COUNT_MASK) - _HALF_COUNT_SPACE
+
+# Default keystream length prefetched per COUNT: an MTU-sized SDU plus MAC-I
+KEYSTREAM_PREFETCH_MAX_LEN = 1500 + MAC_I_LENGTH
+
+def histogram_percentiles(histogram, percentiles=(50, 90, 99)) -> dict:
+    """Nearest-rank percentiles of a value -> occurrences histogram (e.g. a Counter of latencies); None if empty."""
+    total = sum(histogram.values())
+    result = {}
+    if not total:
+        return {p: None for p in percentiles}
+    ordered = sorted(histogram.items())
+    for p in percentiles:
+        rank = max(1, -(-total * p // 100)) # Nearest-rank percentile
+        seen = 0
+        for value, occurrences in ordered:
+            seen += occurrences
+            if seen >= rank:
+                result[p] = value
+                break
+    return result
+
+
 class PDCPTransmitter:
     def __init__(self, bearer_id: int, direction: int, integrity_key: bytes = None, cipher_key: bytes = None,
-                 integrity_enabled: bool = False, ciphering_enabled: bool = False, sn_length_bits: int = SN_LENGTH_BITS):
+                 integrity_enabled: bool = False, ciphering_enabled: bool = False, sn_length_bits: int = SN_LENGTH_BITS,
+                 keystream_prefetch_depth: int = 0, keystream_prefetch_max_len: int = KEYSTREAM_PREFETCH_MAX_LEN,
+                 prefetch_in_background: bool = False, header_compression: bool = False,
+                 uplink_data_compression: bool = False, udc_dictionary: bytes = None,
+                 tracer: tracing.TraceBuffer = None, tx_buffer_max_bytes: int = TX_BUFFER_MAX_BYTES,
+                 discard_timer=DISCARD_TIMER, clock: SimClock = None, security: SecurityContext = None):
         self.bearer_id = bearer_id
         self.direction = direction  # 0 for UL, 1 for DL
+        self.tracer = tracer if tracer is not None else tracing.default_tracer
 
         self.integrity_key = integrity_key
         self.cipher_key = cipher_key
@@ -24,12 +66,53 @@ class PDCPTransmitter:
             raise ValueError("Integrity enabled but no integrity key provided.")
         if self.ciphering_enabled and not self.cipher_key:
             raise ValueError("Ciphering enabled but no cipher key provided.")
+        # Cipher/MAC primitives and fixed counter-block and MAC-input parts, prepared once per bearer.
+        # A caller may pass one in to share it, e.g. between the two ends of a link (it holds no per-packet state)
+        self.security = security if security is not None else SecurityContext(
+            bearer_id, direction, integrity_key=integrity_key if integrity_enabled else None,
+            cipher_key=cipher_key if ciphering_enabled else None)
 
         self.sn_length_bits = sn_length_bits
         self.max_sn = (1 << self.sn_length_bits) - 1
         self.hfn_latch = 0 # Current HFN
         self.next_tx_sn = 0 # Next PDCP SN to be used
         self.tx_count = 0 # Full 32-bit COUNT for transmission
+        self.transmitted_pdus = 0
+        if header_compression and uplink_data_compression:
+            raise ValueError("Header compression and UDC cannot both be configured on a bearer.")
+        self.header_compressor = HeaderCompressor() if header_compression else None
+        self.udc_compressor = UDCCompressor(udc_dictionary) if uplink_data_compression else None
+        self.wire_bytes_sent = 0 # Bytes serialised by encode_pdus, headers and framing included
+
+        # Transmit buffer for retransmission: COUNT -> (sdu_id, protected payload, discardTimer deadline),
+        # in COUNT order. The protected bytes are resent as they are, so retransmission costs no crypto.
+        self.tx_buffer_max_bytes = tx_buffer_max_bytes # 0 disables the buffer
+        self.discard_timer = discard_timer # Simulation time units of `clock`; None is infinity
+        self.clock = clock if clock is not None else SimClock()
+        self.tx_buffer = collections.OrderedDict()
+        self.tx_buffer_bytes = 0
+        self.tx_buffer_peak_bytes = 0
+        self._discard_timer_handle = None # One timer, for the oldest buffered COUNT
+        self.retransmitted_pdus = 0
+        self.discard_timer_expiries = 0
+        self.tx_buffer_overflow_discards = 0
+        self.status_reports_received = 0
+        self.status_report_errors = 0
+
+        # Keystream prefetch: a bounded ring of (COUNT, keystream) for the next COUNTs, so that
+        # send_sdu only has to XOR. Refilled by prefetch_keystream() when idle or by a worker thread.
+        self.keystream_prefetch_depth = keystream_prefetch_depth
+        self.keystream_prefetch_max_len = keystream_prefetch_max_len
+        self._prefetched = collections.deque()
+        self._prefetch_lock = threading.Lock()   # Guards the ring and the generation counter
+        self._refill_lock = threading.Lock()     # Only one refill runs at a time
+        self._prefetch_generation = 0            # Bumped on key change to drop in-flight refills
+        self.prefetch_hits = 0
+        self.prefetch_misses = 0
+        self._prefetch_wakeup = None
+        self._prefetch_thread = None
+        if prefetch_in_background and keystream_prefetch_depth > 0:
+            self.start_prefetch_worker()
 
         logger.info(f"PDCP Tx initialized for Bearer {bearer_id}, Direction {direction}, "
                     f"Integrity: {'Enabled' if integrity_enabled else 'Disabled'}, "
@@ -48,40 +131,138 @@ class PDCPTransmitter:
             self.hfn_latch = (self.hfn_latch + 1) % (1 << (32 - self.sn_length_bits))
         return current_count, sn_to_use, hfn_to_use
 
+    def _reserve_counts(self, num_counts: int) -> int:
+        """
+        Reserves the next num_counts COUNTs in one step and returns the first. The reserved COUNTs
+        are consecutive modulo 2^32, which covers SN wrap (HFN increment) and HFN wrap inside the range.
+        """
+        start_count = self._next_tx_count()
+        if num_counts <= 0:
+            return start_count
+        self.tx_count = (start_count + num_counts - 1) & 0xFFFFFFFF
+        next_count = (start_count + num_counts) & 0xFFFFFFFF
+        self.hfn_latch = next_count >> self.sn_length_bits
+        self.next_tx_sn = next_count & self.max_sn
+        return start_count
+
+    def _next_tx_count(self) -> int:
+        return (self.hfn_latch << self.sn_length_bits) | self.next_tx_sn
+
+    def prefetch_keystream(self) -> int:
+        """
+        Tops the prefetch ring up to keystream_prefetch_depth entries for the COUNTs that follow
+        the last prefetched one, all in one keystream pass. Call it during idle periods (or let
+        the background worker do it). Returns the number of entries added.
+        """
+        if self.keystream_prefetch_depth <= 0 or not self.ciphering_enabled:
+            return 0
+        if not self._refill_lock.acquire(blocking=False):
+            return 0 # Another refill is already running
+        try:
+            with self._prefetch_lock:
+                generation = self._prefetch_generation
+                keystream_generator = self.security.keystream
+                next_count = self._next_tx_count()
+                if self._prefetched:
+                    next_count = (self._prefetched[-1][0] + 1) & 0xFFFFFFFF
+                missing = self.keystream_prefetch_depth - len(self._prefetched)
+            if missing <= 0:
+                return 0
+            # COUNT = HFN << SN_length | SN, so successive COUNTs (HFN wrap included) are just +1 mod 2^32
+            counts = [(next_count + i) & 0xFFFFFFFF for i in range(missing)]
+            keystreams = keystream_generator.generate(counts, [self.keystream_prefetch_max_len] * missing)
+            with self._prefetch_lock:
+                if generation != self._prefetch_generation:
+                    return 0 # Keys changed while generating: this material is stale
+                self._prefetched.extend(zip(counts, keystreams))
+            return missing
+        finally:
+            self._refill_lock.release()
+
+    def _take_prefetched_keystream(self, count: int, length: int):
+        """Returns the prefetched keystream for COUNT if it covers length bytes, else None (a miss)."""
+        with self._prefetch_lock:
+            # Drop entries for COUNTs already passed (e.g. a refill that raced with sends)
+            while self._prefetched and ((count - self._prefetched[0][0]) & 0xFFFFFFFF) < 0x80000000 \
+                    and self._prefetched[0][0] != count:
+                self._prefetched.popleft()
+            keystream = None
+            if self._prefetched and self._prefetched[0][0] == count:
+                prefetched_count, keystream = self._prefetched.popleft()
+                if len(keystream) < length:
+                    keystream = None # SDU longer than keystream_prefetch_max_len
+            remaining = len(self._prefetched)
+        if keystream is None:
+            self.prefetch_misses += 1
+        else:
+            self.prefetch_hits += 1
+        if self._prefetch_wakeup is not None and remaining <= self.keystream_prefetch_depth // 2:
+            self._prefetch_wakeup.set()
+        return keystream
+
+    def start_prefetch_worker(self):
+        """Starts a daemon thread that refills the keystream ring whenever it drops to half full."""
+        if self._prefetch_thread is not None:
+            return
+        self._prefetch_wakeup = threading.Event()
+        self._prefetch_thread = threading.Thread(target=self._prefetch_worker_loop, daemon=True,
+                                                 name=f"pdcp-tx-prefetch-b{self.bearer_id}")
+        self._prefetch_thread.start()
+        self._prefetch_wakeup.set()
+
+    def stop_prefetch_worker(self):
+        thread, self._prefetch_thread = self._prefetch_thread, None
+        if thread is not None:
+            wakeup, self._prefetch_wakeup = self._prefetch_wakeup, None
+            wakeup.set()
+            thread.join()
+
+    def _prefetch_worker_loop(self):
+        wakeup = self._prefetch_wakeup
+        while True:
+            wakeup.wait()
+            wakeup.clear()
+            if self._prefetch_thread is None:
+                return
+            self.prefetch_keystream()
+
+    def update_keys(self, integrity_key: bytes = None, cipher_key: bytes = None):
+        """
+        Installs new keys (e.g. after a key refresh). Prefetched keystream was derived
+        from the old cipher key, so it is discarded along with any refill in progress.
+        """
+        if integrity_key is not None:
+            self.integrity_key = integrity_key
+        if cipher_key is not None:
+            self.cipher_key = cipher_key
+        with self._prefetch_lock:
+            self.security = SecurityContext(self.bearer_id, self.direction,
+                                            integrity_key=self.integrity_key if self.integrity_enabled else None,
+                                            cipher_key=self.cipher_key if self.ciphering_enabled else None)
+            self._prefetch_generation += 1
+            self._prefetched.clear()
+        logger.info(f"[TX B:{self.bearer_id}] Keys updated, keystream prefetch invalidated.")
+        if self._prefetch_wakeup is not None:
+            self._prefetch_wakeup.set()
+
     def send_sdu(self, sdu_id: int, sdu_payload: bytes) -> PDCP_PDU:
         sdu_count, sn, hfn = self._get_current_count_and_increment()
-        logger.debug(f"[TX B:{self.bearer_id} D:{self.direction}] Preparing SDU ID {sdu_id}, COUNT={sdu_count}, SN={sn}, HFN={hfn}")
-
-        # 1. (Optional) Header Compression - STUBBED
-        # For simplicity, compressed_payload is the same as sdu_payload
-        compressed_payload = sdu_payload # Replace with actual RoHC if implemented
 
-        # Data to be integrity protected (PDCP Header info + SDU)
-        # For simplicity in this simulation, the "PDCP Header info" part is implicitly covered by
-        # COUNT, BEARER, DIRECTION inputs to MAC-I. The `data_for_integrity` is the SDU.
-        # In a real PDU, you'd construct header bytes. Here, `compressed_payload` is what MAC-I is calculated over.
-        data_for_integrity = compressed_payload
-        
-        calculated_mac_i = None
-        if self.integrity_enabled:
-            calculated_mac_i = crypto_stub.calculate_mac_i(
-                self.integrity_key, sdu_count, self.bearer_id, self.direction, data_for_integrity
-            )
-            logger.debug(f"[TX B:{self.bearer_id}] SDU ID {sdu_id} COUNT {sdu_count}: Calculated MAC-I: {calculated_mac_i.hex()}")
-            payload_to_cipher = data_for_integrity + calculated_mac_i
-        else:
-            payload_to_cipher = data_for_integrity
-            logger.debug(f"[TX B:{self.bearer_id}] SDU ID {sdu_id} COUNT {sdu_count}: Integrity disabled, no MAC-I.")
-
-        # 2. Ciphering (after integrity protection, MAC is also ciphered)
-        final_payload_for_pdu = payload_to_cipher # Default if ciphering is off
-        if self.ciphering_enabled:
-            final_payload_for_pdu = cipher_stub.encrypt(
-                self.cipher_key, sdu_count, self.bearer_id, self.direction, payload_to_cipher
-            )
-            logger.debug(f"[TX B:{self.bearer_id}] SDU ID {sdu_id} COUNT {sdu_count}: Ciphered payload length: {len(final_payload_for_pdu)}")
-        else:
-            logger.debug(f"[TX B:{self.bearer_id}] SDU ID {sdu_id} COUNT {sdu_count}: Ciphering disabled.")
+        # 1. (Optional) Header Compression or UDC; a missing or empty SDU is protected as is, like the ciphering path does
+        compressed_payload = sdu_payload
+        if self.header_compressor is not None and sdu_payload:
+            compressed_payload = self.header_compressor.compress(sdu_payload)
+        elif self.udc_compressor is not None and sdu_payload:
+            compressed_payload = self.udc_compressor.compress(sdu_payload)
+
+        # Integrity protection then ciphering (MAC-I is ciphered with the data), one call per packet.
+        # The "PDCP Header info" part is implicitly covered by COUNT, BEARER, DIRECTION inputs to MAC-I.
+        keystream = None
+        if self.keystream_prefetch_depth > 0 and self.ciphering_enabled:
+            keystream = self._take_prefetched_keystream(
+                sdu_count, self.security.protected_length(len(compressed_payload)))
+        final_payload_for_pdu, calculated_mac_i = self.security.protect(sdu_count, compressed_payload,
+                                                                        keystream=keystream)
 
         # Create PDCP PDU
         # The `payload` field of PDCP_PDU now holds the (possibly compressed), (possibly integrity protected), (possibly ciphered) data.
@@ -89,16 +270,210 @@ class PDCPTransmitter:
         # It's not strictly needed in the PDU object if the MAC is embedded in `final_payload_for_pdu` and extracted by Rx.
         # However, storing it can be useful for debugging/verification.
         pdu = PDCP_PDU(sdu_id, sn, sdu_count, hfn, final_payload_for_pdu, mac_i=calculated_mac_i)
-        pdu.status = "TX_Prepared"
-        logger.info(f"[TX B:{self.bearer_id} D:{self.direction}] SENT SDU ID {sdu_id} as PDU (SN:{sn}, COUNT:{sdu_count}, MAC:{calculated_mac_i.hex() if calculated_mac_i else 'N/A'})")
+        pdu.status = PDUStatus.TX_PREPARED
+        if self.tx_buffer_max_bytes:
+            self._buffer_for_retransmission(sdu_count, sdu_id, final_payload_for_pdu)
+        self.transmitted_pdus += 1
+        if self.tracer.mask & tracing.TX:
+            self.tracer.record(tracing.TX_SENT, sdu_id, sdu_count, sn, pdu.status, self.bearer_id, self.direction)
         return pdu
 
+    def send_sdus(self, sdus, as_batch: bool = False):
+        """
+        Bulk version of send_sdu for an iterable of (sdu_id, payload) pairs. The COUNT range for the
+        whole burst is reserved at once and protection runs as one batch; COUNT/SN/HFN assignment
+        is identical to calling send_sdu for each SDU in turn. Returns the PDUs as a list, or as a
+        PDUBatch when as_batch is True.
+        """
+        sdus = list(sdus)
+        if not sdus:
+            return PDUBatch() if as_batch else []
+        start_count = self._reserve_counts(len(sdus))
+        counts = [(start_count + i) & 0xFFFFFFFF for i in range(len(sdus))]
+        payloads = [payload for _, payload in sdus]
+        if self.header_compressor is not None:
+            payloads = [self.header_compressor.compress(payload) if payload else payload for payload in payloads]
+        elif self.udc_compressor is not None:
+            payloads = [self.udc_compressor.compress(payload) if payload else payload for payload in payloads]
+
+        keystreams = None
+        if self.keystream_prefetch_depth > 0 and self.ciphering_enabled:
+            keystreams = [self._take_prefetched_keystream(count, self.security.protected_length(len(payload or b'')))
+                          for count, payload in zip(counts, payloads)]
+        protected = self.security.protect_batch(counts, payloads, keystreams)
+        if self.tx_buffer_max_bytes:
+            for (sdu_id, _), count, (final_payload_for_pdu, _) in zip(sdus, counts, protected):
+                self._buffer_for_retransmission(count, sdu_id, final_payload_for_pdu)
+
+        if as_batch:
+            pdus = PDUBatch()
+            for (sdu_id, _), count, (final_payload_for_pdu, _) in zip(sdus, counts, protected):
+                pdus.append(sdu_id, count & self.max_sn, count, count >> self.sn_length_bits,
+                            final_payload_for_pdu, status=PDUStatus.TX_PREPARED)
+        else:
+            pdus = []
+            for (sdu_id, _), count, (final_payload_for_pdu, calculated_mac_i) in zip(sdus, counts, protected):
+                pdu = PDCP_PDU(sdu_id, count & self.max_sn, count, count >> self.sn_length_bits,
+                               final_payload_for_pdu, mac_i=calculated_mac_i)
+                pdu.status = PDUStatus.TX_PREPARED
+                pdus.append(pdu)
+        self.transmitted_pdus += len(pdus)
+        if self.tracer.mask & tracing.TX:
+            for (sdu_id, _), count in zip(sdus, counts):
+                self.tracer.record(tracing.TX_SENT, sdu_id, count, count & self.max_sn, PDUStatus.TX_PREPARED,
+                                   self.bearer_id, self.direction)
+        return pdus
+
+    def _buffer_for_retransmission(self, count: int, sdu_id, payload):
+        """Keeps a sent PDU until it is acknowledged, its discardTimer expires or the buffer limit pushes it out."""
+        deadline = None if self.discard_timer is None else self.clock.now + self.discard_timer
+        self.tx_buffer[count] = (sdu_id, payload, deadline)
+        self.tx_buffer_bytes += len(payload)
+        while self.tx_buffer_bytes > self.tx_buffer_max_bytes:
+            self._drop_oldest_buffered()
+            self.tx_buffer_overflow_discards += 1
+        self.tx_buffer_peak_bytes = max(self.tx_buffer_peak_bytes, self.tx_buffer_bytes)
+        if deadline is not None and self._discard_timer_handle is None:
+            self._discard_timer_handle = self.clock.schedule(self.discard_timer, self._on_discard_timer)
+
+    def _drop_oldest_buffered(self):
+        count, (sdu_id, payload, _) = self.tx_buffer.popitem(last=False)
+        self.tx_buffer_bytes -= len(payload)
+        if self.tracer.mask & tracing.TX:
+            self.tracer.record(tracing.TX_DISCARDED, sdu_id, count, count & self.max_sn, 0, self.bearer_id, self.direction)
+
+    def _on_discard_timer(self):
+        """
+        discardTimer expired for the oldest buffered COUNT. Deadlines follow COUNT order (one duration,
+        started at send time), so every expired entry is at the front; the timer is re-armed for the next one.
+        """
+        self._discard_timer_handle = None
+        while self.tx_buffer:
+            deadline = next(iter(self.tx_buffer.values()))[2]
+            if deadline > self.clock.now:
+                self._discard_timer_handle = self.clock.schedule(deadline - self.clock.now, self._on_discard_timer)
+                return
+            self._drop_oldest_buffered()
+            self.discard_timer_expiries += 1
+
+    def receive_status_report(self, report) -> list:
+        """
+        Handles a PDCP status report from the peer receiver (a control PDCP_PDU from
+        PDCPReceiver.build_status_report, or its encoded bytes). COUNTs below FMC and those the
+        bitmap marks received are released from the transmit buffer; FMC and the COUNTs marked
+        missing are retransmitted from their stored protected bytes. COUNTs past the last bit set in
+        the bitmap are left buffered. Returns the retransmitted PDUs.
+        """
+        if isinstance(report, PDCP_PDU):
+            if report.is_corrupted_by_channel:
+                self.status_report_errors += 1
+                return []
+            report = report.payload
+        try:
+            fmc, bitmap = pdcp_wire.parse_status_report(report)
+        except pdcp_wire.PDUFormatError as e:
+            self.status_report_errors += 1
+            logger.warning(f"[TX B:{self.bearer_id}] Ignoring malformed status report: {e}")
+            return []
+        self.status_reports_received += 1
+
+        # Acknowledged below FMC (COUNTs compared modulo 2^32, half the space behind FMC)
+        while self.tx_buffer and 0 < ((fmc - next(iter(self.tx_buffer))) & 0xFFFFFFFF) < 0x80000000:
+            count, (_, payload, _) = self.tx_buffer.popitem(last=False)
+            self.tx_buffer_bytes -= len(payload)
+
+        # The bitmap ends at the last received COUNT (TS 38.323 clause 6.3.10): zero bits after the last set
+        # bit are padding of the final byte and say nothing about COUNTs that may still be in flight
+        last = len(bitmap)
+        while last and not bitmap[last - 1]:
+            last -= 1
+        missing = [fmc]
+        for byte_index, byte in enumerate(bitmap[:last]):
+            base = fmc + 1 + 8 * byte_index
+            bits = 8 if byte_index < last - 1 else 8 - ((byte & -byte).bit_length() - 1)
+            for bit in range(bits):
+                count = (base + bit) & 0xFFFFFFFF
+                if byte & (0x80 >> bit):
+                    entry = self.tx_buffer.pop(count, None)
+                    if entry is not None:
+                        self.tx_buffer_bytes -= len(entry[1])
+                else:
+                    missing.append(count)
+
+        retransmissions = []
+        for count in missing:
+            entry = self.tx_buffer.get(count)
+            if entry is None:
+                continue # Never buffered, or already discarded
+            sdu_id, payload, _ = entry
+            pdu = PDCP_PDU(sdu_id, count & self.max_sn, count, count >> self.sn_length_bits, payload)
+            pdu.status = PDUStatus.TX_PREPARED
+            retransmissions.append(pdu)
+            if self.tracer.mask & tracing.TX:
+                self.tracer.record(tracing.TX_RETRANSMITTED, sdu_id, count, pdu.sn, pdu.status,
+                                   self.bearer_id, self.direction)
+        self.retransmitted_pdus += len(retransmissions)
+        return retransmissions
+
+    def on_udc_feedback(self):
+        """The peer's UDC decompressor lost sync (PDCPReceiver.take_udc_feedback): reset the compression buffer."""
+        if self.udc_compressor is not None:
+            self.udc_compressor.reset()
+            logger.info(f"[TX B:{self.bearer_id}] UDC feedback received, compression buffer reset.")
+
+    def encode_pdus(self, pdus, out: bytearray = None) -> bytearray:
+        """
+        Serialises PDUs (a list of PDCP_PDU or a PDUBatch) as length-prefixed data PDUs in the
+        pdcp_wire format, appended to `out` (a new bytearray if None). Only SN and payload go on
+        the wire; sdu_id, COUNT and the channel flags do not. Returns the buffer.
+        """
+        if isinstance(pdus, PDUBatch):
+            arena = memoryview(pdus.payload_arena) # Payloads go from the arena to the wire without a copy
+            offsets = pdus.payload_offsets
+            frames = [(sn, arena[offsets[i]:offsets[i + 1]]) for i, sn in enumerate(pdus.sns)]
+        else:
+            frames = [(pdu.sn, pdu.payload) for pdu in pdus]
+        out = bytearray() if out is None else out
+        start = len(out)
+        pdcp_wire.encode_frames(frames, self.sn_length_bits, out)
+        self.wire_bytes_sent += len(out) - start
+        return out
+
+    def get_stats(self):
+        stats = {
+            "transmitted_pdus": self.transmitted_pdus,
+            "wire_bytes_sent": self.wire_bytes_sent,
+            "keystream_prefetch_hits": self.prefetch_hits,
+            "keystream_prefetch_misses": self.prefetch_misses,
+            "keystream_prefetch_buffered": len(self._prefetched),
+        }
+        if self.tx_buffer_max_bytes:
+            stats.update({
+                "tx_buffer_pdus": len(self.tx_buffer),
+                "tx_buffer_bytes": self.tx_buffer_bytes,
+                "tx_buffer_peak_bytes": self.tx_buffer_peak_bytes,
+                "retransmitted_pdus": self.retransmitted_pdus,
+                "discard_timer_expiries": self.discard_timer_expiries,
+                "tx_buffer_overflow_discards": self.tx_buffer_overflow_discards,
+                "status_reports_received": self.status_reports_received,
+                "status_report_errors": self.status_report_errors,
+            })
+        if self.header_compressor is not None:
+            stats.update(self.header_compressor.get_stats())
+        if self.udc_compressor is not None:
+            stats.update(self.udc_compressor.get_stats())
+        return stats
+
 
 class PDCPReceiver:
     def __init__(self, bearer_id: int, direction: int, integrity_key: bytes = None, cipher_key: bytes = None,
-                 integrity_enabled: bool = False, ciphering_enabled: bool = False, sn_length_bits: int = SN_LENGTH_BITS):
+                 integrity_enabled: bool = False, ciphering_enabled: bool = False, sn_length_bits: int = SN_LENGTH_BITS,
+                 t_reordering=T_REORDERING, clock: SimClock = None, header_compression: bool = False,
+                 uplink_data_compression: bool = False, udc_dictionary: bytes = None,
+                 tracer: tracing.TraceBuffer = None, delivery_sink=None, security: SecurityContext = None):
         self.bearer_id = bearer_id
         self.direction = direction # Should be opposite of Tx (e.g. 1 for DL if Tx is UL)
+        self.tracer = tracer if tracer is not None else tracing.default_tracer
 
         self.integrity_key = integrity_key
         self.cipher_key = cipher_key
@@ -110,199 +485,414 @@ class PDCPReceiver:
         # Ciphering can be enabled even if integrity is not, but key is needed if enabled.
         if self.ciphering_enabled and not self.cipher_key:
             raise ValueError("Ciphering enabled but no cipher key provided.")
+        self.security = security if security is not None else SecurityContext(
+            bearer_id, direction, integrity_key=integrity_key if integrity_enabled else None,
+            cipher_key=cipher_key if ciphering_enabled else None)
 
         self.sn_length_bits = sn_length_bits
         self.max_sn = (1 << self.sn_length_bits) - 1
-        self.window_size = WINDOW_SIZE # From config, e.g., 2**(SN_LENGTH_BITS - 1)
-
-        self.last_delivered_sn = -1 # SN of the last in-sequence PDU delivered
-        self.next_expected_sn = 0   # SN expected for in-order delivery
-        self.hfn_rcv = 0            # Current HFN at receiver side
-        
-        self.reordering_buffer = {} # SN -> PDCP_PDU
-        self.delivered_sdus = []    # List of (sdu_id, payload)
-        self.received_counts = set() # To detect duplicates based on full COUNT
+        self.window_size = 1 << (self.sn_length_bits - 1) # Window_Size = 2^(SN length - 1), per SN length
+
+        # Receive state variables (TS 38.323 clause 7.1), all full COUNT values
+        self.rx_next = 0   # RX_NEXT: COUNT following the highest COUNT received
+        self.rx_deliv = 0  # RX_DELIV: first COUNT not yet delivered to upper layers
+        self.rx_reord = 0  # RX_REORD: COUNT following the one that started t-Reordering
+
+        # t-Reordering, in simulation time units of `clock`; None disables it (gaps then stall delivery)
+        self.t_reordering = t_reordering
+        self.clock = clock if clock is not None else SimClock()
+        self._t_reordering_timer = None
+        self.t_reordering_expiries = 0
+        self.skipped_counts = 0 # COUNTs given up on when t-Reordering expired
+
+        self.reordering_buffer = {} # COUNT -> PDCP_PDU
+        self.delivery_sink = delivery_sink # Upper layer (see delivery_sink.py); None keeps nothing
+        self.delivery_latencies = collections.Counter() # Reception-to-delivery time -> number of SDUs
+        # Duplicate detection on full COUNT: a bitmap of the COUNTs received in
+        # [next delivery COUNT - window_size, next delivery COUNT + window_size); older COUNTs are rejected.
+        self.replay_window = ReplayWindow(2 * self.window_size, lower_edge=-self.window_size)
 
         self.discarded_integrity_failures = 0
         self.discarded_duplicates = 0
         self.discarded_old_packets = 0
+        self.discarded_decompression_failures = 0
+        self.discarded_malformed = 0 # Frames (or buffer tails) receive_bytes could not parse
         self.successful_deliveries = 0
+        # Decompression runs at delivery, i.e. after integrity verification and in COUNT order
+        if header_compression and uplink_data_compression:
+            raise ValueError("Header compression and UDC cannot both be configured on a bearer.")
+        self.header_decompressor = HeaderDecompressor() if header_compression else None
+        self.udc_decompressor = UDCDecompressor(udc_dictionary) if uplink_data_compression else None
+        self.wire_bytes_received = 0 # Bytes passed to receive_bytes, headers and framing included
+        self.status_reports_sent = 0
         
         logger.info(f"PDCP Rx initialized for Bearer {bearer_id}, Direction {direction}, "
                     f"Integrity: {'Enabled' if integrity_enabled else 'Disabled'}, "
                     f"Ciphering: {'Enabled' if ciphering_enabled else 'Disabled'}")
 
-    def _estimate_hfn(self, rcvd_sn: int) -> int:
-        # Simplified HFN estimation. More robust logic may be needed for wrap-around.
-        # This estimation is crucial for COUNT reconstruction.
-        # Assumes rcvd_sn is reasonably close to next_expected_sn or last_delivered_sn
-        ref_sn = self.last_delivered_sn if self.last_delivered_sn != -1 else self.next_expected_sn
-
-        if abs(rcvd_sn - ref_sn) < self.window_size:
-            # SN is within window, HFN is likely the same
-            return self.hfn_rcv
-        elif rcvd_sn < ref_sn and (ref_sn - rcvd_sn) > (self.max_sn - self.window_size +1) : # Late arrival from previous HFN cycle
-            # Received SN is small, reference SN is large -> HFN likely wrapped
-             return (self.hfn_rcv + 1) % (1 << (32 - self.sn_length_bits))
-        elif rcvd_sn > ref_sn and (rcvd_sn - ref_sn) > (self.max_sn - self.window_size +1): # Early arrival for next HFN cycle
-            # Received SN is large, reference SN is small -> HFN likely from previous cycle (packet very old or reordered)
-            if self.hfn_rcv > 0:
-                return (self.hfn_rcv - 1) % (1 << (32 - self.sn_length_bits))
-            else: # Cannot go below HFN 0
-                 return 0 # Or handle as out-of-window error more explicitly
-        return self.hfn_rcv # Default if unsure or within typical window
-
     def _reconstruct_count(self, rcvd_sn: int) -> int:
-        estimated_hfn = self._estimate_hfn(rcvd_sn)
-        return (estimated_hfn << self.sn_length_bits) | rcvd_sn
+        """
+        RCVD_COUNT from the received SN relative to RX_DELIV (TS 38.323 clause 5.2.2.1), modulo 2^32:
+        past the highest HFN it wraps to HFN 0. A negative result means the SN belongs before the
+        first COUNT 0, i.e. an old PDU.
+        """
+        deliv_sn = self.rx_deliv & self.max_sn
+        deliv_hfn = self.rx_deliv >> self.sn_length_bits
+        if rcvd_sn < deliv_sn - self.window_size:
+            rcvd_hfn = deliv_hfn + 1
+        elif rcvd_sn >= deliv_sn + self.window_size:
+            rcvd_hfn = deliv_hfn - 1
+        else:
+            rcvd_hfn = deliv_hfn
+        return ((rcvd_hfn << self.sn_length_bits) | rcvd_sn) & _COUNT_MASK if rcvd_hfn >= 0 else -1
 
-    def receive_pdu(self, pdu: PDCP_PDU):
-        logger.debug(f"[RX B:{self.bearer_id} D:{self.direction}] Received PDU: SDU_ID {pdu.sdu_id}, SN {pdu.sn}, In-Payload len {len(pdu.payload)}")
-        pdu.status = "RX_Received"
+    def _precheck(self, pdu: PDCP_PDU):
+        """Channel-corruption check. Returns False if the PDU is discarded."""
+        pdu.status = PDUStatus.RX_RECEIVED
+        pdu.reception_time = self.clock.now
+        if self.tracer.mask & tracing.RX:
+            self._trace(tracing.RX_RECEIVED, pdu)
 
         if pdu.is_corrupted_by_channel: # This is physical layer CRC failure, not integrity
-            logger.warning(f"[RX B:{self.bearer_id}] Discarding PDU SDU_ID {pdu.sdu_id} (SN {pdu.sn}) due to channel corruption.")
-            pdu.status = "Discarded_ChannelCorruption"
+            pdu.status = PDUStatus.DISCARDED_CHANNEL_CORRUPTION
+            if self.tracer.mask & tracing.RX:
+                self._trace(tracing.RX_DISCARDED, pdu)
             return False # Cannot process further
+        return True
 
-        # 1. Reconstruct COUNT
+    def _rcvd_count(self, pdu: PDCP_PDU):
+        """1. Reconstructs COUNT. Returns it, or None if the PDU is discarded as older than COUNT 0."""
         # NOTE: COUNT reconstruction MUST happen before deciphering and integrity if they depend on COUNT.
         rcvd_count = self._reconstruct_count(pdu.sn)
+        if rcvd_count < 0:
+            self._discard_old(pdu, rcvd_count)
+            return None
         pdu.count = rcvd_count # Update PDU with reconstructed COUNT for logging/consistency
-        logger.debug(f"[RX B:{self.bearer_id}] SDU_ID {pdu.sdu_id} (SN {pdu.sn}): Reconstructed COUNT = {rcvd_count} (Est. HFN {rcvd_count >> self.sn_length_bits})")
-
-        # 2. Deciphering
-        # The PDU payload contains (SDU + MAC-I) ciphered together if ciphering was enabled.
-        payload_after_deciphering = pdu.payload # Default if ciphering is off
-        if self.ciphering_enabled:
-            if not self.cipher_key:
-                logger.error(f"[RX B:{self.bearer_id}] SDU_ID {pdu.sdu_id} (COUNT {rcvd_count}): Ciphering enabled but no key. CANNOT DECIPHER.")
-                pdu.status = "Discarded_DecipherError_NoKey"
-                return False # Critical error
-
-            payload_after_deciphering = cipher_stub.decrypt(
-                self.cipher_key, rcvd_count, self.bearer_id, self.direction, pdu.payload
-            )
-            logger.debug(f"[RX B:{self.bearer_id}] SDU_ID {pdu.sdu_id} (COUNT {rcvd_count}): Deciphered payload length: {len(payload_after_deciphering)}")
-            if pdu.is_tampered_by_channel:
-                 logger.warning(f"[RX B:{self.bearer_id}] SDU_ID {pdu.sdu_id} (COUNT {rcvd_count}): Payload was tampered in channel. Deciphered content may be garbage.")
-        else:
-            logger.debug(f"[RX B:{self.bearer_id}] SDU_ID {pdu.sdu_id} (COUNT {rcvd_count}): Ciphering disabled.")
-
-
-        # 3. Integrity Verification (if enabled)
-        # MAC-I is 4 bytes. It was appended to the SDU before ciphering.
-        # So, after deciphering, the last 4 bytes are the received MAC-I.
-        deciphered_sdu_data = payload_after_deciphering
-        received_mac_i = None
+        return rcvd_count
+
+    def _trace(self, event: int, pdu: PDCP_PDU, count: int = None):
+        self.tracer.record(event, pdu.sdu_id, pdu.count if count is None else count, pdu.sn, pdu.status,
+                           self.bearer_id, self.direction)
+
+    def _discard_old(self, pdu: PDCP_PDU, rcvd_count: int):
+        pdu.status = PDUStatus.DISCARDED_OLD
+        self.discarded_old_packets += 1
+        if self.tracer.mask & tracing.RX:
+            self._trace(tracing.RX_DISCARDED, pdu, rcvd_count)
+
+    def _check_integrity(self, pdu: PDCP_PDU, rcvd_count: int, unprotect_result) -> bool:
+        """
+        Applies the result of SecurityContext.unprotect to the PDU (2. Deciphering, 3. Integrity Verification).
+        Returns False if the PDU must be discarded.
+        """
+        deciphered_sdu_data, received_mac_i, verified = unprotect_result
+        if self.integrity_enabled and received_mac_i is None:
+            # MAC-I is 4 bytes appended to the SDU before ciphering; the payload cannot even hold it
+            pdu.integrity_verified = False
+            pdu.status = PDUStatus.DISCARDED_INTEGRITY_FAILURE_SHORT
+            self.discarded_integrity_failures += 1
+            if self.tracer.mask & tracing.RX:
+                self._trace(tracing.RX_DISCARDED, pdu)
+            return False
 
         if self.integrity_enabled:
-            if len(payload_after_deciphering) < 4:
-                logger.error(f"[RX B:{self.bearer_id}] SDU_ID {pdu.sdu_id} (COUNT {rcvd_count}): Deciphered payload too short ({len(payload_after_deciphering)} bytes) to contain MAC-I. Integrity check failed.")
-                pdu.integrity_verified = False
-                pdu.status = "Discarded_IntegrityFailure_Short"
-                self.discarded_integrity_failures += 1
-                return False
-
-            deciphered_sdu_data = payload_after_deciphering[:-4]
-            received_mac_i = payload_after_deciphering[-4:]
             pdu.mac_i = received_mac_i # Store the extracted MAC-I in the PDU object
-            logger.debug(f"[RX B:{self.bearer_id}] SDU_ID {pdu.sdu_id} (COUNT {rcvd_count}): Received MAC-I (extracted): {received_mac_i.hex()}")
-
-            if not self.integrity_key:
-                logger.error(f"[RX B:{self.bearer_id}] SDU_ID {pdu.sdu_id} (COUNT {rcvd_count}): Integrity enabled but no key. CANNOT VERIFY.")
-                pdu.integrity_verified = False # Cannot verify
-                pdu.status = "Discarded_IntegrityFailure_NoKey"
-                self.discarded_integrity_failures += 1 # Treat as failure
-                return False
-
-            calculated_x_mac = crypto_stub.calculate_mac_i(
-                self.integrity_key, rcvd_count, self.bearer_id, self.direction, deciphered_sdu_data
-            )
-            logger.debug(f"[RX B:{self.bearer_id}] SDU_ID {pdu.sdu_id} (COUNT {rcvd_count}): Calculated X-MAC: {calculated_x_mac.hex()}")
-
-            if calculated_x_mac != received_mac_i:
-                logger.warning(f"!!! INTEGRITY FAILURE !!! [RX B:{self.bearer_id}] SDU_ID {pdu.sdu_id} (COUNT {rcvd_count}): MAC mismatch. Expected {calculated_x_mac.hex()}, Got {received_mac_i.hex()}. Discarding PDU.")
+            if not verified:
                 pdu.integrity_verified = False
-                pdu.status = "Discarded_IntegrityFailure"
+                pdu.status = PDUStatus.DISCARDED_INTEGRITY_FAILURE
                 self.discarded_integrity_failures += 1
-                # If PDU was marked as tampered by channel, this is expected.
-                if pdu.is_tampered_by_channel:
-                    logger.info(f"[RX B:{self.bearer_id}] SDU_ID {pdu.sdu_id}: Integrity failure was due to simulated tampering.")
+                if self.tracer.mask & tracing.RX: # A preceding CHANNEL_TAMPERED event shows expected failures
+                    self._trace(tracing.RX_DISCARDED, pdu)
                 return False # Discard packet
-            else:
-                logger.info(f"[RX B:{self.bearer_id}] SDU_ID {pdu.sdu_id} (COUNT {rcvd_count}): Integrity VERIFIED.")
-                pdu.integrity_verified = True
+            pdu.integrity_verified = True
+            if self.tracer.mask & tracing.RX:
+                self._trace(tracing.RX_INTEGRITY_VERIFIED, pdu)
         else:
             # Integrity not enabled, so implicitly verified (or rather, not checked)
             pdu.integrity_verified = None # Mark as not applicable or True by default
-            logger.debug(f"[RX B:{self.bearer_id}] SDU_ID {pdu.sdu_id} (COUNT {rcvd_count}): Integrity check disabled/skipped.")
-        
-        pdu.deciphered_payload_data = deciphered_sdu_data # Store the actual user data part
 
-        # 4. Duplicate Check (using full COUNT)
-        if rcvd_count in self.received_counts:
-            logger.warning(f"[RX B:{self.bearer_id}] Discarding PDU SDU_ID {pdu.sdu_id} (COUNT {rcvd_count}) as duplicate.")
-            pdu.status = "Discarded_Duplicate"
-            self.discarded_duplicates += 1
+        pdu.deciphered_payload_data = deciphered_sdu_data # Store the actual user data part
+        return True
+
+    def _replay_verdict(self, rcvd_count: int):
+        """
+        Old/duplicate classification of a COUNT from the replay state alone, changing nothing.
+        Returns the discard status, or None if the COUNT is new.
+        """
+        # 4. Old Packet Check: COUNT below the replay window, or below RX_DELIV and never received
+        # (skipped when t-Reordering expired)
+        if self.replay_window.is_too_old(rcvd_count):
+            return PDUStatus.DISCARDED_OLD
+        # 5. Duplicate Check (using full COUNT)
+        if self.replay_window.is_duplicate(rcvd_count):
+            return PDUStatus.DISCARDED_DUPLICATE
+        if _count_distance(rcvd_count, self.rx_deliv) < 0:
+            return PDUStatus.DISCARDED_OLD
+        return None
+
+    def _prefilter(self, pdu: PDCP_PDU, rcvd_count: int) -> bool:
+        """
+        Window and duplicate checks, run before deciphering and MAC verification so that replayed or
+        duplicated PDUs cost no crypto. Returns False if the PDU is discarded.
+        """
+        verdict = self._replay_verdict(rcvd_count)
+        if verdict is None:
+            return True
+        if verdict == PDUStatus.DISCARDED_OLD:
+            self._discard_old(pdu, rcvd_count)
             return False
-        self.received_counts.add(rcvd_count)
-
-        # 5. Old Packet Check (based on sliding window, simplified)
-        # Define lower edge of receive window based on next_expected_sn and hfn_rcv
-        # This logic needs to be robust for SN wrap-around.
-        # A simple check: if SN is too far behind next_expected_sn, considering wrap-around.
-        # Example: next_expected_sn=5, window_size=1024, max_sn=4095. Window is roughly [ (5-1024+4096)%4096 ... 5 ]
-        # A packet is "old" if its SN falls outside the reception window.
-        # Window: [RX_DELIV - Reordering_Window_Size + 1, RX_DELIV + Reordering_Window_Size]
-        # More simply: if rcvd_count < ( (self.hfn_rcv << self.sn_length_bits | self.next_expected_sn) - self.window_size * SOME_FACTOR ):
-        # For now, a basic check: if rcvd_sn is significantly less than next_expected_sn and not a wrap-around case.
-        # This is complex; often tied to timer-based discard or explicit window boundaries.
-        # A simpler out-of-window check:
-        lower_window_edge_sn = (self.next_expected_sn - self.window_size + self.max_sn + 1) % (self.max_sn + 1)
-        
-        # This check is tricky. If a packet's COUNT is too old, it might be discarded.
-        # We rely on the HFN estimation and the `received_counts` for robust replay protection.
-        # A true "old packet" check might use a discard timer or if COUNT is outside a very large window.
-        # For this simulation, the duplicate check using full COUNT is the primary defense against most replays
-        # after integrity is verified.
+        pdu.status = verdict
+        self.discarded_duplicates += 1
+        if self.tracer.mask & tracing.RX:
+            self._trace(tracing.RX_DISCARDED, pdu)
+        return False
+
+    def _accept(self, pdu: PDCP_PDU, rcvd_count: int):
+        """
+        Commits a verified PDU: marks its COUNT in the replay window and stores it in the reordering
+        buffer. Only PDUs that passed integrity verification get here, so a forged PDU cannot mark a COUNT.
+        """
+        self.replay_window.mark(rcvd_count)
 
         # 6. Add to Reordering Buffer
-        self.reordering_buffer[pdu.sn] = pdu
-        logger.debug(f"[RX B:{self.bearer_id}] SDU_ID {pdu.sdu_id} (SN {pdu.sn}) added to reordering buffer.")
-        pdu.status = "RX_Buffered"
-
-        # 7. In-order Delivery from Reordering Buffer
+        self.reordering_buffer[rcvd_count] = pdu
+        if _count_distance(rcvd_count, self.rx_next) >= 0:
+            self.rx_next = (rcvd_count + 1) & _COUNT_MASK
+        pdu.status = PDUStatus.RX_BUFFERED
+        if self.tracer.mask & tracing.RX:
+            self._trace(tracing.RX_BUFFERED, pdu)
+
+    def _pop_consecutive(self, count: int, in_order: list) -> int:
+        """Moves the run of buffered COUNTs starting at count into in_order. Returns the first missing COUNT."""
+        while count in self.reordering_buffer:
+            in_order.append(self.reordering_buffer.pop(count))
+            count = (count + 1) & _COUNT_MASK
+        return count
+
+    def _set_rx_deliv(self, rx_deliv: int):
+        if rx_deliv != self.rx_deliv:
+            if (rx_deliv >> self.sn_length_bits) != (self.rx_deliv >> self.sn_length_bits):
+                logger.info(f"[RX B:{self.bearer_id}] HFN incremented to {rx_deliv >> self.sn_length_bits} due to SN wrap-around.")
+            self.rx_deliv = rx_deliv
+            self.replay_window.advance(rx_deliv - self.window_size)
+
+    def _advance_delivery(self) -> list:
+        """
+        7. After a PDU is stored: pops the in-order run starting at RX_DELIV, advances RX_DELIV and
+        stops or starts t-Reordering (TS 38.323 clause 5.2.2.1). Returns the popped PDUs.
+        """
+        in_order = []
+        self._set_rx_deliv(self._pop_consecutive(self.rx_deliv, in_order))
+        self._update_t_reordering()
+        return in_order
+
+    def _update_t_reordering(self):
+        if self.t_reordering is None:
+            return
+        if self._t_reordering_timer is not None and _count_distance(self.rx_deliv, self.rx_reord) >= 0:
+            self.clock.cancel(self._t_reordering_timer)
+            self._t_reordering_timer = None
+        if self._t_reordering_timer is None and _count_distance(self.rx_deliv, self.rx_next) < 0:
+            self.rx_reord = self.rx_next
+            self._t_reordering_timer = self.clock.schedule(self.t_reordering, self._on_t_reordering_expiry)
+            if self.tracer.mask & tracing.REORDERING:
+                self.tracer.record(tracing.T_REORDERING_STARTED, None, self.rx_reord, 0, 0, self.bearer_id, self.direction)
+
+    def _on_t_reordering_expiry(self):
+        """
+        t-Reordering expired: delivers everything stored below RX_REORD and the in-order run from
+        RX_REORD, giving up on the missing COUNTs in between, then restarts the timer if gaps remain.
+        """
+        self._t_reordering_timer = None
+        self.t_reordering_expiries += 1
+        below_reord = sorted((distance, count) for count in self.reordering_buffer
+                             for distance in (_count_distance(count, self.rx_reord),) if distance < 0)
+        in_order = [self.reordering_buffer.pop(count) for _, count in below_reord]
+        start = self.rx_reord if _count_distance(self.rx_reord, self.rx_deliv) >= 0 else self.rx_deliv
+        rx_deliv = self._pop_consecutive(start, in_order)
+        skipped = _count_distance(rx_deliv, self.rx_deliv) - len(in_order)
+        self.skipped_counts += skipped
+        if self.tracer.mask & tracing.REORDERING:
+            self.tracer.record(tracing.T_REORDERING_EXPIRED, None, rx_deliv, skipped, 0,
+                               self.bearer_id, self.direction)
+        self._set_rx_deliv(rx_deliv)
+        self._update_t_reordering()
+        self._deliver(in_order)
+
+    def _deliver(self, pdus_to_deliver) -> list:
+        """Hands in-order PDUs to the upper layer through the delivery sink. Returns the delivered SDU records."""
         delivered_now = []
-        while self.next_expected_sn in self.reordering_buffer:
-            pdu_to_deliver = self.reordering_buffer.pop(self.next_expected_sn)
-            
-            # Update HFN if SN wraps around
-            if self.next_expected_sn == 0 and self.last_delivered_sn == self.max_sn :
-                self.hfn_rcv = (self.hfn_rcv + 1) % (1 << (32 - self.sn_length_bits))
-                logger.info(f"[RX B:{self.bearer_id}] HFN incremented to {self.hfn_rcv} due to SN wrap-around.")
-
-            self.last_delivered_sn = self.next_expected_sn
-            self.next_expected_sn = (self.next_expected_sn + 1) % (self.max_sn + 1)
-            
-            self.delivered_sdus.append({'sdu_id': pdu_to_deliver.sdu_id, 
-                                        'payload': pdu_to_deliver.deciphered_payload_data, 
-                                        'count': pdu_to_deliver.count})
-            pdu_to_deliver.status = "Delivered"
-            self.successful_deliveries += 1
-            logger.info(f"[RX B:{self.bearer_id}] Delivered SDU ID {pdu_to_deliver.sdu_id} (SN {pdu_to_deliver.sn}, COUNT {pdu_to_deliver.count}) in-order.")
-            delivered_now.append(pdu_to_deliver)
-        
+        for pdu_to_deliver in pdus_to_deliver:
+            sdu = pdu_to_deliver.deciphered_payload_data
+            decompressor = self.header_decompressor or self.udc_decompressor
+            if decompressor is not None and sdu: # Empty SDUs are sent uncompressed
+                sdu = decompressor.decompress(sdu)
+                if sdu is None:
+                    pdu_to_deliver.status = PDUStatus.DISCARDED_DECOMPRESSION_FAILURE
+                    self.discarded_decompression_failures += 1
+                    if self.tracer.mask & tracing.RX:
+                        self._trace(tracing.RX_DISCARDED, pdu_to_deliver)
+                    continue
+            delivered_now.append({'sdu_id': pdu_to_deliver.sdu_id,
+                                  'payload': sdu,
+                                  'count': pdu_to_deliver.count})
+            pdu_to_deliver.status = PDUStatus.DELIVERED
+            self.delivery_latencies[self.clock.now - pdu_to_deliver.reception_time] += 1
+            if self.tracer.mask & tracing.RX:
+                self._trace(tracing.RX_DELIVERED, pdu_to_deliver)
+        if delivered_now and self.delivery_sink is not None:
+            self.delivery_sink.deliver(delivered_now)
+        self.successful_deliveries += len(delivered_now)
+        return delivered_now
+
+    def receive_pdu(self, pdu: PDCP_PDU):
+        if not self._precheck(pdu):
+            return False
+        rcvd_count = self._rcvd_count(pdu)
+        if rcvd_count is None or not self._prefilter(pdu, rcvd_count):
+            return False
+        if not self._check_integrity(pdu, rcvd_count, self.security.unprotect(rcvd_count, pdu.payload)):
+            return False
+        self._accept(pdu, rcvd_count)
+        self._deliver(self._advance_delivery())
         return True # Successfully processed or buffered
 
+    def receive_pdus(self, batch):
+        """
+        Processes a burst of PDUs (e.g. the output of ImpairedChannel.transmit or flush_reorder_buffer),
+        given as a list of PDCP_PDU or a PDUBatch.
+        COUNTs are reconstructed for the whole burst and pre-filtered against the replay state, then
+        every PDU that passed is deciphered and verified with one keystream pass, and the in-order SDUs
+        are handed to the upper layer once for the burst. A COUNT that appears more than once in the
+        burst is sent to the crypto pass once.
+        Returns (verdicts, delivered): one receive_pdu()-equivalent verdict per PDU, and the SDU
+        records delivered by this burst.
+        """
+        pdus = as_pdu_list(batch)
+        verdicts = [False] * len(pdus)
+        candidates = [(index, pdu, self._reconstruct_count(pdu.sn))
+                      for index, pdu in enumerate(pdus) if self._precheck(pdu)]
+        crypto_candidates = []
+        first_seen = set()
+        for candidate in candidates:
+            tentative_count = candidate[2]
+            if tentative_count >= 0 and tentative_count not in first_seen \
+                    and self._replay_verdict(tentative_count) is None:
+                first_seen.add(tentative_count)
+                crypto_candidates.append(candidate)
+        results = dict(zip((c[0] for c in crypto_candidates), self.security.unprotect_batch(
+            [c[2] for c in crypto_candidates], [c[1].payload for c in crypto_candidates])))
+
+        in_order = []
+        for index, pdu, tentative_count in candidates:
+            # Delivery earlier in this burst can move RX_DELIV across an SN wrap, and a copy of a COUNT
+            # that failed verification must still be checked: redo COUNT, filter and crypto exactly as
+            # the single-PDU path would have.
+            rcvd_count = self._rcvd_count(pdu)
+            if rcvd_count is None or not self._prefilter(pdu, rcvd_count):
+                continue
+            result = results.get(index) if rcvd_count == tentative_count else None
+            if result is None:
+                result = self.security.unprotect(rcvd_count, pdu.payload)
+            if not self._check_integrity(pdu, rcvd_count, result):
+                continue
+            self._accept(pdu, rcvd_count)
+            verdicts[index] = True
+            in_order.extend(self._advance_delivery())
+        return verdicts, self._deliver(in_order)
+
+    def receive_bytes(self, buffer):
+        """
+        Processes a receive buffer of length-prefixed wire-format PDUs (see pdcp_wire) as one burst.
+        Headers are parsed in place and ciphered payloads are read straight from the buffer, which is
+        not referenced once this returns. Only the SN is on the wire, so delivered records carry
+        sdu_id None. Returns receive_pdus()'s (verdicts, delivered); malformed input never raises.
+        A frame that is not a valid data PDU is discarded, and a length prefix running past the end
+        of the buffer discards the rest of it; each counts once in discarded_malformed (no verdict).
+        """
+        self.wire_bytes_received += len(buffer)
+        pdus = []
+        try:
+            for frame in pdcp_wire.iter_frames(buffer):
+                try:
+                    sn, payload = pdcp_wire.parse_data_pdu(frame, self.sn_length_bits)
+                except pdcp_wire.PDUFormatError as e:
+                    self._discard_malformed(e)
+                    continue
+                if not self.ciphering_enabled:
+                    payload = bytes(payload) # The delivered SDU is a slice of the payload itself
+                pdus.append(PDCP_PDU(None, sn, None, None, payload))
+        except pdcp_wire.PDUFormatError as e: # The framing can no longer be trusted
+            self._discard_malformed(e)
+        try:
+            return self.receive_pdus(pdus)
+        finally:
+            if self.ciphering_enabled:
+                for pdu in pdus:
+                    pdu.payload = None # Drop the views into the caller's buffer
+
+    def _discard_malformed(self, error: pdcp_wire.PDUFormatError):
+        self.discarded_malformed += 1
+        logger.warning(f"[RX B:{self.bearer_id}] Discarding malformed wire input: {error}")
+
+    def build_status_report(self) -> PDCP_PDU:
+        """
+        PDCP status report (TS 38.323 clause 5.4.1) as a control PDU for the peer transmitter's
+        receive_status_report(): FMC is RX_DELIV, and the bitmap covers FMC + 1 up to the highest
+        COUNT received (RX_NEXT - 1), marking the COUNTs held in the reordering buffer as received.
+        """
+        fmc = self.rx_deliv
+        span = _count_distance(self.rx_next, fmc) - 1 # COUNTs FMC + 1 .. RX_NEXT - 1
+        bitmap = bytearray((span + 7) // 8) if span > 0 else bytearray()
+        for count in self.reordering_buffer:
+            offset = _count_distance(count, fmc) - 1
+            if offset >= 0:
+                bitmap[offset >> 3] |= 0x80 >> (offset & 7)
+        report = PDCP_PDU(None, None, fmc, None, pdcp_wire.encode_status_report(fmc, bitmap), is_control_pdu=True)
+        report.status = PDUStatus.TX_PREPARED
+        self.status_reports_sent += 1
+        return report
+
+    def take_udc_feedback(self) -> bool:
+        """True if UDC lost sync since the last call; pass it on with PDCPTransmitter.on_udc_feedback()."""
+        return self.udc_decompressor is not None and self.udc_decompressor.take_feedback()
+
+    @property
+    def delivered_sdus(self) -> list:
+        """The records held by a ListSink delivery sink; empty for any other sink."""
+        return self.delivery_sink.records if isinstance(self.delivery_sink, ListSink) else []
+
     def get_delivered_sdus(self):
         return self.delivered_sdus
 
+    def drain_delivered_sdus(self) -> list:
+        """Returns the records waiting in a ListSink or QueueSink delivery sink and forgets them."""
+        drain = getattr(self.delivery_sink, "drain", None)
+        return drain() if drain is not None else []
+
+    def get_latency_percentiles(self, percentiles=(50, 90, 99)) -> dict:
+        """Reception-to-delivery latency percentiles (simulation time units) over all delivered SDUs."""
+        return histogram_percentiles(self.delivery_latencies, percentiles)
+
     def get_stats(self):
-        return {
+        stats = {
             "successful_deliveries": self.successful_deliveries,
             "discarded_integrity_failures": self.discarded_integrity_failures,
             "discarded_duplicates": self.discarded_duplicates,
-            "discarded_old_packets": self.discarded_old_packets, # Placeholder, not fully implemented
-            "buffered_packets": len(self.reordering_buffer)
-        }
\ No newline at end of file
+            "discarded_old_packets": self.discarded_old_packets,
+            "discarded_malformed": self.discarded_malformed,
+            "buffered_packets": len(self.reordering_buffer),
+            "t_reordering_expiries": self.t_reordering_expiries,
+            "skipped_counts": self.skipped_counts,
+            "wire_bytes_received": self.wire_bytes_received,
+            "status_reports_sent": self.status_reports_sent,
+        }
+        if hasattr(self.delivery_sink, "dropped"):
+            stats["delivery_sink_dropped"] = self.delivery_sink.dropped
+        if self.header_decompressor is not None or self.udc_decompressor is not None:
+            stats["discarded_decompression_failures"] = self.discarded_decompression_failures
+        if self.header_decompressor is not None:
+            stats.update(self.header_decompressor.get_stats())
+        if self.udc_decompressor is not None:
+            stats.update(self.udc_decompressor.get_stats())
+        return stats
\ No newline at end of file
@@ -1,16 +1,86 @@
 # pdcp_security_project/src/pdcp_packet.py
+import enum
+from array import array
+
+
+class PDUStatus(enum.IntEnum):
+    """Where a PDU is in the simulation. str() gives the label shown in logs and the web UI."""
+    SENT = 0
+    TX_PREPARED = 1
+    CHANNEL_TRANSIT = 2
+    CHANNEL_LOST = 3
+    CHANNEL_TAMPERED = 4
+    CHANNEL_CORRUPTED = 5
+    CHANNEL_OUTPUT = 6
+    CHANNEL_FLUSHED = 7
+    RX_RECEIVED = 8
+    RX_BUFFERED = 9
+    DELIVERED = 10
+    DISCARDED_CHANNEL_CORRUPTION = 11
+    DISCARDED_INTEGRITY_FAILURE = 12
+    DISCARDED_INTEGRITY_FAILURE_SHORT = 13
+    DISCARDED_DUPLICATE = 14
+    DISCARDED_OLD = 15
+    DISCARDED_DECOMPRESSION_FAILURE = 16
+
+    @property
+    def label(self) -> str:
+        return _STATUS_LABELS[self]
+
+    @property
+    def is_discarded(self) -> bool:
+        return self >= PDUStatus.DISCARDED_CHANNEL_CORRUPTION
+
+    def __str__(self):
+        return self.label
+
+
+_STATUS_LABELS = {
+    PDUStatus.SENT: "Sent",
+    PDUStatus.TX_PREPARED: "TX_Prepared",
+    PDUStatus.CHANNEL_TRANSIT: "Channel_Transit",
+    PDUStatus.CHANNEL_LOST: "Channel_Lost",
+    PDUStatus.CHANNEL_TAMPERED: "Channel_Tampered",
+    PDUStatus.CHANNEL_CORRUPTED: "Channel_Corrupted",
+    PDUStatus.CHANNEL_OUTPUT: "Channel_Output",
+    PDUStatus.CHANNEL_FLUSHED: "Channel_Flushed",
+    PDUStatus.RX_RECEIVED: "RX_Received",
+    PDUStatus.RX_BUFFERED: "RX_Buffered",
+    PDUStatus.DELIVERED: "Delivered",
+    PDUStatus.DISCARDED_CHANNEL_CORRUPTION: "Discarded_ChannelCorruption",
+    PDUStatus.DISCARDED_INTEGRITY_FAILURE: "Discarded_IntegrityFailure",
+    PDUStatus.DISCARDED_INTEGRITY_FAILURE_SHORT: "Discarded_IntegrityFailure_Short",
+    PDUStatus.DISCARDED_DUPLICATE: "Discarded_Duplicate",
+    PDUStatus.DISCARDED_OLD: "Discarded_Old",
+    PDUStatus.DISCARDED_DECOMPRESSION_FAILURE: "Discarded_DecompressionFailure",
+}
+
+
+class PDUFlag(enum.IntFlag):
+    """Per-PDU flag bits, kept in one int instead of separate boolean attributes."""
+    NONE = 0
+    CONTROL_PDU = 1           # e.g. PDCP status report
+    CORRUPTED_BY_CHANNEL = 2  # Random corruption (a lower-layer CRC failure)
+    TAMPERED_BY_CHANNEL = 4   # Malicious modification of the payload
+    DUPLICATED = 8            # The channel duplicated this PDU
+    REORDERED = 16            # The channel delayed this PDU
+
 
 class PDCP_PDU:
+    __slots__ = ("sdu_id", "sn", "count", "hfn", "payload", "mac_i", "flags", "deciphered_payload_data",
+                 "integrity_verified", "reception_time", "status")
+
     def __init__(self, sdu_id, sn, count, hfn, payload, mac_i=None, is_control_pdu=False):
         self.sdu_id = sdu_id          # Original SDU identifier for tracking
         self.sn = sn                  # PDCP Sequence Number (e.g., 12 or 18 bits)
         self.count = count            # Full 32-bit COUNT value (HFN + SN)
         self.hfn = hfn                # Hyper Frame Number part of COUNT
-        
+
         # In this model:
         # For Tx: `payload` is initially plaintext SDU. After compression (if any), integrity, ciphering,
         #         `payload` becomes the final PDCP PDU content to be sent (ciphered data + MAC).
         # For Rx: `payload` is the received PDCP PDU content (ciphered data + MAC).
+        # On Tx this is the bytearray written by SecurityContext.protect, referenced without copying.
         self.payload = payload # This will store the (potentially ciphered) SDU + MAC
 
         # mac_i:
@@ -18,15 +88,47 @@ class PDCP_PDU:
         # On Rx side: This will store the received (and deciphered) MAC-I extracted from the payload.
         self.mac_i = mac_i
 
-        self.is_control_pdu = is_control_pdu # e.g., PDCP status report
+        self.flags = PDUFlag.CONTROL_PDU if is_control_pdu else PDUFlag.NONE
 
         # Fields for Rx side processing and logging
-        self.is_corrupted_by_channel = False # Flag set by channel if random corruption occurs
-        self.is_tampered_by_channel = False # Flag set by channel if malicious tampering occurs
         self.deciphered_payload_data = None # Stores SDU part after deciphering and MAC stripping
         self.integrity_verified = None  # True, False, or None (if not checked)
         self.reception_time = None      # Simulation time of reception
-        self.status = "Sent"            # "Sent", "Received", "IntegrityFailed", "Delivered", "DiscardedDuplicate", "DiscardedOld"
+        self.status = PDUStatus.SENT
+
+    def _set_flag(self, flag: PDUFlag, value: bool):
+        self.flags = self.flags | flag if value else self.flags & ~flag
+
+    @property
+    def is_control_pdu(self) -> bool:
+        return bool(self.flags & PDUFlag.CONTROL_PDU)
+
+    @is_control_pdu.setter
+    def is_control_pdu(self, value: bool):
+        self._set_flag(PDUFlag.CONTROL_PDU, value)
+
+    @property
+    def is_corrupted_by_channel(self) -> bool: # Flag set by channel if random corruption occurs
+        return bool(self.flags & PDUFlag.CORRUPTED_BY_CHANNEL)
+
+    @is_corrupted_by_channel.setter
+    def is_corrupted_by_channel(self, value: bool):
+        self._set_flag(PDUFlag.CORRUPTED_BY_CHANNEL, value)
+
+    @property
+    def is_tampered_by_channel(self) -> bool: # Flag set by channel if malicious tampering occurs
+        return bool(self.flags & PDUFlag.TAMPERED_BY_CHANNEL)
+
+    @is_tampered_by_channel.setter
+    def is_tampered_by_channel(self, value: bool):
+        self._set_flag(PDUFlag.TAMPERED_BY_CHANNEL, value)
+
+    def copy(self) -> "PDCP_PDU":
+        """Shallow copy. Payloads are never modified in place, so the copy can share them."""
+        duplicate = PDCP_PDU.__new__(PDCP_PDU)
+        for name in PDCP_PDU.__slots__:
+            setattr(duplicate, name, getattr(self, name))
+        return duplicate
 
     def __repr__(self):
         return (f"PDCP_PDU(ID:{self.sdu_id}, SN:{self.sn}, COUNT:{self.count}, MAC:{self.mac_i.hex() if self.mac_i else 'N/A'}, "
@@ -46,4 +148,87 @@ class PDCP_PDU:
         # If you model PDCP header fields like D/C, R, etc., serialize them here.
         # For now, we'll use the SDU payload passed to the transmitter.
         return self.payload # This needs to be the SDU itself.
- 
\ No newline at end of file
+ 
+
+_MISSING = -1             # sdu_ids and counts are signed: a COUNT can take every 32-bit value
+_MISSING_U32 = 0xFFFFFFFF # sns and hfns: no SN (at most 18 bits) or HFN (at most 20 bits) reaches it
+
+
+class PDUBatch:
+    """
+    Columnar (struct-of-arrays) container for a burst of PDUs: one compact array per header field,
+    the flag bits and status codes as byte arrays, and all payloads back to back in a single arena
+    with an offsets array (payload i is arena[offsets[i]:offsets[i + 1]]). Per-PDU overhead is a few
+    tens of bytes instead of a Python object per PDU and per payload.
+    MAC-I is not stored separately: it is part of the protected payload.
+    Header fields that are None (e.g. sdu_id and COUNT of PDUs parsed off the wire, SN of a status
+    report) are stored as a sentinel and come back as None from pdu().
+    """
+    __slots__ = ("sdu_ids", "sns", "counts", "hfns", "flags", "statuses", "payload_arena", "payload_offsets")
+
+    def __init__(self):
+        self.sdu_ids = array('q')
+        self.sns = array('I')
+        self.counts = array('q')
+        self.hfns = array('I')
+        self.flags = bytearray()
+        self.statuses = bytearray()
+        self.payload_arena = bytearray()
+        self.payload_offsets = array('Q', [0])
+
+    def __len__(self):
+        return len(self.sdu_ids)
+
+    def append(self, sdu_id: int, sn: int, count: int, hfn: int, payload, flags: int = PDUFlag.NONE,
+               status: PDUStatus = PDUStatus.SENT):
+        self.sdu_ids.append(_MISSING if sdu_id is None else sdu_id)
+        self.sns.append(_MISSING_U32 if sn is None else sn)
+        self.counts.append(_MISSING if count is None else count)
+        self.hfns.append(_MISSING_U32 if hfn is None else hfn)
+        self.flags.append(flags)
+        self.statuses.append(status)
+        if payload:
+            self.payload_arena += payload
+        self.payload_offsets.append(len(self.payload_arena))
+
+    def append_pdu(self, pdu: PDCP_PDU):
+        self.append(pdu.sdu_id, pdu.sn, pdu.count, pdu.hfn, pdu.payload, pdu.flags, pdu.status)
+
+    def payload(self, index: int) -> bytes:
+        return bytes(self.payload_arena[self.payload_offsets[index]:self.payload_offsets[index + 1]])
+
+    def pdu(self, index: int) -> PDCP_PDU:
+        """Materialises PDU index as a PDCP_PDU object (with its own copy of the payload)."""
+        sdu_id, sn, count, hfn = self.sdu_ids[index], self.sns[index], self.counts[index], self.hfns[index]
+        pdu = PDCP_PDU(None if sdu_id == _MISSING else sdu_id, None if sn == _MISSING_U32 else sn,
+                       None if count == _MISSING else count, None if hfn == _MISSING_U32 else hfn, self.payload(index))
+        pdu.flags = PDUFlag(self.flags[index])
+        pdu.status = PDUStatus(self.statuses[index])
+        return pdu
+
+    def __iter__(self):
+        return (self.pdu(index) for index in range(len(self)))
+
+    def to_pdus(self) -> list:
+        return list(self)
+
+    @classmethod
+    def from_pdus(cls, pdus) -> "PDUBatch":
+        batch = cls()
+        for pdu in pdus:
+            batch.append_pdu(pdu)
+        return batch
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by the columns and the payload arena."""
+        columns = (self.sdu_ids, self.sns, self.counts, self.hfns, self.payload_offsets)
+        return (sum(len(column) * column.itemsize for column in columns)
+                + len(self.flags) + len(self.statuses) + len(self.payload_arena))
+
+
+def as_pdu_list(pdus) -> list:
+    """Accepts a PDUBatch or any iterable of PDCP_PDU and returns a list of PDCP_PDU."""
+    if isinstance(pdus, PDUBatch):
+        return pdus.to_pdus()
+    return list(pdus)
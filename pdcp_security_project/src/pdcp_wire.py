@@ -0,0 +1,150 @@
+# pdcp_security_project/src/pdcp_wire.py
+"""
+PDCP data PDU wire format (TS 38.323 clause 6.2.2).
+
+    12-bit SN: | D/C | R | R | R | SN (4 MSBs) |  SN (8 LSBs)  | data ... | MAC-I |
+    18-bit SN: | D/C | R R R R R | SN (2 MSBs) |  SN (16 LSBs) | data ... | MAC-I |
+
+D/C is 1 for a data PDU and R bits are 0. The protected payload from SecurityContext.protect
+(ciphered data with the ciphered MAC-I at its end) follows the header as-is.
+
+PDCP status report, a control PDU (clause 6.2.3.1):
+
+    | D/C=0 | PDU type=000 | R R R R | FMC (32 bits) | bitmap ... |
+
+FMC is the first missing COUNT. Bit i of the bitmap (MSB first) is COUNT FMC + 1 + i: 1 if it was
+received, 0 if it is missing.
+
+PDCP has no length field of its own (the lower layer frames PDUs), so a buffer holding many PDUs
+uses a 2-byte big-endian length in front of each one. Encoders write into a caller-provided
+buffer; parsers return memoryview slices of the input and never copy payloads.
+"""
+import struct
+
+DC_DATA_PDU = 0x80
+PDU_TYPE_STATUS_REPORT = 0x00 # Control PDU type, bits 6-4 of the first octet
+STATUS_REPORT_HEADER_LENGTH = 5
+HEADER_LENGTHS = {12: 2, 18: 3}
+FRAME_LENGTH_SIZE = 2
+MAX_PDU_LENGTH = 0xFFFF
+
+
+class PDUFormatError(ValueError):
+    """Raised when bytes cannot be parsed as a PDCP data PDU."""
+
+
+def header_length(sn_length_bits: int) -> int:
+    try:
+        return HEADER_LENGTHS[sn_length_bits]
+    except KeyError:
+        raise ValueError(f"Unsupported SN length {sn_length_bits}, expected 12 or 18.") from None
+
+
+def encoded_length(payload_length: int, sn_length_bits: int) -> int:
+    return header_length(sn_length_bits) + payload_length
+
+
+def encode_data_pdu_into(buffer, offset: int, sn: int, payload, sn_length_bits: int) -> int:
+    """
+    Writes header and payload at buffer[offset:] (a bytearray or writable memoryview large enough).
+    Returns the offset just past the PDU.
+    """
+    if sn >> sn_length_bits:
+        raise ValueError(f"SN {sn} does not fit in {sn_length_bits} bits.")
+    if sn_length_bits == 12:
+        struct.pack_into('>H', buffer, offset, (DC_DATA_PDU << 8) | sn)
+    else:
+        struct.pack_into('>BH', buffer, offset, DC_DATA_PDU | (sn >> 16), sn & 0xFFFF)
+    start = offset + header_length(sn_length_bits)
+    end = start + len(payload)
+    buffer[start:end] = payload
+    return end
+
+
+def encode_data_pdu(sn: int, payload, sn_length_bits: int) -> bytearray:
+    buffer = bytearray(encoded_length(len(payload), sn_length_bits))
+    encode_data_pdu_into(buffer, 0, sn, payload, sn_length_bits)
+    return buffer
+
+
+def parse_data_pdu(data, sn_length_bits: int):
+    """Parses one data PDU. Returns (sn, payload) where payload is a memoryview into data."""
+    view = data if isinstance(data, memoryview) else memoryview(data)
+    length = header_length(sn_length_bits)
+    if len(view) < length:
+        raise PDUFormatError(f"PDU of {len(view)} bytes is shorter than the {length}-byte header.")
+    first = view[0]
+    if not first & DC_DATA_PDU:
+        raise PDUFormatError("D/C bit is 0: control PDU, not a data PDU.")
+    if sn_length_bits == 12:
+        sn = ((first & 0x0F) << 8) | view[1]
+    else:
+        sn = ((first & 0x03) << 16) | (view[1] << 8) | view[2]
+    return sn, view[length:]
+
+
+def encode_status_report(fmc: int, bitmap) -> bytearray:
+    buffer = bytearray(STATUS_REPORT_HEADER_LENGTH + len(bitmap))
+    struct.pack_into('>BI', buffer, 0, PDU_TYPE_STATUS_REPORT << 4, fmc & 0xFFFFFFFF)
+    buffer[STATUS_REPORT_HEADER_LENGTH:] = bitmap
+    return buffer
+
+
+def parse_status_report(data):
+    """Parses a status report control PDU. Returns (fmc, bitmap) with bitmap a memoryview into data."""
+    view = data if isinstance(data, memoryview) else memoryview(data)
+    if len(view) < STATUS_REPORT_HEADER_LENGTH:
+        raise PDUFormatError(f"Status report of {len(view)} bytes is shorter than its {STATUS_REPORT_HEADER_LENGTH}-byte header.")
+    if view[0] & DC_DATA_PDU:
+        raise PDUFormatError("D/C bit is 1: data PDU, not a control PDU.")
+    if (view[0] >> 4) & 0x07 != PDU_TYPE_STATUS_REPORT:
+        raise PDUFormatError(f"Control PDU type {(view[0] >> 4) & 0x07} is not a status report.")
+    return struct.unpack_from('>I', view, 1)[0], view[STATUS_REPORT_HEADER_LENGTH:]
+
+
+def encode_frames(pdus, sn_length_bits: int, out: bytearray = None) -> bytearray:
+    """
+    Appends every (sn, payload) pair to `out` (a new bytearray if None) as a length-prefixed data PDU,
+    sizing the buffer once for the whole batch. Returns the buffer. Every PDU is validated before
+    `out` grows; if encoding still fails, `out` is truncated back to its original length.
+    """
+    pdus = list(pdus)
+    out = bytearray() if out is None else out
+    start = offset = len(out)
+    pdu_lengths = []
+    for sn, payload in pdus:
+        pdu_length = encoded_length(len(payload), sn_length_bits)
+        if pdu_length > MAX_PDU_LENGTH:
+            raise ValueError(f"PDU of {pdu_length} bytes does not fit the 2-byte length framing.")
+        if sn >> sn_length_bits:
+            raise ValueError(f"SN {sn} does not fit in {sn_length_bits} bits.")
+        pdu_lengths.append(pdu_length)
+    out.extend(bytes(FRAME_LENGTH_SIZE * len(pdus) + sum(pdu_lengths)))
+    try:
+        for (sn, payload), pdu_length in zip(pdus, pdu_lengths):
+            struct.pack_into('>H', out, offset, pdu_length)
+            offset = encode_data_pdu_into(out, offset + FRAME_LENGTH_SIZE, sn, payload, sn_length_bits)
+    except BaseException:
+        del out[start:]
+        raise
+    return out
+
+
+def iter_frames(buffer):
+    """Yields a memoryview of each length-prefixed PDU in buffer."""
+    view = buffer if isinstance(buffer, memoryview) else memoryview(buffer)
+    offset = 0
+    while offset < len(view):
+        if offset + FRAME_LENGTH_SIZE > len(view):
+            raise PDUFormatError(f"Truncated frame length at offset {offset}.")
+        pdu_length = (view[offset] << 8) | view[offset + 1]
+        start = offset + FRAME_LENGTH_SIZE
+        offset = start + pdu_length
+        if offset > len(view):
+            raise PDUFormatError(f"Frame at offset {start - FRAME_LENGTH_SIZE} runs past the end of the buffer.")
+        yield view[start:offset]
+
+
+def parse_frames(buffer, sn_length_bits: int) -> list:
+    """Batch parser: walks a buffer of length-prefixed PDUs and returns (sn, payload memoryview) pairs."""
+    return [parse_data_pdu(frame, sn_length_bits) for frame in iter_frames(buffer)]
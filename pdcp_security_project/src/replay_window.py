@@ -0,0 +1,67 @@
+# pdcp_security_project/src/replay_window.py
+"""
+Fixed-size anti-replay window over 32-bit COUNTs, in the style of the IPsec/DTLS sliding window.
+
+The window tracks `size` consecutive COUNTs starting at its lower edge, one bit each, in a
+circular bitmap: COUNT c lives at bit c % size. Moving the lower edge up only clears the bits
+of the COUNTs that leave the window, so memory is size bits and the cost per delivered PDU is O(1).
+"""
+
+COUNT_MODULUS = 1 << 32
+_COUNT_MASK = COUNT_MODULUS - 1
+_HALF_COUNT_SPACE = 1 << 31
+
+
+class ReplayWindow:
+    """
+    Bitmap of the COUNTs received in [lower_edge, lower_edge + size), all arithmetic modulo 2^32.
+    COUNTs below the lower edge are too old to be tracked; a set bit inside the window is a duplicate.
+    """
+    def __init__(self, size: int, lower_edge: int = 0):
+        if size <= 0 or size & (size - 1):
+            raise ValueError(f"Replay window size must be a power of two, got {size}.")
+        self.size = size
+        self.lower_edge = lower_edge & _COUNT_MASK
+        self._bitmap = bytearray(size // 8 or 1)
+
+    def _offset(self, count: int) -> int:
+        """Distance of COUNT above the lower edge; 2^31 or more means it is below the edge."""
+        return (count - self.lower_edge) & _COUNT_MASK
+
+    def is_too_old(self, count: int) -> bool:
+        return self._offset(count) >= _HALF_COUNT_SPACE
+
+    def is_duplicate(self, count: int) -> bool:
+        """True if COUNT is inside the window and has already been marked."""
+        if self._offset(count) >= self.size:
+            return False
+        position = count % self.size
+        return bool(self._bitmap[position >> 3] & (1 << (position & 7)))
+
+    def mark(self, count: int):
+        """Records COUNT as received. A COUNT above the window slides the window up to include it."""
+        offset = self._offset(count)
+        if offset >= _HALF_COUNT_SPACE:
+            return # Too old to track
+        if offset >= self.size:
+            self.advance(count - self.size + 1)
+        position = count % self.size
+        self._bitmap[position >> 3] |= 1 << (position & 7)
+
+    def advance(self, new_lower_edge: int):
+        """Moves the lower edge up to new_lower_edge, forgetting the COUNTs that fall out of the window."""
+        shift = (new_lower_edge - self.lower_edge) & _COUNT_MASK
+        if shift == 0 or shift >= _HALF_COUNT_SPACE:
+            return # Never moves down
+        if shift >= self.size:
+            self._bitmap[:] = bytes(len(self._bitmap))
+        else:
+            # The bits of the leaving COUNTs are reused by the COUNTs entering at the top
+            for count in range(self.lower_edge, self.lower_edge + shift):
+                position = count % self.size
+                self._bitmap[position >> 3] &= ~(1 << (position & 7)) & 0xFF
+        self.lower_edge = new_lower_edge & _COUNT_MASK
+
+    @property
+    def nbytes(self) -> int:
+        return len(self._bitmap)
@@ -0,0 +1,133 @@
+# pdcp_security_project/src/security_context.py
+import struct
+from . import crypto_stub
+from . import cipher_stub
+from .xor_kernel import xor_bytes
+
+MAC_I_LENGTH = 4 # 32-bit MAC-I appended to the data before ciphering
+
+
+class SecurityContext:
+    """
+    Security state for one bearer and direction, created once per (keys, bearer, direction).
+
+    Holds the prepared MAC engine, the AES-CTR keystream generator and the fixed
+    BEARER/DIRECTION bytes of the MAC input, so the per-packet work in protect()/unprotect()
+    is only the COUNT-dependent part. A key of None disables that algorithm.
+    """
+    def __init__(self, bearer: int, direction: int, integrity_key: bytes = None, cipher_key: bytes = None):
+        self.bearer = bearer & 0x1F      # 5 bits
+        self.direction = direction & 0x01 # 1 bit
+        self.integrity_enabled = bool(integrity_key)
+        self.ciphering_enabled = bool(cipher_key)
+
+        self.mac_engine = crypto_stub.get_mac_engine(integrity_key) if self.integrity_enabled else None
+        self.keystream = cipher_stub.KeystreamGenerator(cipher_key, bearer, direction) if self.ciphering_enabled else None
+        # MAC input is COUNT (4 bytes) + this fixed BEARER/DIRECTION tail + data
+        self._mac_prefix_tail = struct.pack('>BB', self.bearer, self.direction)
+
+    def _mac_i(self, count: int, data) -> bytes:
+        return self.mac_engine.mac_over(struct.pack('>I', count) + self._mac_prefix_tail, data)
+
+    def protected_length(self, sdu_length: int) -> int:
+        """Length of the protected PDU payload for an SDU of sdu_length bytes."""
+        return sdu_length + (MAC_I_LENGTH if self.integrity_enabled else 0)
+
+    def protect(self, count: int, sdu, out: bytearray = None, keystream=None):
+        """
+        Integrity-protects then ciphers one SDU (the MAC-I is ciphered with the data) in a single
+        output buffer: the SDU is copied in once, MAC-I is written after it and the keystream
+        is XORed over both in place.
+        Returns (pdu_payload, mac_i); mac_i is None when integrity is disabled.
+        `out` may be a preallocated bytearray of exactly the protected length; it is returned as pdu_payload.
+        `keystream` may be precomputed keystream for this COUNT of at least the protected length.
+        """
+        if sdu is None:
+            sdu = b''
+        if not self.integrity_enabled and not self.ciphering_enabled:
+            return sdu, None
+        data_length = len(sdu)
+        total_length = self.protected_length(data_length)
+        if out is None:
+            out = bytearray(total_length)
+        elif len(out) != total_length:
+            raise ValueError(f"Output buffer is {len(out)} bytes, protected PDU needs {total_length}.")
+        out[:data_length] = sdu
+
+        mac_i = None
+        if self.integrity_enabled:
+            mac_i = self._mac_i(count, sdu)
+            out[data_length:] = mac_i
+        if self.ciphering_enabled:
+            if keystream is None:
+                keystream = self.keystream.generate((count,), (total_length,))[0]
+            xor_bytes(out, keystream, out=out)
+        return out, mac_i
+
+    def protect_batch(self, counts, sdus, keystreams=None) -> list:
+        """
+        Protects a burst of SDUs, one COUNT each. Keystream for every entry of `keystreams`
+        that is None (or for all SDUs when it is not given) is generated in one pass.
+        Returns one protect() result tuple per SDU.
+        """
+        counts = list(counts)
+        sdus = [sdu if sdu is not None else b'' for sdu in sdus]
+        if keystreams is None:
+            keystreams = [None] * len(sdus)
+        else:
+            keystreams = list(keystreams)
+        if self.ciphering_enabled:
+            missing = [i for i, keystream in enumerate(keystreams) if keystream is None]
+            if missing:
+                generated = self.keystream.generate([counts[i] for i in missing],
+                                                    [self.protected_length(len(sdus[i])) for i in missing])
+                for i, keystream in zip(missing, generated):
+                    keystreams[i] = keystream
+        return [self.protect(count, sdu, keystream=keystream)
+                for count, sdu, keystream in zip(counts, sdus, keystreams)]
+
+    def unprotect(self, count: int, pdu_bytes):
+        """
+        Deciphers one PDU payload into a single new buffer and verifies its MAC-I through a memoryview.
+        The MAC-I is then trimmed off the end of that buffer, so no intermediate copies are made.
+        Returns (sdu_data, received_mac_i, verified). verified is None when integrity is
+        disabled, and False when the payload is too short to hold a MAC-I or the MAC-I does not match.
+        """
+        if pdu_bytes is None:
+            pdu_bytes = b''
+        keystream = None
+        if self.ciphering_enabled:
+            keystream = self.keystream.generate((count,), (len(pdu_bytes),))[0]
+        return self._unprotect_with_keystream(count, pdu_bytes, keystream)
+
+    def unprotect_batch(self, counts, payloads) -> list:
+        """
+        Deciphers and verifies a burst of PDU payloads, one COUNT each. The keystream for the
+        whole burst is generated in one pass. Returns one unprotect() result tuple per payload.
+        """
+        counts = list(counts)
+        payloads = [payload if payload is not None else b'' for payload in payloads]
+        keystreams = [None] * len(payloads)
+        if self.ciphering_enabled:
+            keystreams = self.keystream.generate(counts, (len(payload) for payload in payloads))
+        return [self._unprotect_with_keystream(count, payload, keystream)
+                for count, payload, keystream in zip(counts, payloads, keystreams)]
+
+    def _unprotect_with_keystream(self, count: int, pdu_bytes, keystream):
+        if self.integrity_enabled and len(pdu_bytes) < MAC_I_LENGTH:
+            return None, None, False
+
+        plaintext = pdu_bytes
+        if self.ciphering_enabled:
+            plaintext = xor_bytes(pdu_bytes, keystream, out=bytearray(len(pdu_bytes)))
+        if not self.integrity_enabled:
+            return plaintext, None, None
+
+        with memoryview(plaintext) as view:
+            received_mac_i = bytes(view[-MAC_I_LENGTH:])
+            verified = self._mac_i(count, view[:-MAC_I_LENGTH]) == received_mac_i
+        if self.ciphering_enabled:
+            # The deciphered buffer is ours: shrink it in place, the SDU bytes are not copied
+            del plaintext[-MAC_I_LENGTH:]
+            return plaintext, received_mac_i, verified
+        return plaintext[:-MAC_I_LENGTH], received_mac_i, verified
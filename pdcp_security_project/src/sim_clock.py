@@ -0,0 +1,63 @@
+# pdcp_security_project/src/sim_clock.py
+"""
+Discrete simulation clock with a heap-based queue of one-shot timers.
+
+Time only moves when the simulation advances it, so timer-driven behaviour (e.g. PDCP
+t-Reordering) is deterministic and independent of wall-clock speed. Timers are fired in
+deadline order, with the clock set to each timer's deadline while its callback runs.
+"""
+import heapq
+import itertools
+
+
+class SimClock:
+    def __init__(self, start_time: float = 0):
+        self.now = start_time
+        self._timers = []          # Heap of (deadline, handle, callback)
+        self._active = set()       # Handles of timers not yet fired or cancelled
+        self._handles = itertools.count()
+
+    def schedule(self, delay: float, callback) -> int:
+        """Runs callback() once the clock reaches now + delay. Returns a handle for cancel()."""
+        handle = next(self._handles)
+        heapq.heappush(self._timers, (self.now + delay, handle, callback))
+        self._active.add(handle)
+        return handle
+
+    def cancel(self, handle: int):
+        """Cancels a pending timer; cancelling a fired or unknown timer does nothing."""
+        self._active.discard(handle)
+
+    def pending(self) -> int:
+        return len(self._active)
+
+    def next_deadline(self):
+        """Deadline of the earliest pending timer, or None (lets a real-time driver sleep until then)."""
+        while self._timers and self._timers[0][1] not in self._active:
+            heapq.heappop(self._timers) # Cancelled
+        return self._timers[0][0] if self._timers else None
+
+    def _fire_due(self, until: float) -> int:
+        fired = 0
+        while self._timers and self._timers[0][0] <= until:
+            deadline, handle, callback = heapq.heappop(self._timers)
+            if handle not in self._active:
+                continue # Cancelled
+            self._active.discard(handle)
+            self.now = max(self.now, deadline)
+            callback()
+            fired += 1
+        return fired
+
+    def advance_to(self, target_time: float) -> int:
+        """Moves the clock to target_time, firing every timer due by then. Returns the number fired."""
+        fired = self._fire_due(target_time)
+        self.now = max(self.now, target_time)
+        return fired
+
+    def advance(self, delta: float) -> int:
+        return self.advance_to(self.now + delta)
+
+    def run_until_idle(self) -> int:
+        """Jumps from deadline to deadline until no timers are pending (including ones started by callbacks)."""
+        return self._fire_due(float('inf'))
@@ -0,0 +1,144 @@
+# pdcp_security_project/src/streaming.py
+"""
+Streaming simulation: SDU source -> PDCPTransmitter -> ImpairedChannel -> PDCPReceiver chained
+as generator stages.
+
+Each stage pulls one burst at a time from the stage before it, so at most one burst is held
+between two stages, and only rolling statistics are kept. Memory therefore stays flat however
+many SDUs go through, which is what long soak runs need (run_simulation_basic keeps every PDU).
+"""
+import itertools
+import logging
+import random
+
+from .delivery_sink import ListSink
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BURST_SIZE = 64
+
+
+def make_sdu_payload(sdu_id: int, sdu_payload_size: int, random_bytes) -> bytes:
+    """
+    Builds the simulation SDU for sdu_id: "SDU_<id>_Data_" followed by hex-encoded random bytes,
+    padded with zeros or truncated to exactly sdu_payload_size bytes.
+    random_bytes(n) supplies the random part (e.g. os.urandom).
+    """
+    base_string = f"SDU_{sdu_id}_Data_"
+    remaining_length_for_random_part = sdu_payload_size - len(base_string.encode('utf-8'))
+
+    random_hex_data = ""
+    if remaining_length_for_random_part > 0:
+        num_random_bytes = remaining_length_for_random_part // 2
+        if num_random_bytes > 0:
+            random_hex_data = random_bytes(num_random_bytes).hex()
+
+    sdu_payload = (base_string + random_hex_data).encode('utf-8')
+    if len(sdu_payload) > sdu_payload_size:
+        sdu_payload = sdu_payload[:sdu_payload_size]
+    elif len(sdu_payload) < sdu_payload_size:
+        sdu_payload += b'\x00' * (sdu_payload_size - len(sdu_payload))
+    return sdu_payload
+
+
+def seeded_sdu_payload(sdu_id: int, sdu_payload_size: int, seed: int = 0) -> bytes:
+    """Deterministic SDU payload, so delivered SDUs can be checked without remembering what was sent."""
+    return make_sdu_payload(sdu_id, sdu_payload_size, random.Random((seed << 32) ^ sdu_id).randbytes)
+
+
+class StreamingStats:
+    """Rolling counters for a streaming run; nothing per SDU is retained."""
+    def __init__(self):
+        self.sdus_generated = 0
+        self.pdus_transmitted = 0
+        self.pdus_arrived = 0
+        self.sdus_delivered = 0
+        self.bytes_delivered = 0
+        self.payload_mismatches = 0
+        self.bursts = 0
+        self.peak_rx_buffered = 0
+
+    def as_dict(self) -> dict:
+        return dict(vars(self))
+
+
+def sdu_source(num_sdus: int, sdu_payload_size: int, seed: int = 0):
+    """Yields (sdu_id, payload) pairs; num_sdus=None produces an endless stream."""
+    sdu_ids = itertools.count() if num_sdus is None else range(num_sdus)
+    for sdu_id in sdu_ids:
+        yield sdu_id, seeded_sdu_payload(sdu_id, sdu_payload_size, seed)
+
+
+def transmit_stage(pdcp_tx, sdus, stats: StreamingStats, burst_size: int = DEFAULT_BURST_SIZE):
+    """Groups SDUs into bursts of burst_size and yields the PDUs of each burst as a PDUBatch."""
+    sdus = iter(sdus)
+    while True:
+        burst = list(itertools.islice(sdus, burst_size))
+        if not burst:
+            return
+        stats.sdus_generated += len(burst)
+        pdus = pdcp_tx.send_sdus(burst, as_batch=True)
+        stats.pdus_transmitted += len(pdus)
+        yield pdus
+
+
+def channel_stage(channel, pdu_bursts, stats: StreamingStats):
+    """Passes each burst through the channel, then flushes the channel's reorder buffer at the end."""
+    for pdus in pdu_bursts:
+        arrived = channel.transmit(pdus)
+        stats.pdus_arrived += len(arrived)
+        yield arrived
+    remaining = channel.flush_reorder_buffer()
+    stats.pdus_arrived += len(remaining)
+    yield remaining
+
+
+def receive_stage(pdcp_rx, arrived_bursts, stats: StreamingStats, slots_per_burst: int = 1):
+    """
+    Feeds each arrived burst to the receiver and yields the SDU records it delivered. The receiver's
+    clock moves slots_per_burst after each burst (the channel's reorder delays count bursts, so one
+    slot per burst keeps t-Reordering in the same unit); at the end pending timers are run out.
+    Deliveries are collected through the receiver's delivery sink, which must support drain()
+    (ListSink or QueueSink); a receiver without a sink is given a ListSink.
+    """
+    if pdcp_rx.delivery_sink is None:
+        pdcp_rx.delivery_sink = ListSink()
+    for arrived in arrived_bursts:
+        pdcp_rx.receive_pdus(arrived)
+        pdcp_rx.clock.advance(slots_per_burst)
+        stats.bursts += 1
+        stats.peak_rx_buffered = max(stats.peak_rx_buffered, len(pdcp_rx.reordering_buffer))
+        yield _drain(pdcp_rx, stats)
+    pdcp_rx.clock.run_until_idle()
+    yield _drain(pdcp_rx, stats)
+
+
+def _drain(pdcp_rx, stats: StreamingStats) -> list:
+    delivered = pdcp_rx.drain_delivered_sdus()
+    stats.sdus_delivered += len(delivered)
+    return delivered
+
+
+def verify_stage(delivered_bursts, stats: StreamingStats, expected_payload):
+    """Checks every delivered SDU against expected_payload(sdu_id) and yields the bursts unchanged."""
+    for delivered in delivered_bursts:
+        for record in delivered:
+            payload = record['payload']
+            stats.bytes_delivered += len(payload) if payload else 0
+            if payload != expected_payload(record['sdu_id']):
+                stats.payload_mismatches += 1
+                logger.error(f"Payload Mismatch for SDU ID {record['sdu_id']}!")
+        yield delivered
+
+
+def run_streaming(pdcp_tx, pdcp_rx, channel, num_sdus: int, sdu_payload_size: int,
+                  burst_size: int = DEFAULT_BURST_SIZE, seed: int = 0) -> StreamingStats:
+    """Drives the whole pipeline to completion and returns its rolling statistics."""
+    stats = StreamingStats()
+    sdus = sdu_source(num_sdus, sdu_payload_size, seed)
+    pipeline = verify_stage(
+        receive_stage(pdcp_rx, channel_stage(channel, transmit_stage(pdcp_tx, sdus, stats, burst_size), stats), stats),
+        stats, lambda sdu_id: seeded_sdu_payload(sdu_id, sdu_payload_size, seed))
+    for _ in pipeline:
+        pass
+    return stats
@@ -0,0 +1,152 @@
+# pdcp_security_project/src/tracing.py
+"""
+Binary event tracing for the per-PDU hot paths (transmitter, channel, receiver, t-Reordering).
+
+Instead of formatting a log line per PDU, hot paths append a fixed-size record (time, event type,
+sdu_id, COUNT, SN, verdict, bearer, direction) to a preallocated ring buffer; records are only
+turned into text by render(). Categories are enabled per TraceBuffer, like logging levels, and a
+disabled category costs one integer test at the call site:
+
+    if tracer.mask & tracing.RX:
+        tracer.record(tracing.RX_DELIVERED, pdu.sdu_id, pdu.count, pdu.sn, pdu.status, bearer, direction)
+
+When the ring is full the oldest records are overwritten (and counted in `overwritten`).
+Entities use the process-wide default_tracer unless they are given their own TraceBuffer.
+"""
+import struct
+import time
+
+from .pdcp_packet import PDUStatus
+
+# Categories (bit mask)
+TX = 0x01
+CHANNEL = 0x02
+RX = 0x04
+REORDERING = 0x08
+ALL = TX | CHANNEL | RX | REORDERING
+
+CATEGORY_NAMES = {"tx": TX, "channel": CHANNEL, "rx": RX, "reordering": REORDERING, "all": ALL}
+
+# Event types
+TX_SENT = 1
+TX_RETRANSMITTED = 2     # Resent after a status report reported the COUNT missing
+TX_DISCARDED = 3         # Dropped from the transmit buffer by discardTimer or the buffer size limit
+CHANNEL_LOST = 10
+CHANNEL_TAMPERED = 11
+CHANNEL_CORRUPTED = 12
+CHANNEL_DUPLICATED = 13
+CHANNEL_REORDERED = 14
+RX_RECEIVED = 20
+RX_DISCARDED = 21        # verdict: the PDUStatus of the discard
+RX_INTEGRITY_VERIFIED = 22
+RX_BUFFERED = 23
+RX_DELIVERED = 24
+T_REORDERING_STARTED = 30 # count: RX_REORD
+T_REORDERING_EXPIRED = 31 # count: new RX_DELIV, sn: COUNTs skipped
+
+EVENT_NAMES = {
+    TX_SENT: "TX_SENT",
+    TX_RETRANSMITTED: "TX_RETRANSMITTED",
+    TX_DISCARDED: "TX_DISCARDED",
+    CHANNEL_LOST: "CHANNEL_LOST",
+    CHANNEL_TAMPERED: "CHANNEL_TAMPERED",
+    CHANNEL_CORRUPTED: "CHANNEL_CORRUPTED",
+    CHANNEL_DUPLICATED: "CHANNEL_DUPLICATED",
+    CHANNEL_REORDERED: "CHANNEL_REORDERED",
+    RX_RECEIVED: "RX_RECEIVED",
+    RX_DISCARDED: "RX_DISCARDED",
+    RX_INTEGRITY_VERIFIED: "RX_INTEGRITY_VERIFIED",
+    RX_BUFFERED: "RX_BUFFERED",
+    RX_DELIVERED: "RX_DELIVERED",
+    T_REORDERING_STARTED: "T_REORDERING_STARTED",
+    T_REORDERING_EXPIRED: "T_REORDERING_EXPIRED",
+}
+_WARNING_EVENTS = {TX_DISCARDED, CHANNEL_LOST, CHANNEL_TAMPERED, CHANNEL_CORRUPTED, RX_DISCARDED, T_REORDERING_EXPIRED}
+
+# time_ns, sdu_id, count, sn, event, verdict, bearer, direction
+_RECORD = struct.Struct('<QqIIBBBB')
+RECORD_SIZE = _RECORD.size
+DEFAULT_CAPACITY = 65536
+
+
+def parse_categories(spec) -> int:
+    """'tx,rx' / 'all' / '' (or an int mask) -> category mask."""
+    if isinstance(spec, int):
+        return spec
+    mask = 0
+    for name in filter(None, (part.strip().lower() for part in (spec or "").split(","))):
+        if name not in CATEGORY_NAMES:
+            raise ValueError(f"Unknown trace category '{name}', expected one of {', '.join(CATEGORY_NAMES)}.")
+        mask |= CATEGORY_NAMES[name]
+    return mask
+
+
+class TraceBuffer:
+    def __init__(self, capacity: int = DEFAULT_CAPACITY, categories=0):
+        if capacity <= 0:
+            raise ValueError("Trace buffer capacity must be positive.")
+        self.capacity = capacity
+        self.mask = parse_categories(categories)
+        self._ring = bytearray(capacity * RECORD_SIZE)
+        self.sequence = 0 # Records written so far; record i lives in slot i % capacity
+
+    def enable(self, categories):
+        self.mask |= parse_categories(categories)
+
+    def disable(self, categories=ALL):
+        self.mask &= ~parse_categories(categories)
+
+    def record(self, event: int, sdu_id, count, sn, verdict: int = 0, bearer: int = 0, direction: int = 0):
+        _RECORD.pack_into(self._ring, (self.sequence % self.capacity) * RECORD_SIZE, time.perf_counter_ns(),
+                          -1 if sdu_id is None else sdu_id, (count or 0) & 0xFFFFFFFF, (sn or 0) & 0xFFFFFFFF,
+                          event, verdict, bearer & 0xFF, direction)
+        self.sequence += 1
+
+    def __len__(self):
+        return min(self.sequence, self.capacity)
+
+    @property
+    def overwritten(self) -> int:
+        return max(0, self.sequence - self.capacity)
+
+    def clear(self, capacity: int = None):
+        """Forgets all records, optionally reallocating the ring for a new capacity."""
+        if capacity is not None and capacity != self.capacity:
+            if capacity <= 0:
+                raise ValueError("Trace buffer capacity must be positive.")
+            self.capacity = capacity
+            self._ring = bytearray(capacity * RECORD_SIZE)
+        self.sequence = 0
+
+    def events(self, since: int = 0):
+        """Yields (sequence, time_ns, event, sdu_id, count, sn, verdict, bearer, direction), oldest first."""
+        for sequence in range(max(since, self.overwritten), self.sequence):
+            time_ns, sdu_id, count, sn, event, verdict, bearer, direction = _RECORD.unpack_from(
+                self._ring, (sequence % self.capacity) * RECORD_SIZE)
+            yield (sequence, time_ns, event, None if sdu_id < 0 else sdu_id, count, sn, verdict, bearer, direction)
+
+    def render(self, since: int = 0) -> list:
+        """Text lines for the records from sequence `since` on, in the 'time - LEVEL - source - message' log layout."""
+        lines = []
+        for sequence, time_ns, event, sdu_id, count, sn, verdict, bearer, direction in self.events(since):
+            name = EVENT_NAMES.get(event, str(event))
+            level = "WARNING" if event in _WARNING_EVENTS else "INFO"
+            detail = f"sdu_id={sdu_id} COUNT={count} SN={sn}"
+            if event == T_REORDERING_STARTED:
+                detail = f"RX_REORD={count}"
+            elif event == T_REORDERING_EXPIRED:
+                detail = f"RX_DELIV={count} skipped={sn}"
+            if verdict:
+                detail += f" verdict={PDUStatus(verdict).label}"
+            lines.append(f"{time_ns / 1e9:.6f} - {level} - trace #{sequence} - [B:{bearer} D:{direction}] {name} {detail}")
+        return lines
+
+
+default_tracer = TraceBuffer()
+
+
+def configure(categories, capacity: int = DEFAULT_CAPACITY) -> TraceBuffer:
+    """Resets the default tracer (in place, entities keep their reference) with the given categories."""
+    default_tracer.clear(capacity)
+    default_tracer.mask = parse_categories(categories)
+    return default_tracer
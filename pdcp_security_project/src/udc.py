@@ -0,0 +1,152 @@
+# pdcp_security_project/src/udc.py
+"""
+Uplink Data Compression (UDC, after TS 36.323 clause 5.12): DEFLATE over the stream of SDUs of a
+bearer, so that each SDU can refer back to text in earlier ones (and in an optional preset dictionary).
+
+Each compressed SDU is a UDC header followed by the DEFLATE data of that SDU, flushed to a byte
+boundary (Z_SYNC_FLUSH) so that it decompresses on its own given the SDUs before it:
+
+    | FU | FR | R R R R R R | checksum (2) | DEFLATE data ... |
+
+FU is 1 for compressed data, FR marks the first SDU after a compression buffer reset. The checksum
+is the low 16 bits of the running Adler-32 of everything compressed since the last reset (dictionary
+included) before this SDU, i.e. of the compression buffer the SDU was compressed against. A
+decompressor that missed an SDU sees a mismatch, discards SDUs until one with FR arrives and asks
+the compressor for a reset (the UDC feedback of the spec). The spec uses a 4-bit checksum; 16 bits
+make a silently corrupted SDU after a loss far less likely.
+"""
+import struct
+import time
+import zlib
+
+UDC_HEADER_LENGTH = 3
+FU_BIT = 0x80
+FR_BIT = 0x40
+DEFAULT_LEVEL = 6
+_WBITS = -15 # Raw DEFLATE with a 32 KiB window, no zlib header or trailer per SDU
+
+
+class _UDCStats:
+    def __init__(self):
+        self.packets = 0
+        self.uncompressed_bytes = 0
+        self.compressed_bytes = 0
+        self.resets = 0
+        self.failures = 0
+        self.cpu_seconds = 0.0
+
+    def as_dict(self, prefix: str) -> dict:
+        return {
+            f"{prefix}_packets": self.packets,
+            f"{prefix}_uncompressed_bytes": self.uncompressed_bytes,
+            f"{prefix}_compressed_bytes": self.compressed_bytes,
+            f"{prefix}_ratio": self.compressed_bytes / self.uncompressed_bytes if self.uncompressed_bytes else None,
+            f"{prefix}_resets": self.resets,
+            f"{prefix}_failures": self.failures,
+            # Uncompressed bytes processed per second of compression/decompression time
+            f"{prefix}_throughput_mbps": self.uncompressed_bytes * 8 / self.cpu_seconds / 1e6 if self.cpu_seconds else None,
+        }
+
+
+class UDCCompressor:
+    """Transmit side: one instance per bearer."""
+    def __init__(self, dictionary: bytes = None, level: int = DEFAULT_LEVEL):
+        self.dictionary = dictionary
+        self.level = level
+        self.stats = _UDCStats()
+        self._reset_state()
+        self._pending_reset = False # The first SDU needs no FR: the decompressor starts from the same state
+
+    def _reset_state(self):
+        if self.dictionary:
+            self._compressor = zlib.compressobj(self.level, zlib.DEFLATED, _WBITS, zdict=self.dictionary)
+        else:
+            self._compressor = zlib.compressobj(self.level, zlib.DEFLATED, _WBITS)
+        self._checksum = zlib.adler32(self.dictionary or b"")
+
+    def reset(self):
+        """Handles UDC feedback: empties the compression buffer and marks the next SDU with FR."""
+        self._reset_state()
+        self._pending_reset = True
+        self.stats.resets += 1
+
+    def compress(self, sdu) -> bytes:
+        start = time.perf_counter()
+        flags = FU_BIT | (FR_BIT if self._pending_reset else 0)
+        self._pending_reset = False
+        header = struct.pack('>BH', flags, self._checksum & 0xFFFF)
+        compressed = header + self._compressor.compress(sdu) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+        self._checksum = zlib.adler32(sdu, self._checksum)
+        self.stats.packets += 1
+        self.stats.uncompressed_bytes += len(sdu)
+        self.stats.compressed_bytes += len(compressed)
+        self.stats.cpu_seconds += time.perf_counter() - start
+        return compressed
+
+    def get_stats(self) -> dict:
+        return self.stats.as_dict("udc_compression")
+
+
+class UDCDecompressor:
+    """Receive side: one instance per bearer, fed the SDUs in delivery (COUNT) order."""
+    def __init__(self, dictionary: bytes = None):
+        self.dictionary = dictionary
+        self.stats = _UDCStats()
+        self.in_sync = True
+        self.reset_requested = False # UDC feedback for the peer compressor, see take_feedback()
+        self._reset_state()
+
+    def _reset_state(self):
+        if self.dictionary:
+            self._decompressor = zlib.decompressobj(_WBITS, zdict=self.dictionary)
+        else:
+            self._decompressor = zlib.decompressobj(_WBITS)
+        self._checksum = zlib.adler32(self.dictionary or b"")
+
+    def take_feedback(self) -> bool:
+        """True once per detected loss of sync: the transmitter should then call UDCCompressor.reset()."""
+        requested, self.reset_requested = self.reset_requested, False
+        return requested
+
+    def _lose_sync(self):
+        self.stats.failures += 1
+        if self.in_sync:
+            self.in_sync = False
+            self.reset_requested = True
+
+    def decompress(self, data):
+        """Returns the original SDU, or None if it was discarded (out of sync or undecodable)."""
+        start = time.perf_counter()
+        try:
+            return self._decompress(data)
+        finally:
+            self.stats.cpu_seconds += time.perf_counter() - start
+
+    def _decompress(self, data):
+        if data is None or len(data) < UDC_HEADER_LENGTH:
+            self._lose_sync()
+            return None
+        flags, checksum = struct.unpack_from('>BH', data)
+        if not flags & FU_BIT:
+            sdu = bytes(data[UDC_HEADER_LENGTH:]) # Sent uncompressed, outside the compression buffer
+        else:
+            if flags & FR_BIT:
+                self._reset_state()
+                self.in_sync = True
+                self.stats.resets += 1
+            if not self.in_sync or checksum != self._checksum & 0xFFFF:
+                self._lose_sync() # An earlier SDU is missing from our buffer: wait for FR
+                return None
+            try:
+                sdu = self._decompressor.decompress(data[UDC_HEADER_LENGTH:])
+            except zlib.error:
+                self._lose_sync()
+                return None
+            self._checksum = zlib.adler32(sdu, self._checksum)
+        self.stats.packets += 1
+        self.stats.compressed_bytes += len(data)
+        self.stats.uncompressed_bytes += len(sdu)
+        return sdu
+
+    def get_stats(self) -> dict:
+        return self.stats.as_dict("udc_decompression")
@@ -0,0 +1,155 @@
+# pdcp_security_project/src/udp_transport.py
+"""
+PDCP over real UDP sockets on the loopback interface, for load tests through the kernel datapath.
+
+UDPLoopbackLink connects one PDCPTransmitter to one PDCPReceiver through a pair of UDP sockets on
+127.0.0.1. send() serialises PDUs in the pdcp_wire format (length-prefixed data PDUs) and packs as
+many as fit into each datagram of at most datagram_bytes, so one sendto carries a whole batch.
+Optional netem-style impairments are applied in user space before serialisation by an
+ImpairedChannel (one send() call is one of its slots).
+
+receive() reads every waiting datagram back to back into one preallocated receive arena (no
+per-datagram allocation) and hands the filled region to PDCPReceiver.receive_bytes as one burst, which
+parses headers and payloads in place. The arena is reused by the next call. Datagrams the kernel
+drops (receive buffer full) simply show up as missing PDUs at the receiver. A datagram whose framing
+is broken (truncated or garbled) is dropped on its own and counted, so it cannot take the rest of the
+burst with it; invalid PDUs inside well-framed datagrams are discarded by receive_bytes.
+
+Only SN and payload travel on the wire, so delivered records carry sdu_id None; a driver measuring
+latency keys its send times by COUNT. The receiver's clock (t-Reordering) is left to the driver.
+"""
+import select
+import socket
+
+from .channel_simulator import ImpairedChannel
+from .pdcp_entity import PDCPTransmitter, PDCPReceiver
+from .pdcp_packet import as_pdu_list
+from . import pdcp_wire
+
+DEFAULT_DATAGRAM_BYTES = 1472      # Ethernet MTU minus IPv4 and UDP headers
+MAX_DATAGRAM_BYTES = 65507         # Largest UDP payload over IPv4
+DEFAULT_ARENA_BYTES = 1 << 20      # Receive arena: how much one receive() can read as a single burst
+DEFAULT_SOCKET_BUFFER_BYTES = 4 << 20
+
+
+class UDPLoopbackLink:
+    def __init__(self, transmitter: PDCPTransmitter, receiver: PDCPReceiver, impairments: ImpairedChannel = None,
+                 datagram_bytes: int = DEFAULT_DATAGRAM_BYTES, arena_bytes: int = DEFAULT_ARENA_BYTES,
+                 socket_buffer_bytes: int = DEFAULT_SOCKET_BUFFER_BYTES):
+        if not 0 < datagram_bytes <= MAX_DATAGRAM_BYTES:
+            raise ValueError(f"Datagram size must be between 1 and {MAX_DATAGRAM_BYTES} bytes.")
+        if arena_bytes < datagram_bytes:
+            raise ValueError("The receive arena must hold at least one datagram.")
+        self.transmitter = transmitter
+        self.receiver = receiver
+        self.impairments = impairments
+        self.datagram_bytes = datagram_bytes
+
+        self.rx_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.rx_socket.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, socket_buffer_bytes)
+        self.rx_socket.bind(("127.0.0.1", 0))
+        self.rx_socket.setblocking(False)
+        self.tx_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.tx_socket.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, socket_buffer_bytes)
+        self.tx_socket.connect(self.rx_socket.getsockname())
+
+        self._datagram = bytearray() # Send buffer, reused for every datagram
+        self._arena = bytearray(arena_bytes)
+        self._arena_view = memoryview(self._arena)
+
+        self.datagrams_sent = 0
+        self.datagrams_received = 0
+        self.bytes_sent = 0     # UDP payload bytes
+        self.bytes_received = 0
+        self.receive_bursts = 0 # receive() calls that passed data to the receiver
+        self.malformed_datagrams = 0 # Dropped because their framing is broken
+
+    def send(self, pdus) -> int:
+        """
+        Impairs (if configured), serialises and sends PDUs (a list of PDCP_PDU or a PDUBatch).
+        Returns the number of datagrams sent.
+        """
+        pdus = as_pdu_list(pdus)
+        if self.impairments is not None:
+            pdus = self.impairments.transmit(pdus)
+        return self._send_datagrams(pdus)
+
+    def flush(self) -> int:
+        """Sends the PDUs the impairments are still delaying. Returns the number of datagrams sent."""
+        if self.impairments is None:
+            return 0
+        return self._send_datagrams(self.impairments.flush_reorder_buffer())
+
+    def _send_datagrams(self, pdus) -> int:
+        sent = 0
+        group, group_bytes = [], 0
+        header_bytes = pdcp_wire.FRAME_LENGTH_SIZE + pdcp_wire.header_length(self.transmitter.sn_length_bits)
+        for pdu in pdus:
+            frame_bytes = header_bytes + len(pdu.payload)
+            if frame_bytes > self.datagram_bytes:
+                raise ValueError(f"PDU of {frame_bytes} framed bytes does not fit a {self.datagram_bytes}-byte datagram.")
+            if group_bytes + frame_bytes > self.datagram_bytes:
+                self._send_datagram(group)
+                sent += 1
+                group, group_bytes = [], 0
+            group.append(pdu)
+            group_bytes += frame_bytes
+        if group:
+            self._send_datagram(group)
+            sent += 1
+        return sent
+
+    def _send_datagram(self, pdus):
+        del self._datagram[:]
+        self.transmitter.encode_pdus(pdus, self._datagram)
+        self.tx_socket.send(self._datagram)
+        self.datagrams_sent += 1
+        self.bytes_sent += len(self._datagram)
+
+    def receive(self, timeout: float = 0.0):
+        """
+        Waits up to timeout seconds for a datagram, then reads all waiting datagrams (as many as fit the
+        arena) and processes them as one burst. Returns receive_bytes()'s (verdicts, delivered), or
+        ([], []) if nothing arrived.
+        """
+        if timeout and not select.select([self.rx_socket], [], [], timeout)[0]:
+            return [], []
+        filled = 0
+        while len(self._arena) - filled >= self.datagram_bytes:
+            try:
+                received = self.rx_socket.recv_into(self._arena_view[filled:filled + self.datagram_bytes])
+            except BlockingIOError:
+                break
+            self.datagrams_received += 1
+            try:
+                for _ in pdcp_wire.iter_frames(self._arena_view[filled:filled + received]):
+                    pass
+            except pdcp_wire.PDUFormatError:
+                self.malformed_datagrams += 1 # Truncated or garbled: its slot is reused by the next datagram
+                continue
+            filled += received
+        if not filled:
+            return [], []
+        self.bytes_received += filled # Well-framed datagrams only
+        self.receive_bursts += 1
+        return self.receiver.receive_bytes(self._arena_view[:filled])
+
+    def close(self):
+        self.tx_socket.close()
+        self.rx_socket.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def get_stats(self) -> dict:
+        return {
+            "datagrams_sent": self.datagrams_sent,
+            "datagrams_received": self.datagrams_received,
+            "udp_bytes_sent": self.bytes_sent,
+            "udp_bytes_received": self.bytes_received,
+            "receive_bursts": self.receive_bursts,
+            "malformed_datagrams": self.malformed_datagrams,
+        }
@@ -0,0 +1,49 @@
+# pdcp_security_project/src/xor_kernel.py
+"""
+Whole-buffer XOR used to apply a keystream to a payload.
+
+Replaces the per-byte `bytes([p ^ k for p, k in zip(...)])` loops: small buffers are
+XORed as Python big integers, larger ones with NumPy when it is installed.
+Both paths can write the result in place into a bytearray or writable memoryview.
+"""
+try:
+    import numpy as np
+except ImportError: # NumPy is optional, the big-int path only needs the standard library
+    np = None
+
+# Below this size the fixed per-call cost of NumPy is higher than a big-int XOR.
+NUMPY_MIN_LENGTH = 256
+
+
+def _xor_bigint(data, keystream, length: int) -> bytes:
+    return (int.from_bytes(data, 'big') ^ int.from_bytes(keystream[:length], 'big')).to_bytes(length, 'big')
+
+
+def xor_bytes(data, keystream, out=None):
+    """
+    XORs `data` with the first len(data) bytes of `keystream`.
+
+    `data` and `keystream` can be any bytes-like objects. If `out` is given (a bytearray
+    or writable memoryview of at least len(data) bytes), the result is written into it
+    and `out` is returned; otherwise a new bytes object is returned.
+    `out` may be the same buffer as `data` for an in-place XOR.
+    """
+    length = len(data)
+    if len(keystream) < length:
+        raise ValueError(f"Keystream too short: {len(keystream)} bytes for {length} bytes of data.")
+    if length == 0:
+        return out if out is not None else b''
+
+    if np is not None and length >= NUMPY_MIN_LENGTH:
+        data_arr = np.frombuffer(data, dtype=np.uint8, count=length)
+        key_arr = np.frombuffer(keystream, dtype=np.uint8, count=length)
+        if out is None:
+            return np.bitwise_xor(data_arr, key_arr).tobytes()
+        np.bitwise_xor(data_arr, key_arr, out=np.frombuffer(out, dtype=np.uint8, count=length))
+        return out
+
+    result = _xor_bigint(data, keystream, length)
+    if out is None:
+        return result
+    out[:length] = result
+    return out
@@ -0,0 +1,113 @@
+import asyncio
+import concurrent.futures
+import unittest
+from src.async_pdcp import AsyncPDCPTransmitter, AsyncPDCPReceiver, AsyncImpairedChannel, run_bearer
+from src.delivery_sink import ListSink, AsyncQueueSink
+from src.pdcp_entity import PDCPTransmitter, PDCPReceiver
+
+KEY = bytes(range(16))
+
+def kwargs(bearer_id=1):
+    return dict(bearer_id=bearer_id, direction=0, integrity_key=KEY, cipher_key=KEY,
+                integrity_enabled=True, ciphering_enabled=True)
+
+def sdus(n):
+    return [(i, f"SDU {i}".encode()) for i in range(n)]
+
+class TestAsyncBearer(unittest.TestCase):
+    def test_end_to_end_in_order_through_async_sink(self):
+        async def scenario():
+            sink = AsyncQueueSink(maxsize=100)
+            rx = AsyncPDCPReceiver(PDCPReceiver(t_reordering=0.05, delivery_sink=sink, **kwargs()))
+            channel = AsyncImpairedChannel(rx.feed, reordering_rate=0.5, max_reorder_delay=0.005, base_delay=0.001)
+            consumer = asyncio.ensure_future(self._consume(sink))
+            stats = await run_bearer(AsyncPDCPTransmitter(PDCPTransmitter(**kwargs())), channel, rx, sdus(30),
+                                     sdu_interval=0.0005)
+            return stats, await consumer
+        stats, delivered = asyncio.run(scenario())
+        self.assertEqual(delivered, list(range(30)))
+        self.assertEqual(stats["successful_deliveries"], 30)
+
+    @staticmethod
+    async def _consume(sink):
+        return [record['sdu_id'] async for record in sink]
+
+    def test_t_reordering_expires_in_real_time(self):
+        async def scenario():
+            sink = ListSink()
+            rx = AsyncPDCPReceiver(PDCPReceiver(t_reordering=0.02, delivery_sink=sink, **kwargs()))
+            pdus = PDCPTransmitter(**kwargs()).send_sdus(sdus(4))
+            receive_loop = asyncio.ensure_future(rx.run(flush=False))
+            rx.feed(pdus[:1] + pdus[2:]) # SDU 1 is lost
+            await asyncio.sleep(0.005)
+            before_expiry = [r['sdu_id'] for r in sink.records]
+            await asyncio.sleep(0.05) # The receive loop wakes up for the timer with nothing queued
+            after_expiry = [r['sdu_id'] for r in sink.records]
+            rx.close()
+            await receive_loop
+            return before_expiry, after_expiry
+        before_expiry, after_expiry = asyncio.run(scenario())
+        self.assertEqual(before_expiry, [0])
+        self.assertEqual(after_expiry, [0, 2, 3])
+
+    def test_timed_out_get_leaves_later_bursts_queued(self):
+        async def scenario():
+            rx = AsyncPDCPReceiver(PDCPReceiver(**kwargs()))
+            timed_out = await rx._get(0.001)
+            rx.feed([]) # Arrives after the timeout: must not be taken by the abandoned get
+            for _ in range(3):
+                await asyncio.sleep(0)
+            return timed_out, rx.queue.qsize(), await rx._get(0)
+        timed_out, queued, burst = asyncio.run(scenario())
+        self.assertIsNone(timed_out)
+        self.assertEqual((queued, burst), (1, []))
+
+    def test_bursts_arriving_at_timer_expiry_are_not_lost(self):
+        async def scenario():
+            sink = ListSink()
+            rx = AsyncPDCPReceiver(PDCPReceiver(t_reordering=0.002, delivery_sink=sink, **kwargs()))
+            pdus = PDCPTransmitter(**kwargs()).send_sdus(sdus(60))
+            receive_loop = asyncio.ensure_future(rx.run())
+            for i in range(0, 60, 3):
+                rx.feed([pdus[i + 1], pdus[i + 2]]) # Out of order: starts t-Reordering
+                await asyncio.sleep(0.002) # Feed the gap as the timer falls due
+                rx.feed([pdus[i]])
+            rx.close()
+            await receive_loop
+            return sink.records, rx.receiver.get_stats()
+        records, stats = asyncio.run(scenario())
+        self.assertEqual(stats["successful_deliveries"] + stats["discarded_old_packets"], 60)
+        self.assertEqual(len(records), stats["successful_deliveries"])
+
+    def test_offloaded_bursts_match_inline_processing(self):
+        pdus = PDCPTransmitter(**kwargs()).send_sdus(sdus(40))
+        expected = PDCPReceiver(**kwargs()).receive_pdus([pdu.copy() for pdu in pdus])[1]
+
+        async def scenario():
+            with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+                tx = AsyncPDCPTransmitter(PDCPTransmitter(**kwargs()), executor=executor, offload_threshold=1)
+                sink = AsyncQueueSink(maxsize=100)
+                rx = AsyncPDCPReceiver(PDCPReceiver(delivery_sink=sink, **kwargs()), executor=executor,
+                                       offload_threshold=1)
+                sent = await tx.send_sdus(sdus(40), as_batch=True)
+                _, delivered = await rx.receive_pdus(sent)
+                return sent, delivered, sink._queue.qsize()
+        sent, delivered, queued = asyncio.run(scenario())
+        self.assertEqual([pdu.payload for pdu in sent], [pdu.payload for pdu in pdus])
+        self.assertEqual(delivered, expected)
+        self.assertEqual(queued, 40) # Handed to the sink on the loop, not from the worker thread
+
+    def test_many_bearers_share_one_loop(self):
+        async def scenario():
+            runs = []
+            for bearer_id in range(200):
+                rx = AsyncPDCPReceiver(PDCPReceiver(t_reordering=0.05, delivery_sink=ListSink(), **kwargs(bearer_id % 32)))
+                channel = AsyncImpairedChannel(rx.feed, base_delay=0.001)
+                tx = AsyncPDCPTransmitter(PDCPTransmitter(**kwargs(bearer_id % 32)))
+                runs.append(run_bearer(tx, channel, rx, sdus(10), sdu_interval=0.001))
+            return await asyncio.gather(*runs)
+        results = asyncio.run(scenario())
+        self.assertEqual([stats["successful_deliveries"] for stats in results], [10] * 200)
+
+if __name__ == '__main__':
+    unittest.main()
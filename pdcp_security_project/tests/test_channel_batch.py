@@ -0,0 +1,119 @@
+import random
+import unittest
+from src.channel_simulator import ImpairedChannel, BATCH_MIN_PDUS
+from src.pdcp_packet import PDUBatch, PDUFlag, PDUStatus, as_pdu_list
+from src.pdcp_entity import PDCPTransmitter, PDCPReceiver
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+IMPAIRMENTS = dict(loss_rate=0.1, duplication_rate=0.05, reordering_rate=0.2, max_reorder_delay=3,
+                   corruption_rate=0.05, tampering_rate=0.05)
+
+def burst(first, n, size=40):
+    batch = PDUBatch()
+    for i in range(first, first + n):
+        batch.append(i, i, i, 0, bytes([i % 251]) * size)
+    return batch
+
+def outcome(channel, bursts, as_batch):
+    """Arrivals of every burst through the channel, then its flush, as PDU objects."""
+    arrived = []
+    for batch in bursts:
+        out = channel.transmit_batch(batch) if as_batch else channel.transmit(batch.to_pdus())
+        arrived.extend(out.to_pdus() if as_batch else out)
+    return arrived + channel.flush_reorder_buffer()
+
+def damage(pdu, original):
+    return [a ^ b for a, b in zip(pdu.payload, original) if a != b]
+
+@unittest.skipIf(numpy is None, "transmit_batch needs NumPy")
+class TestBatchTransmit(unittest.TestCase):
+    def test_clean_channel_permutes_an_unmodified_copy(self):
+        random.seed(3)
+        batch = burst(0, 50)
+        arrived = ImpairedChannel().transmit_batch(batch)
+        self.assertIsInstance(arrived, PDUBatch)
+        self.assertEqual(sorted((pdu.sdu_id, pdu.payload) for pdu in arrived),
+                         [(pdu.sdu_id, pdu.payload) for pdu in batch])
+        self.assertNotEqual(list(arrived.sdu_ids), list(batch.sdu_ids)) # Shuffled like the per-PDU path
+        self.assertEqual(set(arrived.statuses), {PDUStatus.CHANNEL_OUTPUT})
+        self.assertEqual(batch.payload(0), bytes([0]) * 40) # The input batch is untouched
+
+    def test_transmit_dispatches_large_bursts_to_batch_path(self):
+        calls = []
+        channel = ImpairedChannel()
+        channel.transmit_batch = lambda batch: calls.append(len(batch)) or batch
+        channel.transmit(burst(0, BATCH_MIN_PDUS - 1))
+        channel.transmit(burst(0, BATCH_MIN_PDUS))
+        self.assertEqual(calls, [BATCH_MIN_PDUS])
+
+    def test_statistically_equivalent_to_per_pdu_reference(self):
+        random.seed(11)
+        bursts = [burst(i * 100, 100) for i in range(40)]
+        results = {as_batch: outcome(ImpairedChannel(**IMPAIRMENTS), bursts, as_batch) for as_batch in (False, True)}
+        n = 4000
+        flag_counts = {}
+        for as_batch, arrived in results.items():
+            flag_counts[as_batch] = [sum(1 for pdu in arrived if pdu.flags & flag)
+                                     for flag in (PDUFlag.TAMPERED_BY_CHANNEL, PDUFlag.CORRUPTED_BY_CHANNEL)]
+            ids = [pdu.sdu_id for pdu in arrived]
+            distinct = len(set(ids))
+            copies = len(ids) - distinct
+            reordered = sum(1 for pdu in arrived if pdu.flags & PDUFlag.REORDERED)
+            damaged = [damage(pdu, bytes([pdu.sdu_id % 251]) * 40) for pdu in arrived]
+            one_bit = sum(1 for d in damaged if len(d) == 1 and bin(d[0]).count("1") == 1)
+            some_bytes = sum(1 for d in damaged if d)
+            with self.subTest(as_batch=as_batch):
+                # Expected counts +- about 5 standard deviations
+                self.assertAlmostEqual(distinct, n * 0.9, delta=100)
+                self.assertAlmostEqual(copies, n * 0.9 * 0.05, delta=75)
+                self.assertAlmostEqual(reordered, n * 0.9 * 0.2, delta=130)
+                self.assertAlmostEqual(some_bytes, len(arrived) * (0.05 + 0.95 * 0.05), delta=80)
+                self.assertGreater(one_bit, len(arrived) * 0.04)
+                self.assertTrue(all(len(d) <= 3 for d in damaged))
+                self.assertEqual(sum(flag_counts[as_batch]), some_bytes) # Every damaged PDU is flagged
+        for reference, vectorised in zip(flag_counts[False], flag_counts[True]):
+            self.assertAlmostEqual(reference, vectorised, delta=90)
+
+    def test_corruption_is_dropped_before_crypto_on_both_paths(self):
+        key = bytes(range(16))
+        args = dict(bearer_id=1, direction=0, integrity_key=key, cipher_key=key,
+                    integrity_enabled=True, ciphering_enabled=True)
+        batch = PDCPTransmitter(**args).send_sdus([(i, b"SDU %d" % i) for i in range(200)], as_batch=True)
+        for as_batch in (False, True):
+            channel = ImpairedChannel(corruption_rate=1.0)
+            arrived = channel.transmit_batch(batch) if as_batch else channel.transmit(batch.to_pdus())
+            rx = PDCPReceiver(**args)
+            rx.receive_pdus(arrived)
+            stats = rx.get_stats()
+            with self.subTest(as_batch=as_batch):
+                self.assertEqual(sum(1 for pdu in as_pdu_list(arrived) if pdu.flags & PDUFlag.CORRUPTED_BY_CHANNEL), 200)
+                self.assertEqual(stats["discarded_integrity_failures"], 0)
+                self.assertEqual(stats["successful_deliveries"], 0)
+
+    def test_delays_hold_pdus_across_slots_and_paths(self):
+        random.seed(5)
+        channel = ImpairedChannel(base_delay=1)
+        self.assertEqual(len(channel.transmit_batch(burst(0, 4))), 0)
+        self.assertEqual(sorted(pdu.sdu_id for pdu in channel.transmit([])), [0, 1, 2, 3]) # Released by the object path
+        self.assertEqual(len(channel.transmit_batch(burst(4, 2))), 0)
+        self.assertEqual(sorted(channel.transmit_batch(burst(6, 1)).sdu_ids), [4, 5]) # Released by the batch path
+        flushed = channel.flush_reorder_buffer()
+        self.assertEqual([(pdu.sdu_id, pdu.status) for pdu in flushed], [(6, PDUStatus.CHANNEL_FLUSHED)])
+
+    def test_tampering_changes_every_protected_payload(self):
+        random.seed(2)
+        key = bytes(range(16))
+        args = dict(bearer_id=1, direction=0, integrity_key=key, cipher_key=key,
+                    integrity_enabled=True, ciphering_enabled=True)
+        batch = PDCPTransmitter(**args).send_sdus([(i, b"SDU %d" % i) for i in range(30)], as_batch=True)
+        arrived = ImpairedChannel(tampering_rate=1.0).transmit_batch(batch)
+        self.assertEqual(set(arrived.statuses), {PDUStatus.CHANNEL_OUTPUT})
+        self.assertTrue(all(arrived.payload(i) != batch.payload(batch.sdu_ids.index(sdu_id))
+                            for i, sdu_id in enumerate(arrived.sdu_ids)))
+
+if __name__ == '__main__':
+    unittest.main()
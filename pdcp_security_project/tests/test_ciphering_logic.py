@@ -0,0 +1,49 @@
+import unittest
+from src import cipher_stub
+from src import xor_kernel
+import config
+
+class TestCipheringLogic(unittest.TestCase):
+    def setUp(self):
+        self.cipher_key = cipher_stub.generate_cipher_key(config.CIPHER_KEY_LENGTH_BYTES)
+        self.bearer = 5
+        self.direction = 0
+
+    def test_encrypt_decrypt(self):
+        plaintext = b"Test message for ciphering"
+        ciphertext = cipher_stub.encrypt(self.cipher_key, 12345, self.bearer, self.direction, plaintext)
+        self.assertNotEqual(ciphertext, plaintext)
+        deciphered = cipher_stub.decrypt(self.cipher_key, 12345, self.bearer, self.direction, ciphertext)
+        self.assertEqual(deciphered, plaintext)
+
+    def test_batch_matches_single_pdu_path(self):
+        counts = [0, 1, 4095, 4096, 2**32 - 1]
+        payloads = [b"", b"x", b"A" * 16, b"B" * 17, bytes(range(256)) * 6]
+        batch = cipher_stub.encrypt_batch(self.cipher_key, counts, self.bearer, self.direction, payloads)
+        single = [cipher_stub.encrypt(self.cipher_key, c, self.bearer, self.direction, p)
+                  for c, p in zip(counts, payloads)]
+        self.assertEqual(batch, single)
+        self.assertEqual(
+            cipher_stub.decrypt_batch(self.cipher_key, counts, self.bearer, self.direction, batch), payloads)
+
+    def test_keystream_unique_per_count(self):
+        keystreams = cipher_stub.generate_keystreams(self.cipher_key, [7, 8], self.bearer, self.direction, [32, 32])
+        self.assertEqual([len(k) for k in keystreams], [32, 32])
+        self.assertNotEqual(keystreams[0], keystreams[1])
+
+    def test_xor_kernel_matches_bytewise_xor_and_writes_in_place(self):
+        for size in (0, 1, 31, xor_kernel.NUMPY_MIN_LENGTH, 1500):
+            data = bytes(range(256)) * (size // 256) + bytes(range(size % 256))
+            keystream = bytes(reversed(data)) + b"extra"
+            expected = bytes(d ^ k for d, k in zip(data, keystream))
+            self.assertEqual(xor_kernel.xor_bytes(data, keystream), expected)
+            buffer = bytearray(data)
+            self.assertIs(xor_kernel.xor_bytes(buffer, keystream, out=buffer), buffer)
+            self.assertEqual(bytes(buffer), expected)
+
+    def test_xor_kernel_rejects_short_keystream(self):
+        with self.assertRaises(ValueError):
+            xor_kernel.xor_bytes(b"abcd", b"ab")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,77 @@
+import asyncio
+import unittest
+from src.delivery_sink import ListSink, CallbackSink, QueueSink, AsyncQueueSink, DROP_NEWEST
+from src.pdcp_entity import PDCPTransmitter, PDCPReceiver
+
+def records(sdu_ids):
+    return [{'sdu_id': i, 'payload': b"x", 'count': i} for i in sdu_ids]
+
+class TestSinks(unittest.TestCase):
+    def test_queue_sink_overflow(self):
+        sink = QueueSink(maxsize=3)
+        sink.deliver(records(range(5)))
+        self.assertEqual((len(sink), sink.dropped), (3, 2))
+        self.assertEqual(sink.get()['sdu_id'], 2)
+        self.assertEqual([r['sdu_id'] for r in sink.drain()], [3, 4])
+        self.assertIsNone(sink.get())
+        newest_dropped = QueueSink(maxsize=3, overflow=DROP_NEWEST)
+        newest_dropped.deliver(records(range(5)))
+        self.assertEqual([r['sdu_id'] for r in newest_dropped.drain(max_records=2)], [0, 1])
+        with self.assertRaises(ValueError):
+            QueueSink(maxsize=3, overflow="block")
+
+    def test_async_queue_sink_consumer(self):
+        async def scenario():
+            sink = AsyncQueueSink(maxsize=4)
+            consumer = asyncio.ensure_future(self._consume(sink))
+            sink.deliver(records(range(3)))
+            await asyncio.sleep(0) # Consumer takes what is queued
+            sink.deliver(records(range(3, 9)))
+            sink.close()
+            return await consumer, sink.dropped
+        consumed, dropped = asyncio.run(scenario())
+        self.assertEqual(consumed, list(range(7)))
+        self.assertEqual(dropped, 2)
+
+    @staticmethod
+    async def _consume(sink):
+        return [record['sdu_id'] async for record in sink]
+
+
+class TestReceiverDelivery(unittest.TestCase):
+    def setUp(self):
+        key = bytes(range(16))
+        self.kwargs = dict(bearer_id=1, direction=0, integrity_key=key, cipher_key=key,
+                           integrity_enabled=True, ciphering_enabled=True)
+        self.pdus = PDCPTransmitter(**self.kwargs).send_sdus((i, f"SDU {i}".encode()) for i in range(10))
+
+    def test_no_sink_keeps_nothing(self):
+        rx = PDCPReceiver(**self.kwargs)
+        verdicts, delivered = rx.receive_pdus(self.pdus)
+        self.assertEqual(len(delivered), 10)
+        self.assertEqual((rx.get_delivered_sdus(), rx.drain_delivered_sdus()), ([], []))
+
+    def test_callback_sees_timer_deliveries_as_they_happen(self):
+        seen = []
+        rx = PDCPReceiver(t_reordering=5, delivery_sink=CallbackSink(lambda r: seen.append(r['sdu_id'])), **self.kwargs)
+        rx.receive_pdus(self.pdus[:3] + self.pdus[4:])
+        self.assertEqual(seen, [0, 1, 2])
+        rx.clock.advance(5)
+        self.assertEqual(seen, [0, 1, 2, 4, 5, 6, 7, 8, 9])
+
+    def test_bounded_queue_sink(self):
+        rx = PDCPReceiver(delivery_sink=QueueSink(maxsize=4), **self.kwargs)
+        rx.receive_pdus(self.pdus)
+        self.assertEqual([r['sdu_id'] for r in rx.drain_delivered_sdus()], [6, 7, 8, 9])
+        self.assertEqual(rx.get_stats()["delivery_sink_dropped"], 6)
+        self.assertEqual(rx.successful_deliveries, 10)
+
+    def test_list_sink_opt_in(self):
+        rx = PDCPReceiver(delivery_sink=ListSink(), **self.kwargs)
+        rx.receive_pdus(self.pdus)
+        self.assertEqual(len(rx.get_delivered_sdus()), 10)
+        self.assertEqual(len(rx.drain_delivered_sdus()), 10)
+        self.assertEqual(rx.get_delivered_sdus(), [])
+
+if __name__ == '__main__':
+    unittest.main()
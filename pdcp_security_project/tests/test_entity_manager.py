@@ -0,0 +1,38 @@
+import unittest
+from src.entity_manager import PDCPEntityManager, run_sharded, default_bearer_ids
+import config
+
+class TestEntityManager(unittest.TestCase):
+    def test_links_are_keyed_per_ue_bearer_and_direction(self):
+        manager = PDCPEntityManager()
+        keys = manager.add_ue(7)
+        self.assertEqual(len(keys), 2 * len(default_bearer_ids()))
+        self.assertIn((7, config.BEARER_ID_SRB1, config.DIRECTION_DOWNLINK), manager.links)
+        link = manager.links[(7, config.BEARER_ID_DRB1, config.DIRECTION_UPLINK)]
+        self.assertIs(link.rx.clock, manager.clock)
+        self.assertIs(link.tx.clock, manager.clock)
+        self.assertIs(link.tx.security, link.rx.security) # One prepared SecurityContext per link
+        with self.assertRaises(ValueError):
+            manager.add_ue(7)
+
+    def test_route_batches_arrivals_to_their_own_receivers(self):
+        manager = PDCPEntityManager()
+        for ue_id in range(3):
+            manager.add_ue(ue_id, bearer_ids=(config.BEARER_ID_SRB1, config.BEARER_ID_DRB1))
+        stats = manager.run_traffic(sdus_per_bearer=40, sdu_payload_size=50, burst_size=8)
+        self.assertEqual(stats["aggregate"]["num_bearers"], 12)
+        self.assertEqual(stats["aggregate"]["sdus_delivered"], 12 * 40)
+        self.assertEqual(stats["aggregate"]["bytes_delivered"], 12 * 40 * 50)
+        self.assertTrue(all(s["sdus_delivered"] == 40 for s in stats["per_bearer"].values()))
+        self.assertGreater(stats["aggregate"]["throughput_mbps"], 0)
+
+    def test_sharded_run_covers_every_ue(self):
+        result = run_sharded(num_ues=4, sdus_per_bearer=10, sdu_payload_size=20, num_workers=2,
+                             bearer_ids=(config.BEARER_ID_DRB1,))
+        self.assertEqual(result["aggregate"]["num_workers"], 2)
+        self.assertEqual(result["aggregate"]["num_ues"], 4)
+        self.assertEqual(sorted({key[0] for key in result["per_bearer"]}), [0, 1, 2, 3])
+        self.assertEqual(result["aggregate"]["sdus_delivered"], 4 * 2 * 10)
+
+if __name__ == '__main__':
+    unittest.main()
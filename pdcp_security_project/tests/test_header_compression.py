@@ -0,0 +1,110 @@
+import unittest
+from src.header_compression import (HeaderCompressor, HeaderDecompressor, build_udp_packet,
+                                    PACKET_IR, PACKET_CO, PACKET_UNCOMPRESSED)
+from src.pdcp_entity import PDCPTransmitter, PDCPReceiver
+from src.delivery_sink import ListSink
+from src.pdcp_packet import PDUStatus
+
+def voip_stream(count, first_sn=100, stride=160, **kwargs):
+    return [build_udp_packet(bytes([sn & 0xFF]) * 20, ip_id=sn, rtp_sn=first_sn + sn, rtp_ts=(first_sn + sn) * stride,
+                             rtp_marker=sn == 0, **kwargs) for sn in range(count)]
+
+class TestHeaderCompression(unittest.TestCase):
+    def test_rtp_stream_compresses_and_round_trips(self):
+        for ip_version in (4, 6):
+            compressor, decompressor = HeaderCompressor(), HeaderDecompressor()
+            packets = voip_stream(100, ip_version=ip_version)
+            compressed = [compressor.compress(packet) for packet in packets]
+            self.assertEqual([decompressor.decompress(c) for c in compressed], packets)
+            self.assertEqual(compressed[0][0], PACKET_IR)
+            # After the stride is learned, IPv4 needs 3 bytes instead of 40 (IPv6 adds the UDP checksum)
+            header_bytes = len(compressed[50]) - 20
+            self.assertEqual(header_bytes, 3 if ip_version == 4 else 5)
+            self.assertEqual(compressed[50][0] & 0xF0, PACKET_CO)
+            stats = compressor.get_stats()
+            self.assertLess(stats["header_compression_ratio"], 0.5)
+            self.assertEqual(stats["header_compression_packets"], 100)
+            self.assertIsNotNone(stats["header_compression_cpu_us_per_packet"])
+            self.assertEqual(decompressor.get_stats()["header_decompression_failures"], 0)
+
+    def test_losses_within_sn_window_and_timestamp_jump(self):
+        compressor, decompressor = HeaderCompressor(ir_refresh_interval=1000), HeaderDecompressor()
+        packets = voip_stream(40)
+        # Silence: the timestamp jumps by far more than one stride
+        packets.append(build_udp_packet(b"x" * 20, ip_id=40, rtp_sn=140, rtp_ts=140 * 160 + 8000))
+        compressed = [compressor.compress(packet) for packet in packets]
+        for index in list(range(5)) + list(range(20, 41)): # 15 packets lost in a row
+            self.assertEqual(decompressor.decompress(compressed[index]), packets[index])
+
+    def test_too_many_losses_fail_until_next_ir(self):
+        compressor, decompressor = HeaderCompressor(ir_refresh_interval=30), HeaderDecompressor()
+        packets = voip_stream(40)
+        compressed = [compressor.compress(packet) for packet in packets]
+        for index in range(5):
+            decompressor.decompress(compressed[index])
+        self.assertIsNone(decompressor.decompress(compressed[21])) # 16 lost: SN decodes 16 too low
+        ir_index = next(i for i in range(22, 40) if compressed[i][0] == PACKET_IR)
+        self.assertEqual(decompressor.decompress(compressed[ir_index]), packets[ir_index])
+        self.assertEqual(decompressor.decompress(compressed[ir_index + 1]), packets[ir_index + 1])
+
+    def test_udp_without_rtp_and_non_ip_packets(self):
+        compressor, decompressor = HeaderCompressor(), HeaderDecompressor()
+        packets = [build_udp_packet(b"payload %d" % i, src_port=53, ip_id=1000 + i) for i in range(10)]
+        packets += [b"not an IP packet", b""]
+        compressed = [compressor.compress(packet) for packet in packets]
+        self.assertEqual(len(compressed[5]), 3 + len(b"payload 5"))
+        self.assertEqual(compressed[-2][0], PACKET_UNCOMPRESSED)
+        self.assertEqual([decompressor.decompress(c) for c in compressed], packets)
+
+    def test_flows_get_separate_contexts(self):
+        compressor, decompressor = HeaderCompressor(), HeaderDecompressor()
+        flow_a = voip_stream(10, rtp_ssrc=1)
+        flow_b = voip_stream(10, first_sn=5000, rtp_ssrc=2, src_port=6000)
+        interleaved = [packet for pair in zip(flow_a, flow_b) for packet in pair]
+        self.assertEqual([decompressor.decompress(compressor.compress(p)) for p in interleaved], interleaved)
+        self.assertEqual(compressor.get_stats()["header_compression_contexts"], 2)
+
+
+class TestHeaderCompressionInEntities(unittest.TestCase):
+    def _pair(self):
+        args = dict(bearer_id=5, direction=0, integrity_key=b"I" * 16, cipher_key=b"C" * 16,
+                    integrity_enabled=True, ciphering_enabled=True, header_compression=True)
+        return PDCPTransmitter(**args), PDCPReceiver(delivery_sink=ListSink(), **args)
+
+    def test_compressed_sdus_delivered_intact(self):
+        tx, rx = self._pair()
+        packets = voip_stream(50)
+        pdus = tx.send_sdus(list(enumerate(packets[:25]))) + [tx.send_sdu(i, p) for i, p in enumerate(packets[25:], 25)]
+        self.assertLess(len(pdus[40].payload), len(packets[40]))
+        # Reordered on the way: decompression happens at in-order delivery
+        pdus[10], pdus[11] = pdus[11], pdus[10]
+        rx.receive_pdus(pdus)
+        self.assertEqual([record['payload'] for record in rx.get_delivered_sdus()], packets)
+        self.assertLess(tx.get_stats()["header_compression_ratio"], 0.5)
+        self.assertEqual(rx.get_stats()["discarded_decompression_failures"], 0)
+
+    def test_missing_and_empty_sdus_bypass_compression(self):
+        tx, rx = self._pair()
+        packets = voip_stream(2)
+        pdus = [tx.send_sdu(0, None), tx.send_sdu(1, b""), tx.send_sdu(2, packets[0])]
+        pdus += tx.send_sdus([(3, None), (4, packets[1])])
+        rx.receive_pdus(pdus)
+        self.assertEqual([record['payload'] for record in rx.get_delivered_sdus()],
+                         [b"", b"", packets[0], b"", packets[1]])
+        self.assertEqual(tx.get_stats()["header_compression_packets"], 2)
+        self.assertEqual(rx.get_stats()["discarded_decompression_failures"], 0)
+
+    def test_undecompressible_sdu_is_discarded(self):
+        tx, rx = self._pair()
+        packets = voip_stream(3)
+        pdus = [tx.send_sdu(i, p) for i, p in enumerate(packets)]
+        rx.t_reordering = None
+        rx.rx_deliv = rx.rx_next = 1 # As if the IR had been skipped by t-Reordering
+        rx.replay_window.advance(1 - rx.window_size)
+        rx.receive_pdu(pdus[1])
+        self.assertEqual(pdus[1].status, PDUStatus.DISCARDED_DECOMPRESSION_FAILURE)
+        self.assertEqual(rx.get_stats()["discarded_decompression_failures"], 1)
+        self.assertEqual(rx.get_delivered_sdus(), [])
+
+if __name__ == '__main__':
+    unittest.main()
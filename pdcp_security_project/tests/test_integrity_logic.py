@@ -1,6 +1,7 @@
 import unittest
-from src.crypto_stub import generate_key, calculate_mac_i
+from src.crypto_stub import generate_key, calculate_mac_i, get_mac_engine
 from src.pdcp_entity import PDCPTransmitter, PDCPReceiver
+from src.delivery_sink import ListSink
 from src.pdcp_packet import PDCP_PDU
 from src import cipher_stub
 import config
@@ -35,6 +36,16 @@ class TestIntegrityLogic(unittest.TestCase):
         mac2 = calculate_mac_i(different_key, self.count, self.bearer, self.direction, self.data)
         self.assertNotEqual(mac1, mac2)
 
+    def test_mac_engine_matches_module_function_and_is_cached(self):
+        engine = get_mac_engine(self.integrity_key)
+        self.assertIs(engine, get_mac_engine(bytearray(self.integrity_key)))
+        for count in (0, self.count, 2**32 - 1):
+            self.assertEqual(engine.calculate_mac_i(count, self.bearer, self.direction, self.data),
+                             calculate_mac_i(self.integrity_key, count, self.bearer, self.direction, self.data))
+        # The copied per-message state must not leak between messages
+        self.assertEqual(engine.calculate_mac_i(self.count, self.bearer, self.direction, self.data),
+                         engine.calculate_mac_i(self.count, self.bearer, self.direction, self.data))
+
     def test_pdcp_tx_rx_integrity_pass(self):
         tx = PDCPTransmitter(
             bearer_id=1, direction=0,
@@ -44,7 +55,8 @@ class TestIntegrityLogic(unittest.TestCase):
         rx = PDCPReceiver(
             bearer_id=1, direction=0,
             integrity_key=self.integrity_key, cipher_key=self.cipher_key,
-            integrity_enabled=True, ciphering_enabled=True
+            integrity_enabled=True, ciphering_enabled=True,
+            delivery_sink=ListSink()
         )
 
         sdu_id = 0
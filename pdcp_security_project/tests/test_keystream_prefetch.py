@@ -0,0 +1,53 @@
+import time
+import unittest
+from src.pdcp_entity import PDCPTransmitter
+from src import crypto_stub, cipher_stub
+import config
+
+class TestKeystreamPrefetch(unittest.TestCase):
+    def setUp(self):
+        self.integrity_key = crypto_stub.generate_key(config.INTEGRITY_KEY_LENGTH_BYTES)
+        self.cipher_key = cipher_stub.generate_cipher_key(config.CIPHER_KEY_LENGTH_BYTES)
+
+    def _tx(self, **kwargs):
+        return PDCPTransmitter(3, 1, self.integrity_key, self.cipher_key, True, True, sn_length_bits=12, **kwargs)
+
+    def test_prefetched_pdus_match_on_demand_keystream(self):
+        plain_tx = self._tx()
+        prefetch_tx = self._tx(keystream_prefetch_depth=8, keystream_prefetch_max_len=64)
+        for i in range(20):
+            if i % 5 == 0:
+                prefetch_tx.prefetch_keystream()
+            payload = bytes([i]) * (i * 3)
+            self.assertEqual(prefetch_tx.send_sdu(i, payload).payload, plain_tx.send_sdu(i, payload).payload)
+        stats = prefetch_tx.get_stats()
+        self.assertEqual(stats["keystream_prefetch_hits"], 20)
+        self.assertEqual(stats["keystream_prefetch_misses"], 0)
+
+    def test_oversized_sdu_and_key_change_fall_back_to_on_demand(self):
+        tx = self._tx(keystream_prefetch_depth=4, keystream_prefetch_max_len=16)
+        self.assertEqual(tx.prefetch_keystream(), 4)
+        tx.send_sdu(0, b"x" * 100)  # Longer than the prefetched keystream
+        tx.update_keys(cipher_key=cipher_stub.generate_cipher_key(config.CIPHER_KEY_LENGTH_BYTES))
+        self.assertEqual(tx.get_stats()["keystream_prefetch_buffered"], 0)
+        pdu = tx.send_sdu(1, b"after rekey")
+        reference = PDCPTransmitter(3, 1, self.integrity_key, tx.cipher_key, True, True, sn_length_bits=12)
+        reference.send_sdu(0, b"")
+        self.assertEqual(pdu.payload, reference.send_sdu(1, b"after rekey").payload)
+        self.assertEqual(tx.get_stats()["keystream_prefetch_misses"], 2)
+
+    def test_background_worker_refills_ring(self):
+        tx = self._tx(keystream_prefetch_depth=16, keystream_prefetch_max_len=32, prefetch_in_background=True)
+        reference = self._tx()
+        try:
+            for i in range(50):
+                self.assertEqual(tx.send_sdu(i, b"data").payload, reference.send_sdu(i, b"data").payload)
+                time.sleep(0.001)
+        finally:
+            tx.stop_prefetch_worker()
+        stats = tx.get_stats()
+        self.assertEqual(stats["keystream_prefetch_hits"] + stats["keystream_prefetch_misses"], 50)
+        self.assertGreater(stats["keystream_prefetch_hits"], 0)
+
+if __name__ == '__main__':
+    unittest.main()
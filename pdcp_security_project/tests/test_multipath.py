@@ -0,0 +1,39 @@
+import unittest
+from main import run_simulation_multipath
+from src.multipath import MultiPathChannel, SPLIT
+from src.channel_simulator import ImpairedChannel
+from src.pdcp_entity import PDCPTransmitter
+
+KEY = bytes(range(16))
+
+class TestMultiPathChannel(unittest.TestCase):
+    def setUp(self):
+        self.pdus = PDCPTransmitter(1, 0, KEY, KEY, True, True).send_sdus((i, b"payload") for i in range(6))
+
+    def test_base_delay_holds_pdus(self):
+        channel = ImpairedChannel(base_delay=2)
+        self.assertEqual(channel.transmit(self.pdus[:1]), [])
+        self.assertEqual(channel.transmit([]), [])
+        self.assertEqual([pdu.sdu_id for pdu in channel.transmit([])], [0])
+
+    def test_split_spreads_round_robin(self):
+        channel = MultiPathChannel([{}, {"base_delay": 1}], mode=SPLIT)
+        self.assertEqual(sorted(pdu.sdu_id for pdu in channel.transmit(self.pdus)), [0, 2, 4])
+        self.assertEqual(sorted(pdu.sdu_id for pdu in channel.flush_reorder_buffer()), [1, 3, 5])
+        self.assertEqual(channel.get_stats()["legs"], [{"pdus_sent": 3, "pdus_arrived": 3}] * 2)
+        with self.assertRaises(ValueError):
+            MultiPathChannel([{}], mode="striped")
+
+
+class TestDuplicationRun(unittest.TestCase):
+    def test_duplication_masks_a_dead_leg_and_discards_late_copies(self):
+        results = run_simulation_multipath(50, 40, True, True, KEY, KEY,
+                                           [{"loss_rate": 1.0}, {"base_delay": 2}, {"base_delay": 5}])
+        self.assertEqual(results["effective_loss"], 0.0)
+        self.assertEqual(results["latency_percentiles"], {50: 2, 90: 2, 99: 2})
+        self.assertEqual(results["rx_input_pdus_count"], 100)
+        self.assertEqual(results["duplicate_discards"], 50) # Every copy from the slowest leg
+        self.assertEqual((results["integrity_failures"], results["payload_mismatches"]), (0, 0))
+
+if __name__ == '__main__':
+    unittest.main()
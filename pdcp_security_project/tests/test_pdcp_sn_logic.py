@@ -1,7 +1,12 @@
 
     # pdcp_security_project/tests/test_pdcp_sn_logic.py
 import unittest
-    # from src.pdcp_entity import PDCPTransmitter, PDCPReceiver # If testing SN logic here
+import copy
+from src.pdcp_entity import PDCPTransmitter, PDCPReceiver
+from src.delivery_sink import ListSink
+from src import pdcp_wire
+from src import crypto_stub, cipher_stub
+import config
 
 class TestPDCPSNLogic(unittest.TestCase):
     def test_sn_increment(self):
@@ -12,5 +17,81 @@ class TestPDCPSNLogic(unittest.TestCase):
             # Placeholder for HFN estimation tests
         self.assertTrue(True)
 
+    def _tx_pair(self, sn_length_bits, start_sn, start_hfn=0):
+        integrity_key = crypto_stub.generate_key(config.INTEGRITY_KEY_LENGTH_BYTES)
+        cipher_key = cipher_stub.generate_cipher_key(config.CIPHER_KEY_LENGTH_BYTES)
+        pair = []
+        for _ in range(2):
+            tx = PDCPTransmitter(1, 0, integrity_key, cipher_key, True, True, sn_length_bits=sn_length_bits)
+            tx.next_tx_sn, tx.hfn_latch = start_sn, start_hfn
+            pair.append(tx)
+        return pair
+
+    def test_send_sdus_matches_send_sdu_across_sn_wrap(self):
+        for sn_length_bits in (12, 18):
+            with self.subTest(sn_length_bits=sn_length_bits):
+                max_sn = (1 << sn_length_bits) - 1
+                single_tx, bulk_tx = self._tx_pair(sn_length_bits, max_sn - 5, start_hfn=7)
+                sdus = [(i, bytes([i]) * (i % 40)) for i in range(20)]
+                single = [single_tx.send_sdu(sdu_id, payload) for sdu_id, payload in sdus]
+                bulk = bulk_tx.send_sdus(sdus[:9]) + bulk_tx.send_sdus(sdus[9:])
+                self.assertEqual([(p.sn, p.hfn, p.count, p.payload, p.mac_i) for p in bulk],
+                                 [(p.sn, p.hfn, p.count, p.payload, p.mac_i) for p in single])
+                self.assertEqual(bulk[6].sn, 0)
+                self.assertEqual(bulk[6].hfn, 8)
+                self.assertEqual((bulk_tx.next_tx_sn, bulk_tx.hfn_latch, bulk_tx.tx_count),
+                                 (single_tx.next_tx_sn, single_tx.hfn_latch, single_tx.tx_count))
+
+    def test_send_sdus_wraps_count_at_hfn_limit(self):
+        sn_length_bits = 12
+        single_tx, bulk_tx = self._tx_pair(sn_length_bits, (1 << sn_length_bits) - 2,
+                                           start_hfn=(1 << (32 - sn_length_bits)) - 1)
+        sdus = [(i, b"wrap") for i in range(4)]
+        single = [single_tx.send_sdu(sdu_id, payload) for sdu_id, payload in sdus]
+        bulk = bulk_tx.send_sdus(sdus)
+        self.assertEqual([p.count for p in bulk], [2**32 - 2, 2**32 - 1, 0, 1])
+        self.assertEqual([p.payload for p in bulk], [p.payload for p in single])
+        self.assertEqual((bulk_tx.next_tx_sn, bulk_tx.hfn_latch), (single_tx.next_tx_sn, single_tx.hfn_latch))
+
+    def _rx_at(self, tx, count, **kwargs):
+        rx = PDCPReceiver(1, 0, tx.integrity_key, tx.cipher_key, True, True,
+                          sn_length_bits=tx.sn_length_bits, delivery_sink=ListSink(), **kwargs)
+        rx.rx_deliv = rx.rx_next = rx.rx_reord = count
+        rx.replay_window.advance(count - rx.window_size)
+        return rx
+
+    def test_receiver_delivers_across_count_wrap(self):
+        sn_length_bits = 12
+        tx, _ = self._tx_pair(sn_length_bits, (1 << sn_length_bits) - 6, start_hfn=(1 << (32 - sn_length_bits)) - 1)
+        pdus = tx.send_sdus([(i, b"SDU %d" % i) for i in range(12)])
+        arrival = pdus[:4] + [pdus[5], pdus[4]] + pdus[6:] # Reordered across the wrap
+        for batched in (False, True):
+            with self.subTest(batched=batched):
+                rx = self._rx_at(tx, 2**32 - 6)
+                if batched:
+                    rx.receive_pdus([copy.copy(pdu) for pdu in arrival])
+                else:
+                    for pdu in arrival:
+                        rx.receive_pdu(copy.copy(pdu))
+                self.assertEqual([(r['sdu_id'], r['count']) for r in rx.get_delivered_sdus()],
+                                 [(i, (2**32 - 6 + i) & 0xFFFFFFFF) for i in range(12)])
+                self.assertEqual((rx.rx_deliv, rx.rx_next), (6, 6))
+                self.assertFalse(rx.receive_pdu(copy.copy(pdus[2]))) # Behind RX_DELIV across the wrap
+                self.assertEqual(rx.get_stats()["discarded_old_packets"], 1)
+
+    def test_t_reordering_and_status_report_across_count_wrap(self):
+        sn_length_bits = 12
+        tx, _ = self._tx_pair(sn_length_bits, (1 << sn_length_bits) - 4, start_hfn=(1 << (32 - sn_length_bits)) - 1)
+        pdus = tx.send_sdus([(i, b"SDU %d" % i) for i in range(8)])
+        rx = self._rx_at(tx, 2**32 - 4, t_reordering=5)
+        rx.receive_pdus([copy.copy(pdu) for i, pdu in enumerate(pdus) if i not in (1, 5)])
+        fmc, bitmap = pdcp_wire.parse_status_report(rx.build_status_report().payload)
+        self.assertEqual((fmc, bytes(bitmap)), (2**32 - 3, b"\xec")) # COUNTs -2, -1, 0, 2, 3 received
+        rx.clock.advance(5) # Skips COUNT -3; the timer restarts for the gap at COUNT 1
+        self.assertEqual([r['count'] for r in rx.get_delivered_sdus()], [2**32 - 4, 2**32 - 2, 2**32 - 1, 0])
+        rx.clock.advance(5)
+        self.assertEqual([r['count'] for r in rx.get_delivered_sdus()][4:], [2, 3])
+        self.assertEqual((rx.rx_deliv, rx.rx_next, rx.get_stats()["skipped_counts"]), (4, 4, 2))
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,107 @@
+import unittest
+from src import pdcp_wire
+from src.pdcp_wire import PDUFormatError
+from src.pdcp_entity import PDCPTransmitter, PDCPReceiver
+from src.channel_simulator import ImpairedChannel
+
+class TestWireFormat(unittest.TestCase):
+    def test_header_layout(self):
+        # 12-bit SN: D/C=1, R R R, then the SN
+        self.assertEqual(bytes(pdcp_wire.encode_data_pdu(0xABC, b"xy", 12)), b"\x8a\xbcxy")
+        # 18-bit SN: D/C=1, five R bits, then the SN
+        self.assertEqual(bytes(pdcp_wire.encode_data_pdu(0x2ABCD, b"", 18)), b"\x82\xab\xcd")
+        self.assertEqual(pdcp_wire.header_length(12), 2)
+        self.assertEqual(pdcp_wire.header_length(18), 3)
+        with self.assertRaises(ValueError):
+            pdcp_wire.header_length(7)
+        with self.assertRaises(ValueError):
+            pdcp_wire.encode_data_pdu(1 << 12, b"", 12)
+
+    def test_encode_into_caller_buffer_and_parse_in_place(self):
+        for sn_bits, sn in ((12, 4095), (18, (1 << 18) - 1)):
+            buffer = bytearray(16)
+            end = pdcp_wire.encode_data_pdu_into(buffer, 3, sn, b"payload", sn_bits)
+            self.assertEqual(end, 3 + pdcp_wire.header_length(sn_bits) + 7)
+            parsed_sn, payload = pdcp_wire.parse_data_pdu(memoryview(buffer)[3:end], sn_bits)
+            self.assertEqual(parsed_sn, sn)
+            self.assertIsInstance(payload, memoryview)
+            self.assertIs(payload.obj, buffer) # No copy of the payload
+            self.assertEqual(bytes(payload), b"payload")
+
+    def test_parse_rejects_control_and_short_pdus(self):
+        with self.assertRaises(PDUFormatError):
+            pdcp_wire.parse_data_pdu(b"\x0a\xbc", 12) # D/C = 0
+        with self.assertRaises(PDUFormatError):
+            pdcp_wire.parse_data_pdu(b"\x80\x00", 18)
+
+    def test_frames_round_trip(self):
+        pdus = [(sn, bytes([sn]) * sn) for sn in range(6)]
+        buffer = pdcp_wire.encode_frames(pdus, 12, out=bytearray(b"\xff"))
+        self.assertEqual(len(buffer), 1 + sum(2 + 2 + sn for sn in range(6)))
+        parsed = pdcp_wire.parse_frames(memoryview(buffer)[1:], 12)
+        self.assertEqual([(sn, bytes(payload)) for sn, payload in parsed], pdus)
+        with self.assertRaises(PDUFormatError):
+            pdcp_wire.parse_frames(buffer[1:-1], 12)
+        with self.assertRaises(PDUFormatError):
+            pdcp_wire.parse_frames(b"\x00", 12)
+
+    def test_failed_encode_leaves_out_unchanged(self):
+        out = bytearray(b"\xff")
+        for pdus in ([(0, b"ok"), (1 << 12, b"SN too large")], [(0, b"ok"), (1, bytes(pdcp_wire.MAX_PDU_LENGTH))],
+                     [(0, b"ok"), (1, None)]):
+            with self.assertRaises((ValueError, TypeError)):
+                pdcp_wire.encode_frames(pdus, 12, out=out)
+            self.assertEqual(out, b"\xff")
+
+
+class TestWireEntities(unittest.TestCase):
+    def _pair(self, sn_bits, integrity_enabled=True, ciphering_enabled=True):
+        args = dict(bearer_id=1, direction=0, integrity_key=b"I" * 16, cipher_key=b"C" * 16,
+                    integrity_enabled=integrity_enabled, ciphering_enabled=ciphering_enabled, sn_length_bits=sn_bits)
+        return PDCPTransmitter(**args), PDCPReceiver(**args)
+
+    def test_receive_bytes_matches_object_path(self):
+        for sn_bits in (12, 18):
+            for ciphering_enabled in (True, False):
+                tx, rx = self._pair(sn_bits, ciphering_enabled=ciphering_enabled)
+                sdus = [(i, f"SDU {i}".encode() * 3) for i in range(40)]
+                buffer = tx.encode_pdus(tx.send_sdus(sdus[:20], as_batch=True))
+                tx.encode_pdus(tx.send_sdus(sdus[20:]), out=buffer)
+                verdicts, delivered = rx.receive_bytes(buffer)
+                self.assertEqual(verdicts, [True] * 40)
+                self.assertEqual([bytes(record['payload']) for record in delivered], [p for _, p in sdus])
+                self.assertEqual([record['count'] for record in delivered], list(range(40)))
+                self.assertEqual(tx.get_stats()["wire_bytes_sent"], len(buffer))
+                self.assertEqual(rx.get_stats()["wire_bytes_received"], len(buffer))
+                buffer[:] = b"" # The receiver holds no views into the buffer
+
+    def test_tampered_payload_fails_integrity_on_the_wire(self):
+        tx, rx = self._pair(12)
+        channel = ImpairedChannel(tampering_rate=1.0)
+        buffer = tx.encode_pdus(channel.transmit(tx.send_sdus([(0, b"hello world")])))
+        verdicts, delivered = rx.receive_bytes(buffer)
+        self.assertEqual(verdicts, [False])
+        self.assertEqual(rx.discarded_integrity_failures, 1)
+
+    def test_corrupt_length_prefix_discards_only_the_rest_of_the_buffer(self):
+        tx, rx = self._pair(12)
+        buffer = tx.encode_pdus(tx.send_sdus([(i, b"SDU %d" % i) for i in range(5)]))
+        frame_length = len(buffer) // 5
+        buffer[3 * frame_length] = 0xFF # Length prefix of the fourth frame now runs past the end
+        verdicts, delivered = rx.receive_bytes(buffer)
+        self.assertEqual(verdicts, [True] * 3)
+        self.assertEqual([record['count'] for record in delivered], [0, 1, 2])
+        self.assertEqual(rx.get_stats()["discarded_malformed"], 1)
+
+    def test_invalid_frame_is_skipped(self):
+        tx, rx = self._pair(12)
+        pdus = tx.send_sdus([(i, b"SDU %d" % i) for i in range(3)])
+        buffer = tx.encode_pdus(pdus[:1])
+        buffer += b"\x00\x01\x80" # One-byte frame, shorter than the header
+        tx.encode_pdus(pdus[1:], out=buffer)
+        verdicts, delivered = rx.receive_bytes(buffer)
+        self.assertEqual(verdicts, [True] * 3)
+        self.assertEqual(rx.discarded_malformed, 1)
+
+if __name__ == '__main__':
+    unittest.main()
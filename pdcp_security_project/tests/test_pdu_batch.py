@@ -0,0 +1,71 @@
+import unittest
+from src.pdcp_packet import PDCP_PDU, PDUBatch, PDUFlag, PDUStatus
+from src.pdcp_entity import PDCPTransmitter, PDCPReceiver
+from src.delivery_sink import ListSink
+from src.channel_simulator import ImpairedChannel
+
+class TestPDURepresentation(unittest.TestCase):
+    def test_slotted_pdu_flags_status_and_copy(self):
+        pdu = PDCP_PDU(1, 2, 3, 0, b"payload", is_control_pdu=True)
+        self.assertFalse(hasattr(pdu, "__dict__"))
+        self.assertTrue(pdu.is_control_pdu)
+        pdu.is_tampered_by_channel = True
+        self.assertEqual(pdu.flags, PDUFlag.CONTROL_PDU | PDUFlag.TAMPERED_BY_CHANNEL)
+        pdu.is_control_pdu = False
+        self.assertEqual(pdu.flags, PDUFlag.TAMPERED_BY_CHANNEL)
+        pdu.status = PDUStatus.DISCARDED_DUPLICATE
+        self.assertEqual(str(pdu.status), "Discarded_Duplicate")
+        self.assertTrue(pdu.status.is_discarded)
+        self.assertFalse(PDUStatus.DELIVERED.is_discarded)
+
+        duplicate = pdu.copy()
+        self.assertIsNot(duplicate, pdu)
+        self.assertIs(duplicate.payload, pdu.payload)
+        duplicate.is_corrupted_by_channel = True
+        self.assertFalse(pdu.is_corrupted_by_channel)
+
+    def test_batch_round_trip(self):
+        pdus = [PDCP_PDU(i, i, 4096 + i, 1, bytes([i]) * i) for i in range(5)]
+        pdus[2].is_tampered_by_channel = True
+        pdus[3].status = PDUStatus.CHANNEL_OUTPUT
+        batch = PDUBatch.from_pdus(pdus)
+        self.assertEqual(len(batch), 5)
+        self.assertEqual(batch.payload(4), b"\x04" * 4)
+        self.assertEqual(len(batch.payload_arena), sum(range(5)))
+        restored = batch.to_pdus()
+        self.assertEqual([(p.sdu_id, p.sn, p.count, p.hfn, bytes(p.payload), p.flags, p.status) for p in restored],
+                         [(p.sdu_id, p.sn, p.count, p.hfn, bytes(p.payload), p.flags, p.status) for p in pdus])
+        # Columns only: 8 + 4 + 8 + 4 + 1 + 1 bytes per PDU plus one 8-byte offset
+        self.assertEqual(batch.nbytes - len(batch.payload_arena), 5 * 34 + 8)
+
+    def test_receiver_side_pdus_keep_missing_fields(self):
+        key = bytes(range(16))
+        kwargs = dict(bearer_id=1, direction=0, integrity_key=key, cipher_key=key,
+                      integrity_enabled=True, ciphering_enabled=True)
+        report = PDCPReceiver(**kwargs).build_status_report()
+        pdus = [PDCP_PDU(None, 7, None, None, b"wire"), report, PDCP_PDU(3, 3, 0xFFFFFFFF, 0xFFFFF, b"")]
+        restored = PDUBatch.from_pdus(pdus).to_pdus()
+        self.assertEqual([(p.sdu_id, p.sn, p.count, p.hfn) for p in restored],
+                         [(p.sdu_id, p.sn, p.count, p.hfn) for p in pdus])
+        self.assertEqual(restored[1].payload, bytes(report.payload))
+
+    def test_entities_and_channel_accept_batches(self):
+        key = bytes(range(16))
+        kwargs = dict(bearer_id=1, direction=0, integrity_key=key, cipher_key=key,
+                      integrity_enabled=True, ciphering_enabled=True)
+        tx, rx = PDCPTransmitter(**kwargs), PDCPReceiver(delivery_sink=ListSink(), **kwargs)
+        rx_reference = PDCPReceiver(delivery_sink=ListSink(), **kwargs)
+        sdus = [(i, f"SDU {i}".encode()) for i in range(20)]
+        batch = tx.send_sdus(sdus, as_batch=True)
+        self.assertIsInstance(batch, PDUBatch)
+        self.assertEqual(list(batch.statuses), [PDUStatus.TX_PREPARED] * 20)
+        arrived = ImpairedChannel().transmit(batch)
+        self.assertIsInstance(arrived, PDUBatch)
+        verdicts, delivered = rx.receive_pdus(arrived)
+        self.assertEqual(verdicts, [True] * 20)
+        self.assertEqual([(r['sdu_id'], r['payload']) for r in delivered], sdus)
+        rx_reference.receive_pdus(batch.to_pdus())
+        self.assertEqual(rx_reference.get_delivered_sdus(), rx.get_delivered_sdus())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,97 @@
+import copy
+import unittest
+from src.replay_window import ReplayWindow
+from src.pdcp_entity import PDCPTransmitter, PDCPReceiver
+
+class TestReplayWindow(unittest.TestCase):
+    def test_duplicate_and_too_old(self):
+        window = ReplayWindow(64)
+        self.assertFalse(window.is_duplicate(10))
+        window.mark(10)
+        self.assertTrue(window.is_duplicate(10))
+        window.advance(11)
+        self.assertTrue(window.is_too_old(10))
+        self.assertFalse(window.is_too_old(11))
+        self.assertFalse(window.is_duplicate(11))
+
+    def test_bits_are_cleared_when_they_leave_the_window(self):
+        window = ReplayWindow(16)
+        for count in range(16):
+            window.mark(count)
+        window.advance(8)
+        # COUNTs 16..23 reuse the bits of 0..7 and must start unmarked
+        self.assertFalse(any(window.is_duplicate(count) for count in range(16, 24)))
+        self.assertTrue(all(window.is_duplicate(count) for count in range(8, 16)))
+        window.advance(100)
+        self.assertFalse(any(window.is_duplicate(count) for count in range(100, 116)))
+
+    def test_mark_above_window_slides_it_up(self):
+        window = ReplayWindow(16)
+        window.mark(3)
+        window.mark(40)
+        self.assertEqual(window.lower_edge, 25)
+        self.assertTrue(window.is_too_old(3))
+        self.assertTrue(window.is_duplicate(40))
+
+    def test_wraps_at_count_modulus(self):
+        window = ReplayWindow(16, lower_edge=2**32 - 4)
+        window.mark(2**32 - 1)
+        window.mark(2)
+        window.advance(1)
+        self.assertTrue(window.is_too_old(2**32 - 1))
+        self.assertTrue(window.is_duplicate(2))
+        self.assertFalse(window.is_too_old(5))
+
+    def test_memory_is_window_bits(self):
+        self.assertEqual(ReplayWindow(2 * 2**11).nbytes, 512)
+        self.assertEqual(ReplayWindow(2 * 2**17).nbytes, 32768)
+        with self.assertRaises(ValueError):
+            ReplayWindow(100)
+
+    def test_receiver_rejects_replays_inside_window(self):
+        key = bytes(range(16))
+        tx = PDCPTransmitter(1, 0, key, key, True, True, sn_length_bits=12)
+        rx = PDCPReceiver(1, 0, key, key, True, True, sn_length_bits=12)
+        pdus = tx.send_sdus((i, b"payload") for i in range(3000))
+        rx.receive_pdus(copy.copy(pdu) for pdu in pdus)
+        # Window_Size is 2048, so replays of COUNTs down to 3000 - 2048 are recognised as duplicates
+        self.assertEqual(rx.receive_pdus([copy.copy(pdus[2999]), copy.copy(pdus[1000])])[0], [False, False])
+        stats = rx.get_stats()
+        self.assertEqual(stats["successful_deliveries"], 3000)
+        self.assertEqual(stats["discarded_duplicates"], 2)
+        self.assertEqual(stats["discarded_old_packets"], 0)
+        self.assertEqual(rx.replay_window.lower_edge, 3000 - 2048)
+
+    def test_duplicates_and_replays_are_dropped_before_crypto(self):
+        key = bytes(range(16))
+        tx = PDCPTransmitter(1, 0, key, key, True, True, sn_length_bits=12)
+        rx = PDCPReceiver(1, 0, key, key, True, True, sn_length_bits=12)
+        unprotected = []
+        unprotect_batch = rx.security.unprotect_batch
+
+        def counting_unprotect_batch(counts, payloads):
+            unprotected.extend(counts)
+            return unprotect_batch(counts, payloads)
+        rx.security.unprotect_batch = counting_unprotect_batch
+        pdus = tx.send_sdus((i, b"payload") for i in range(10))
+        verdicts, _ = rx.receive_pdus([copy.copy(pdu) for pdu in pdus for _ in range(2)]) # Every PDU twice
+        self.assertEqual(verdicts, [True, False] * 10)
+        rx.receive_pdus(copy.copy(pdu) for pdu in pdus) # Replayed burst
+        self.assertEqual(unprotected, list(range(10)))
+        self.assertEqual(rx.get_stats()["discarded_duplicates"], 20)
+
+    def test_forged_pdu_does_not_mark_its_count(self):
+        key = bytes(range(16))
+        tx = PDCPTransmitter(1, 0, key, key, True, True, sn_length_bits=12)
+        pdus = tx.send_sdus((i, b"payload") for i in range(4))
+        forged = copy.copy(pdus[2])
+        forged.payload = bytes(len(forged.payload)) # Right SN, wrong MAC-I
+        for batch in (False, True):
+            rx = PDCPReceiver(1, 0, key, key, True, True, sn_length_bits=12)
+            arrivals = [forged] + [copy.copy(pdu) for pdu in pdus]
+            verdicts = rx.receive_pdus(arrivals)[0] if batch else [rx.receive_pdu(pdu) for pdu in arrivals]
+            self.assertEqual(verdicts, [False, True, True, True, True])
+            self.assertEqual((rx.discarded_integrity_failures, rx.discarded_duplicates), (1, 0))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+import unittest
+from src import pdcp_wire
+from src.pdcp_wire import PDUFormatError
+from src.pdcp_entity import PDCPTransmitter, PDCPReceiver
+from src.delivery_sink import ListSink
+from src.sim_clock import SimClock
+
+class TestStatusReportFormat(unittest.TestCase):
+    def test_round_trip(self):
+        encoded = pdcp_wire.encode_status_report(0x01020304, b"\xa0")
+        self.assertEqual(bytes(encoded), b"\x00\x01\x02\x03\x04\xa0")
+        fmc, bitmap = pdcp_wire.parse_status_report(encoded)
+        self.assertEqual((fmc, bytes(bitmap)), (0x01020304, b"\xa0"))
+        with self.assertRaises(PDUFormatError):
+            pdcp_wire.parse_status_report(b"\x80\x00\x00\x00\x00") # Data PDU
+        with self.assertRaises(PDUFormatError):
+            pdcp_wire.parse_status_report(b"\x10\x00\x00\x00\x00") # Another control PDU type
+        with self.assertRaises(PDUFormatError):
+            pdcp_wire.parse_status_report(b"\x00\x00")
+
+
+class TestRetransmission(unittest.TestCase):
+    def setUp(self):
+        key = bytes(range(16))
+        self.clock = SimClock()
+        self.kwargs = dict(bearer_id=1, direction=0, integrity_key=key, cipher_key=key,
+                           integrity_enabled=True, ciphering_enabled=True, sn_length_bits=12, clock=self.clock)
+
+    def _tx(self, tx_buffer_max_bytes=1 << 16, **kwargs):
+        return PDCPTransmitter(tx_buffer_max_bytes=tx_buffer_max_bytes, **self.kwargs, **kwargs)
+
+    def test_status_report_drives_selective_retransmission(self):
+        tx = self._tx()
+        rx = PDCPReceiver(t_reordering=None, delivery_sink=ListSink(), **self.kwargs)
+        pdus = tx.send_sdus((i, f"SDU {i}".encode()) for i in range(12))
+        rx.receive_pdus([pdu for i, pdu in enumerate(pdus) if i not in (3, 7)])
+
+        report = rx.build_status_report()
+        self.assertTrue(report.is_control_pdu)
+        fmc, bitmap = pdcp_wire.parse_status_report(report.payload)
+        self.assertEqual((fmc, bytes(bitmap)), (3, bytes([0b11101111]))) # COUNTs 4..11, 7 missing
+
+        retransmitted = tx.receive_status_report(report)
+        self.assertEqual([pdu.count for pdu in retransmitted], [3, 7])
+        self.assertIs(retransmitted[0].payload, pdus[3].payload) # Stored protected bytes, not re-ciphered
+        self.assertEqual(sorted(tx.tx_buffer), [3, 7]) # Everything else acknowledged
+        rx.receive_pdus(retransmitted)
+        self.assertEqual([r['sdu_id'] for r in rx.get_delivered_sdus()], list(range(12)))
+
+        self.assertEqual(tx.receive_status_report(rx.build_status_report()), [])
+        stats = tx.get_stats()
+        self.assertEqual((stats["tx_buffer_pdus"], stats["tx_buffer_bytes"], stats["retransmitted_pdus"]), (0, 0, 2))
+
+    def test_bitmap_padding_is_not_read_as_missing(self):
+        tx = self._tx()
+        rx = PDCPReceiver(t_reordering=None, **self.kwargs)
+        pdus = tx.send_sdus((i, f"SDU {i}".encode()) for i in range(12))
+        rx.receive_pdus([pdu for i, pdu in enumerate(pdus) if i < 8 and i != 5]) # 8..11 still in flight
+
+        report = rx.build_status_report()
+        fmc, bitmap = pdcp_wire.parse_status_report(report.payload)
+        self.assertEqual((fmc, bytes(bitmap)), (5, b"\xc0")) # COUNTs 6 and 7, then six padding bits
+        self.assertEqual([pdu.count for pdu in tx.receive_status_report(report)], [5])
+        self.assertEqual(sorted(tx.tx_buffer), [5, 8, 9, 10, 11])
+
+    def test_discard_timer(self):
+        tx = self._tx(discard_timer=5)
+        tx.send_sdus((i, b"early") for i in range(3))
+        self.clock.advance(2)
+        tx.send_sdu(3, b"late")
+        self.clock.advance(3)
+        self.assertEqual(list(tx.tx_buffer), [3])
+        self.clock.advance(2)
+        self.assertEqual(tx.get_stats()["discard_timer_expiries"], 4)
+        self.assertEqual((tx.tx_buffer_bytes, self.clock.pending()), (0, 0))
+
+    def test_buffer_is_bounded_and_bad_reports_ignored(self):
+        tx = self._tx(tx_buffer_max_bytes=100)
+        pdus = [tx.send_sdu(i, bytes(20)) for i in range(10)] # 24 protected bytes each
+        self.assertEqual(list(tx.tx_buffer), [6, 7, 8, 9])
+        self.assertEqual(tx.get_stats()["tx_buffer_overflow_discards"], 6)
+        self.assertEqual(tx.receive_status_report(pdus[0]), []) # A data PDU
+        self.assertEqual(tx.get_stats()["status_report_errors"], 1)
+        self.assertEqual(len(tx.tx_buffer), 4)
+
+if __name__ == '__main__':
+    unittest.main()
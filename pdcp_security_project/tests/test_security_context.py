@@ -0,0 +1,62 @@
+import unittest
+from src.crypto_stub import generate_key, calculate_mac_i
+from src.security_context import SecurityContext
+from src import cipher_stub
+import config
+
+class TestSecurityContext(unittest.TestCase):
+    def setUp(self):
+        self.integrity_key = generate_key(config.INTEGRITY_KEY_LENGTH_BYTES)
+        self.cipher_key = cipher_stub.generate_cipher_key(config.CIPHER_KEY_LENGTH_BYTES)
+        self.context = SecurityContext(config.BEARER_ID_DRB1, config.DIRECTION_UPLINK,
+                                       integrity_key=self.integrity_key, cipher_key=self.cipher_key)
+        self.sdu = b"Protected SDU payload"
+
+    def test_protect_matches_module_level_stubs(self):
+        count = 4242
+        payload, mac_i = self.context.protect(count, self.sdu)
+        expected_mac = calculate_mac_i(self.integrity_key, count, config.BEARER_ID_DRB1,
+                                       config.DIRECTION_UPLINK, self.sdu)
+        self.assertEqual(mac_i, expected_mac)
+        self.assertEqual(payload, cipher_stub.encrypt(self.cipher_key, count, config.BEARER_ID_DRB1,
+                                                      config.DIRECTION_UPLINK, self.sdu + expected_mac))
+
+    def test_unprotect_round_trip(self):
+        payload, mac_i = self.context.protect(7, self.sdu)
+        sdu_data, received_mac_i, verified = self.context.unprotect(7, payload)
+        self.assertEqual(sdu_data, self.sdu)
+        self.assertEqual(received_mac_i, mac_i)
+        self.assertTrue(verified)
+
+    def test_unprotect_detects_tampering_wrong_count_and_short_payload(self):
+        payload, _ = self.context.protect(7, self.sdu)
+        tampered = bytearray(payload)
+        tampered[0] ^= 0x01
+        self.assertFalse(self.context.unprotect(7, bytes(tampered))[2])
+        self.assertFalse(self.context.unprotect(8, payload)[2])
+        self.assertEqual(self.context.unprotect(7, b"abc"), (None, None, False))
+
+    def test_protect_writes_into_preallocated_buffer(self):
+        out = bytearray(len(self.sdu) + 4)
+        payload, _ = self.context.protect(9, self.sdu, out=out)
+        self.assertIs(payload, out)
+        self.assertEqual(self.context.unprotect(9, memoryview(out))[0], self.sdu)
+        with self.assertRaises(ValueError):
+            self.context.protect(9, self.sdu, out=bytearray(3))
+
+    def test_integrity_only_unprotect_leaves_received_buffer_intact(self):
+        context = SecurityContext(config.BEARER_ID_DRB1, config.DIRECTION_UPLINK, integrity_key=self.integrity_key)
+        payload, mac_i = context.protect(3, self.sdu)
+        received = bytes(payload)
+        sdu_data, received_mac_i, verified = context.unprotect(3, payload)
+        self.assertTrue(verified)
+        self.assertEqual((sdu_data, received_mac_i), (self.sdu, mac_i))
+        self.assertEqual(payload, received)
+
+    def test_disabled_algorithms_pass_data_through(self):
+        context = SecurityContext(config.BEARER_ID_DRB1, config.DIRECTION_UPLINK)
+        self.assertEqual(context.protect(1, self.sdu), (self.sdu, None))
+        self.assertEqual(context.unprotect(1, self.sdu), (self.sdu, None, None))
+
+if __name__ == '__main__':
+    unittest.main()
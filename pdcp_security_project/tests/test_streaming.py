@@ -0,0 +1,49 @@
+import unittest
+from main import run_simulation_streaming
+from src.pdcp_entity import PDCPTransmitter, PDCPReceiver
+from src.channel_simulator import ImpairedChannel
+from src.crypto_stub import generate_key
+from src import cipher_stub
+from src import streaming
+import config
+
+class TestStreamingPipeline(unittest.TestCase):
+    def setUp(self):
+        self.integrity_key = generate_key(config.INTEGRITY_KEY_LENGTH_BYTES)
+        self.cipher_key = cipher_stub.generate_cipher_key(config.CIPHER_KEY_LENGTH_BYTES)
+        self.clean_channel_params = {
+            "loss_rate": 0.0, "duplication_rate": 0.0, "reordering_rate": 0.0,
+            "max_reorder_delay": 0, "corruption_rate": 0.0, "tampering_rate": 0.0
+        }
+
+    def test_streaming_run_delivers_everything_on_clean_channel(self):
+        results = run_simulation_streaming(
+            num_sdus=500, sdu_payload_size=60, integrity_enabled=True, ciphering_enabled=True,
+            integrity_key=self.integrity_key, cipher_key=self.cipher_key,
+            channel_params=self.clean_channel_params, burst_size=32)
+        self.assertEqual(results["tx_pdus_count"], 500)
+        self.assertEqual(results["delivered_sdus_count"], 500)
+        self.assertEqual(results["payload_mismatches"], 0)
+
+    def test_receiver_state_stays_bounded_across_sn_wraps(self):
+        sn_length_bits = 12
+        tx = PDCPTransmitter(1, 0, self.integrity_key, self.cipher_key, True, True, sn_length_bits=sn_length_bits)
+        rx = PDCPReceiver(1, 0, self.integrity_key, self.cipher_key, True, True, sn_length_bits=sn_length_bits)
+        channel = ImpairedChannel(duplication_rate=0.05, reordering_rate=0.1, max_reorder_delay=3)
+        num_sdus = 3 * (1 << sn_length_bits)
+
+        stats = streaming.run_streaming(tx, rx, channel, num_sdus, 40, burst_size=50)
+        self.assertEqual(stats.sdus_delivered, num_sdus)
+        self.assertEqual(stats.payload_mismatches, 0)
+        self.assertEqual(rx.get_delivered_sdus(), [])
+        self.assertEqual(rx.replay_window.nbytes, 2 * rx.window_size // 8)
+
+    def test_seeded_payload_is_deterministic_and_sized(self):
+        payload = streaming.seeded_sdu_payload(7, 100, seed=3)
+        self.assertEqual(payload, streaming.seeded_sdu_payload(7, 100, seed=3))
+        self.assertEqual(len(payload), 100)
+        self.assertTrue(payload.startswith(b"SDU_7_Data_"))
+        self.assertEqual(len(streaming.seeded_sdu_payload(7, 5)), 5)
+
+if __name__ == '__main__':
+    unittest.main()
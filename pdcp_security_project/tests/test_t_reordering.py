@@ -0,0 +1,78 @@
+import copy
+import unittest
+from src.pdcp_entity import PDCPTransmitter, PDCPReceiver
+from src.delivery_sink import ListSink
+from src.sim_clock import SimClock
+
+class TestTReordering(unittest.TestCase):
+    def setUp(self):
+        key = bytes(range(16))
+        self.kwargs = dict(bearer_id=1, direction=0, integrity_key=key, cipher_key=key,
+                           integrity_enabled=True, ciphering_enabled=True, sn_length_bits=12)
+        self.pdus = PDCPTransmitter(**self.kwargs).send_sdus((i, f"SDU {i}".encode()) for i in range(10))
+
+    def _receive_all_but(self, rx, lost_index):
+        rx.receive_pdus(copy.copy(pdu) for i, pdu in enumerate(self.pdus) if i != lost_index)
+
+    def test_expiry_skips_gap_and_late_pdu_is_old(self):
+        rx = PDCPReceiver(t_reordering=5, delivery_sink=ListSink(), **self.kwargs)
+        self._receive_all_but(rx, 3)
+        self.assertEqual(rx.successful_deliveries, 3)
+        self.assertEqual((rx.rx_deliv, rx.rx_next, rx.rx_reord), (3, 10, 5))
+        rx.clock.advance(4)
+        self.assertEqual(rx.successful_deliveries, 3)
+        rx.clock.advance(1)
+        self.assertEqual([sdu['sdu_id'] for sdu in rx.get_delivered_sdus()], [0, 1, 2, 4, 5, 6, 7, 8, 9])
+        stats = rx.get_stats()
+        self.assertEqual((stats["t_reordering_expiries"], stats["skipped_counts"], stats["buffered_packets"]), (1, 1, 0))
+        self.assertEqual(rx.get_latency_percentiles((50, 99)), {50: 5, 99: 5})
+
+        self.assertFalse(rx.receive_pdu(copy.copy(self.pdus[3])))
+        self.assertEqual(rx.get_stats()["discarded_old_packets"], 1)
+        self.assertEqual(rx.clock.pending(), 0)
+
+    def test_timer_stops_when_gap_is_filled(self):
+        rx = PDCPReceiver(t_reordering=5, **self.kwargs)
+        self._receive_all_but(rx, 3)
+        rx.clock.advance(2)
+        self.assertTrue(rx.receive_pdu(copy.copy(self.pdus[3])))
+        self.assertEqual(rx.successful_deliveries, 10)
+        self.assertEqual(rx.clock.pending(), 0)
+        self.assertEqual(rx.get_latency_percentiles((40, 50)), {40: 0, 50: 2})
+
+    def test_without_timer_a_gap_stalls_delivery(self):
+        rx = PDCPReceiver(t_reordering=None, **self.kwargs)
+        self._receive_all_but(rx, 3)
+        rx.clock.advance(1000)
+        self.assertEqual(rx.successful_deliveries, 3)
+        self.assertEqual(rx.get_stats()["buffered_packets"], 6)
+
+    def test_count_reconstruction_around_rx_deliv(self):
+        rx = PDCPReceiver(**self.kwargs)
+        rx.rx_deliv = (5 << 12) | 100  # HFN 5, SN 100; Window_Size 2048
+        self.assertEqual(rx._reconstruct_count(100), (5 << 12) | 100)
+        self.assertEqual(rx._reconstruct_count(2147), (5 << 12) | 2147)
+        self.assertEqual(rx._reconstruct_count(2148), (4 << 12) | 2148)  # Behind RX_DELIV, previous HFN
+        rx.rx_deliv = (5 << 12) | 4000
+        self.assertEqual(rx._reconstruct_count(1951), (6 << 12) | 1951)  # Ahead, across the SN wrap
+        self.assertEqual(rx._reconstruct_count(1952), (5 << 12) | 1952)
+        rx.rx_deliv = 0
+        self.assertEqual(rx._reconstruct_count(4000), -1)  # Would be before COUNT 0
+
+class TestSimClock(unittest.TestCase):
+    def test_timers_fire_in_deadline_order_and_can_be_cancelled(self):
+        clock = SimClock()
+        fired = []
+        clock.schedule(3, lambda: fired.append(("b", clock.now)))
+        clock.schedule(1, lambda: fired.append(("a", clock.now)))
+        cancelled = clock.schedule(2, lambda: fired.append(("x", clock.now)))
+        clock.cancel(cancelled)
+        self.assertEqual(clock.advance(2), 1)
+        self.assertEqual(clock.now, 2)
+        clock.schedule(5, lambda: fired.append(("c", clock.now)))
+        self.assertEqual(clock.run_until_idle(), 2)
+        self.assertEqual(fired, [("a", 1), ("b", 3), ("c", 7)])
+        self.assertEqual(clock.pending(), 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,57 @@
+import unittest
+from src import tracing
+from src.tracing import TraceBuffer
+from src.pdcp_entity import PDCPTransmitter, PDCPReceiver
+from src.channel_simulator import ImpairedChannel
+from src.pdcp_packet import PDUStatus
+
+class TestTraceBuffer(unittest.TestCase):
+    def test_ring_keeps_latest_records(self):
+        tracer = TraceBuffer(capacity=4, categories="all")
+        for i in range(6):
+            tracer.record(tracing.RX_DELIVERED, i, 100 + i, i, PDUStatus.DELIVERED, 5, 1)
+        self.assertEqual(len(tracer), 4)
+        self.assertEqual(tracer.overwritten, 2)
+        events = list(tracer.events())
+        self.assertEqual([e[0] for e in events], [2, 3, 4, 5])
+        self.assertEqual(events[-1][2:], (tracing.RX_DELIVERED, 5, 105, 5, PDUStatus.DELIVERED, 5, 1))
+        self.assertEqual(len(tracer.render(since=4)), 2)
+        self.assertIn("RX_DELIVERED sdu_id=5 COUNT=105 SN=5 verdict=Delivered", tracer.render()[-1])
+        tracer.clear(capacity=8)
+        self.assertEqual((len(tracer), tracer.capacity), (0, 8))
+
+    def test_categories(self):
+        self.assertEqual(tracing.parse_categories("tx, rx"), tracing.TX | tracing.RX)
+        self.assertEqual(tracing.parse_categories(""), 0)
+        with self.assertRaises(ValueError):
+            tracing.parse_categories("crypto")
+        tracer = TraceBuffer(categories="tx")
+        tracer.enable("channel")
+        tracer.disable("tx")
+        self.assertEqual(tracer.mask, tracing.CHANNEL)
+
+
+class TestEntityTracing(unittest.TestCase):
+    def _run(self, categories):
+        tracer = TraceBuffer(categories=categories)
+        args = dict(bearer_id=5, direction=0, integrity_key=b"I" * 16, cipher_key=b"C" * 16,
+                    integrity_enabled=True, ciphering_enabled=True, tracer=tracer)
+        tx, rx = PDCPTransmitter(**args), PDCPReceiver(**args)
+        channel = ImpairedChannel(tracer=tracer)
+        pdus = channel.transmit(tx.send_sdus([(i, b"payload %d" % i) for i in range(3)]))
+        rx.receive_pdus(pdus + [min(pdus, key=lambda pdu: pdu.sdu_id).copy()]) # SDU 0 duplicated
+        return tracer, [event[2] for event in tracer.events()]
+
+    def test_hot_path_events(self):
+        tracer, events = self._run("all")
+        self.assertEqual(events.count(tracing.TX_SENT), 3)
+        self.assertEqual(events.count(tracing.RX_DELIVERED), 3)
+        discards = [e for e in tracer.events() if e[2] == tracing.RX_DISCARDED]
+        self.assertEqual([(e[3], e[6]) for e in discards], [(0, PDUStatus.DISCARDED_DUPLICATE)])
+
+    def test_disabled_categories_record_nothing(self):
+        self.assertEqual(self._run("")[1], [])
+        self.assertEqual(set(self._run("tx")[1]), {tracing.TX_SENT})
+
+if __name__ == '__main__':
+    unittest.main()
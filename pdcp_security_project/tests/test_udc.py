@@ -0,0 +1,90 @@
+import unittest
+from src.udc import UDCCompressor, UDCDecompressor, FR_BIT
+from src.pdcp_entity import PDCPTransmitter, PDCPReceiver
+from src.delivery_sink import ListSink
+from src.pdcp_packet import PDUStatus
+from src.streaming import seeded_sdu_payload
+
+DICTIONARY = b'{"user": "", "event": "page_view", "path": "/index.html", "status": 200}'
+
+def json_sdu(i):
+    return b'{"user": "ue%d", "event": "page_view", "path": "/items/%d.html", "status": 200}' % (i % 7, i)
+
+class TestUDC(unittest.TestCase):
+    def test_stream_round_trip_and_history_helps(self):
+        compressor, decompressor = UDCCompressor(), UDCDecompressor()
+        sdus = [json_sdu(i) for i in range(50)]
+        compressed = [compressor.compress(sdu) for sdu in sdus]
+        self.assertEqual([decompressor.decompress(c) for c in compressed], sdus)
+        # Later SDUs refer back to earlier ones
+        self.assertLess(len(compressed[40]), len(compressed[0]) // 2)
+        stats = compressor.get_stats()
+        self.assertLess(stats["udc_compression_ratio"], 0.5)
+        self.assertGreater(stats["udc_compression_throughput_mbps"], 0)
+        self.assertEqual(decompressor.get_stats()["udc_decompression_failures"], 0)
+
+    def test_preset_dictionary_shrinks_first_sdu(self):
+        plain, primed = UDCCompressor(), UDCCompressor(dictionary=DICTIONARY)
+        self.assertLess(len(primed.compress(json_sdu(0))), len(plain.compress(json_sdu(0))))
+        decompressor = UDCDecompressor(dictionary=DICTIONARY)
+        primed = UDCCompressor(dictionary=DICTIONARY)
+        self.assertEqual(decompressor.decompress(primed.compress(json_sdu(0))), json_sdu(0))
+
+    def test_lost_sdu_detected_and_resynchronised(self):
+        compressor, decompressor = UDCCompressor(), UDCDecompressor()
+        compressed = [compressor.compress(json_sdu(i)) for i in range(4)]
+        self.assertEqual(decompressor.decompress(compressed[0]), json_sdu(0))
+        self.assertIsNone(decompressor.decompress(compressed[2])) # compressed[1] lost
+        self.assertIsNone(decompressor.decompress(compressed[3]))
+        self.assertTrue(decompressor.take_feedback())
+        self.assertFalse(decompressor.take_feedback())
+        compressor.reset()
+        after_reset = compressor.compress(json_sdu(4))
+        self.assertTrue(after_reset[0] & FR_BIT)
+        self.assertEqual(decompressor.decompress(after_reset), json_sdu(4))
+        self.assertEqual(decompressor.decompress(compressor.compress(json_sdu(5))), json_sdu(5))
+        self.assertEqual(decompressor.get_stats()["udc_decompression_failures"], 2)
+
+
+class TestUDCInEntities(unittest.TestCase):
+    def _pair(self, t_reordering=None, **kwargs):
+        args = dict(bearer_id=5, direction=0, integrity_key=b"I" * 16, cipher_key=b"C" * 16,
+                    integrity_enabled=True, ciphering_enabled=True, uplink_data_compression=True,
+                    udc_dictionary=DICTIONARY, **kwargs)
+        return PDCPTransmitter(**args), PDCPReceiver(t_reordering=t_reordering, delivery_sink=ListSink(), **args)
+
+    def test_delivery_with_loss_and_feedback(self):
+        tx, rx = self._pair(t_reordering=2)
+        sdus = [(i, seeded_sdu_payload(i, 100)) for i in range(10)]
+        pdus = tx.send_sdus(sdus[:6])
+        self.assertLess(len(pdus[5].payload), 100)
+        rx.receive_pdus(pdus[:2] + pdus[3:]) # PDU 2 lost
+        rx.clock.run_until_idle() # t-Reordering gives up on it
+        delivered = [record['payload'] for record in rx.drain_delivered_sdus()]
+        self.assertEqual(delivered, [payload for _, payload in sdus[:2]])
+        self.assertEqual(pdus[3].status, PDUStatus.DISCARDED_DECOMPRESSION_FAILURE)
+        self.assertTrue(rx.take_udc_feedback())
+        tx.on_udc_feedback()
+        rx.receive_pdus(tx.send_sdus(sdus[6:]))
+        self.assertEqual([record['payload'] for record in rx.drain_delivered_sdus()],
+                         [payload for _, payload in sdus[6:]])
+        self.assertEqual(rx.get_stats()["discarded_decompression_failures"], 3)
+        self.assertEqual(tx.get_stats()["udc_compression_resets"], 1)
+
+    def test_missing_and_empty_sdus_bypass_compression(self):
+        tx, rx = self._pair()
+        sdus = [(i, seeded_sdu_payload(i, 100)) for i in range(2)]
+        pdus = [tx.send_sdu(0, None), tx.send_sdu(1, b""), tx.send_sdu(2, sdus[0][1])]
+        pdus += tx.send_sdus([(3, None), (4, sdus[1][1])])
+        rx.receive_pdus(pdus)
+        self.assertEqual([record['payload'] for record in rx.get_delivered_sdus()],
+                         [b"", b"", sdus[0][1], b"", sdus[1][1]])
+        self.assertEqual(tx.get_stats()["udc_compression_packets"], 2)
+        self.assertEqual(rx.get_stats()["discarded_decompression_failures"], 0)
+
+    def test_header_compression_and_udc_are_exclusive(self):
+        with self.assertRaises(ValueError):
+            self._pair(header_compression=True)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+import unittest
+from src.udp_transport import UDPLoopbackLink
+from src.channel_simulator import ImpairedChannel
+from src.delivery_sink import ListSink
+from src.pdcp_entity import PDCPTransmitter, PDCPReceiver
+
+KEY = bytes(range(16))
+
+class TestUDPLoopbackLink(unittest.TestCase):
+    def _link(self, **link_args):
+        args = dict(bearer_id=1, direction=0, integrity_key=KEY, cipher_key=KEY,
+                    integrity_enabled=True, ciphering_enabled=True)
+        self.sink = ListSink()
+        link = UDPLoopbackLink(PDCPTransmitter(**args), PDCPReceiver(delivery_sink=self.sink, **args), **link_args)
+        self.addCleanup(link.close)
+        return link
+
+    def _receive_all(self, link, expected):
+        while len(self.sink) < expected and link.receive(timeout=1.0)[0]:
+            pass
+
+    def test_round_trip_packs_pdus_into_datagrams(self):
+        link = self._link(datagram_bytes=256)
+        sdus = [(i, f"SDU {i}".encode() * 4) for i in range(100)]
+        pdus = link.transmitter.send_sdus(sdus, as_batch=True)
+        sent = link.send(pdus)
+        self._receive_all(link, 100)
+        self.assertEqual([(r['count'], r['payload']) for r in self.sink.records],
+                         [(i, payload) for i, payload in sdus])
+        stats = link.get_stats()
+        self.assertEqual(stats["datagrams_sent"], sent)
+        self.assertLess(sent, 100)
+        self.assertEqual(stats["datagrams_received"], sent)
+        self.assertEqual(stats["udp_bytes_received"], link.transmitter.get_stats()["wire_bytes_sent"])
+
+    def test_impairments_apply_before_the_socket(self):
+        link = self._link(impairments=ImpairedChannel(loss_rate=1.0))
+        self.assertEqual(link.send(link.transmitter.send_sdus([(0, b"lost")])), 0)
+        self.assertEqual(link.receive(timeout=0.01), ([], []))
+
+    def test_delayed_pdus_are_sent_by_flush(self):
+        link = self._link(impairments=ImpairedChannel(base_delay=1))
+        self.assertEqual(link.send(link.transmitter.send_sdus([(0, b"late")])), 0)
+        self.assertEqual(link.flush(), 1)
+        self._receive_all(link, 1)
+        self.assertEqual(self.sink.records[0]['payload'], b"late")
+
+    def test_garbled_datagram_is_dropped_without_losing_the_burst(self):
+        link = self._link()
+        pdus = link.transmitter.send_sdus([(i, b"SDU %d" % i) for i in range(4)])
+        link.send(pdus[:2])
+        link.tx_socket.send(b"\xff\xff\x80\x00garbage") # Length prefix past the end of the datagram
+        link.send(pdus[2:])
+        self._receive_all(link, 4)
+        self.assertEqual([r['count'] for r in self.sink.records], [0, 1, 2, 3])
+        self.assertEqual(link.get_stats()["malformed_datagrams"], 1)
+        self.assertEqual(link.get_stats()["datagrams_received"], 3)
+
+    def test_size_limits(self):
+        link = self._link(datagram_bytes=64)
+        with self.assertRaises(ValueError):
+            link.send(link.transmitter.send_sdus([(0, bytes(100))]))
+        with self.assertRaises(ValueError):
+            UDPLoopbackLink(link.transmitter, link.receiver, datagram_bytes=1 << 16)
+        with self.assertRaises(ValueError):
+            UDPLoopbackLink(link.transmitter, link.receiver, datagram_bytes=1024, arena_bytes=512)
+
+if __name__ == '__main__':
+    unittest.main()